@@ -0,0 +1,208 @@
+import typing as t
+from collections import deque
+from dataclasses import dataclass
+
+from components.internal.util import Event, EventStore, NODE_SYMBOLS, MSG_TYPE_SYMBOLS, SymbolTable
+
+from components.static.const import EventType, StateChangeKind
+
+# State of tested system after some events, without any widgets:
+# liveness and connectivity of nodes, disabled links, last partition
+# and messages in flight. Every apply/revert returns list of changes,
+# so only changed things have to be redrawn.
+
+MsgKey = t.Tuple[str, str, str]  # (src, dst, msg type)
+Partition = t.Tuple[t.Tuple[str, ...], t.Tuple[str, ...]]
+
+_MESSAGE_DONE = {EventType.MESSAGE_RECEIVE, EventType.MESSAGE_DROPPED, EventType.MESSAGE_DISCARDED}
+# (counter, change)
+_COUNTER_CHANGES = {
+    EventType.NODE_CRASHED: (StateChangeKind.CRASH_COUNTER, 1),
+    EventType.NODE_RECOVERED: (StateChangeKind.CRASH_COUNTER, -1),
+    EventType.NODE_DISCONNECTED: (StateChangeKind.DISCONNECT_COUNTER, 1),
+    EventType.NODE_CONNECTED: (StateChangeKind.DISCONNECT_COUNTER, -1),
+}
+
+
+@dataclass
+class StateChange:
+    kind: StateChangeKind
+    key: t.Any
+    old: t.Any
+    new: t.Any
+
+    def inverse(self) -> 'StateChange':
+        return StateChange(self.kind, self.key, self.new, self.old)
+
+
+class ClusterState:
+    # Crash and disconnect are counters as in DisplayedNode: node is crashed
+    # while its counter > 0, extra recover does not make it negative.
+    # In flight messages are matched by (src, dst, msg type), the oldest one goes first.
+    # Events can be reverted only in reverse order of applying,
+    # state which is not undoable (snapshots) does not keep changes for that.
+    def __init__(self, undoable: bool = True) -> None:
+        self.crash_counters: t.Dict[str, int] = {}
+        self.disconnect_counters: t.Dict[str, int] = {}
+        self.disabled_links: t.Set[t.Tuple[str, str]] = set()
+        self.partition: t.Optional[Partition] = None
+        # indices of send events of messages in flight
+        self.in_flight: t.Dict[MsgKey, t.Deque[int]] = {}
+        self._undoable = undoable
+        self._undo: t.List[t.Tuple[int, t.List[StateChange]]] = []  # (event idx, its changes)
+
+    def copy(self, undoable: bool = True) -> 'ClusterState':
+        # changes of copied state can not be reverted in the copy
+        state = ClusterState(undoable)
+        state.crash_counters = dict(self.crash_counters)
+        state.disconnect_counters = dict(self.disconnect_counters)
+        state.disabled_links = set(self.disabled_links)
+        state.partition = self.partition
+        state.in_flight = {key: deque(sent) for key, sent in self.in_flight.items()}
+        return state
+
+    def apply(self, event: Event) -> t.List[StateChange]:
+        data = event.data
+        return self._apply(
+            event.idx, event.type, data.get('src'), data.get('dst', data.get('node')),
+            data['msg']['type'] if 'msg' in data else None, lambda: data
+        )
+
+    def apply_at(self, events: EventStore, idx: int) -> t.List[StateChange]:
+        # same as apply(events[idx]), but event is decoded only if its data is needed
+        src, dst, msg_type = events.src[idx], events.dst[idx], events.msg_types[idx]
+        return self._apply(
+            idx, events.type_of(idx),
+            None if src == SymbolTable.NO_SYMBOL else NODE_SYMBOLS[src],
+            None if dst == SymbolTable.NO_SYMBOL else NODE_SYMBOLS[dst],
+            None if msg_type == SymbolTable.NO_SYMBOL else MSG_TYPE_SYMBOLS[msg_type],
+            lambda: events[idx].data
+        )
+
+    def revert(self, event: Event) -> t.List[StateChange]:
+        # event must be the last applied one
+        idx, changes = self._undo.pop()
+        assert idx == event.idx, f'Reverted event #{event.idx}, but last applied is #{idx}'
+        inverse_changes = [change.inverse() for change in reversed(changes)]
+        for change in inverse_changes:
+            self._set(change)
+        return inverse_changes
+
+    def forget_undo(self, first_event_idx: int):
+        # events before first_event_idx can not be reverted anymore
+        forgotten = 0
+        while forgotten < len(self._undo) and self._undo[forgotten][0] < first_event_idx:
+            forgotten += 1
+        del self._undo[:forgotten]
+
+    def _apply(
+            self, idx: int, event_type: str, src: t.Optional[str], dst: t.Optional[str],
+            msg_type: t.Optional[str], get_data: t.Callable[[], dict]) -> t.List[StateChange]:
+        # dst is 'dst' or 'node' of event
+        changes: t.List[StateChange] = []
+        if event_type == EventType.MESSAGE_SEND:
+            changes.append(StateChange(StateChangeKind.MESSAGE_SENT, (src, dst, msg_type), None, idx))
+        elif event_type in _MESSAGE_DONE:
+            sent = self.in_flight.get((src, dst, msg_type))
+            if sent:
+                changes.append(StateChange(StateChangeKind.MESSAGE_DONE, (src, dst, msg_type), sent[0], None))
+        elif event_type in _COUNTER_CHANGES:
+            kind, change = _COUNTER_CHANGES[event_type]
+            counters = self.crash_counters if kind == StateChangeKind.CRASH_COUNTER else self.disconnect_counters
+            old = counters.get(dst, 0)
+            new = max(0, old + change)
+            if new != old:
+                changes.append(StateChange(kind, dst, old, new))
+        elif event_type in (EventType.LINK_ENABLED, EventType.LINK_DISABLED):
+            was_enabled = (src, dst) not in self.disabled_links
+            enabled = event_type == EventType.LINK_ENABLED
+            if was_enabled != enabled:
+                changes.append(StateChange(StateChangeKind.LINK, (src, dst), was_enabled, enabled))
+        elif event_type == EventType.NETWORK_PARTITION:
+            data = get_data()
+            partition = (tuple(data['group1']), tuple(data['group2']))
+            changes.append(StateChange(StateChangeKind.PARTITION, None, self.partition, partition))
+        # local messages, timers, restarts and test end do not change state
+        for change in changes:
+            self._set(change)
+        if self._undoable:
+            self._undo.append((idx, changes))
+        return changes
+
+    def _set(self, change: StateChange):
+        kind, key = change.kind, change.key
+        if kind == StateChangeKind.CRASH_COUNTER:
+            self._set_counter(self.crash_counters, key, change.new)
+        elif kind == StateChangeKind.DISCONNECT_COUNTER:
+            self._set_counter(self.disconnect_counters, key, change.new)
+        elif kind == StateChangeKind.LINK:
+            if change.new:
+                self.disabled_links.discard(key)
+            else:
+                self.disabled_links.add(key)
+        elif kind == StateChangeKind.PARTITION:
+            self.partition = change.new
+        elif kind == StateChangeKind.MESSAGE_SENT:
+            if change.new is not None:
+                self.in_flight.setdefault(key, deque()).append(change.new)
+            else:
+                self._pop_in_flight(key, newest=True)
+        elif kind == StateChangeKind.MESSAGE_DONE:
+            if change.new is None:
+                self._pop_in_flight(key, newest=False)
+            else:
+                self.in_flight.setdefault(key, deque()).appendleft(change.new)
+
+    @staticmethod
+    def _set_counter(counters: t.Dict[str, int], node_id: str, value: int):
+        if value == 0:
+            counters.pop(node_id, None)
+        else:
+            counters[node_id] = value
+
+    def _pop_in_flight(self, key: MsgKey, newest: bool):
+        sent = self.in_flight[key]
+        if newest:
+            sent.pop()
+        else:
+            sent.popleft()
+        if not sent:
+            del self.in_flight[key]
+
+    ##### QUERIES ###
+    def crash_counter(self, node_id: str) -> int:
+        return self.crash_counters.get(node_id, 0)
+
+    def disconnect_counter(self, node_id: str) -> int:
+        return self.disconnect_counters.get(node_id, 0)
+
+    def is_crashed(self, node_id: str) -> bool:
+        return node_id in self.crash_counters
+
+    def is_disconnected(self, node_id: str) -> bool:
+        return node_id in self.disconnect_counters
+
+    def is_link_enabled(self, src: str, dst: str) -> bool:
+        return (src, dst) not in self.disabled_links
+
+    def partition_group(self, node_id: str) -> int:
+        # 1 or 2 for nodes of last partition, 0 otherwise
+        if self.partition is None:
+            return 0
+        if node_id in self.partition[0]:
+            return 1
+        if node_id in self.partition[1]:
+            return 2
+        return 0
+
+    def in_flight_count(self) -> int:
+        return sum(len(sent) for sent in self.in_flight.values())
+
+    def messages_in_flight(self, src: t.Optional[str] = None, dst: t.Optional[str] = None) -> t.List[int]:
+        # indices of send events, src/dst None means any node
+        return sorted(
+            idx
+            for (msg_src, msg_dst, _), sent in self.in_flight.items()
+            if (src is None or msg_src == src) and (dst is None or msg_dst == dst)
+            for idx in sent
+        )
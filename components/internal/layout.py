@@ -0,0 +1,164 @@
+import math
+import random
+import typing as t
+import weakref
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from components.internal.internal_logger import getLogger
+from components.internal.util import EventStore, EVENT_TYPE_CODES, NODE_SYMBOLS
+from components.static.const import EventType, TRAFFIC_LAYOUT_ITERATIONS, TRAFFIC_LAYOUT_MAX_NODES
+
+# Communication-aware placement of nodes.
+# Nodes are vertices of undirected graph, weight of edge is count of messages sent
+# and received between its nodes. Nodes get 2D coordinates from the two lowest
+# degree-normalized eigenvectors of the graph (Koren, "Drawing graphs by eigenvectors"),
+# so heavily communicating nodes are close. Coordinates are only relative: display
+# snaps nodes to layout slots in their order.
+# Layout is computed in a worker process from columns of events: it is pure python
+# and would hold GIL of UI thread for seconds on large clusters.
+
+logger = getLogger('layout')
+
+TrafficGraph = t.Dict[int, t.Dict[int, int]]  # node symbol -> neighbour symbol -> weight
+
+
+def traffic_graph(types: array, src: array, dst: array) -> TrafficGraph:
+    # columns of EventStore
+    message_codes = {EVENT_TYPE_CODES[EventType.MESSAGE_SEND], EVENT_TYPE_CODES[EventType.MESSAGE_RECEIVE]}
+    graph: TrafficGraph = {}
+    for idx in range(len(types)):
+        if types[idx] not in message_codes or src[idx] == dst[idx]:
+            continue
+        for a, b in ((src[idx], dst[idx]), (dst[idx], src[idx])):
+            neighbours = graph.get(a)
+            if neighbours is None:
+                neighbours = graph[a] = {}
+            neighbours[b] = neighbours.get(b, 0) + 1
+    return graph
+
+
+def spectral_embedding(
+        graph: TrafficGraph, iterations: int = TRAFFIC_LAYOUT_ITERATIONS
+        ) -> t.Dict[int, t.Tuple[float, float]]:
+    # coordinates of nodes with traffic, nodes without it are not in graph
+    nodes = sorted(graph)
+    if not nodes:
+        return {}
+    position = {node: i for i, node in enumerate(nodes)}
+    adjacency = [[(position[b], weight) for b, weight in graph[a].items()] for a in nodes]
+    degrees = [float(sum(weight for _, weight in neighbours)) for neighbours in adjacency]
+    rng = random.Random(0)  # same traffic gives same layout
+
+    vectors = [_normalized([1.0] * len(nodes))]
+    for _ in range(2):
+        vector = _normalized([rng.random() - 0.5 for _ in nodes])
+        for _ in range(iterations):
+            # vectors are kept D-orthogonal to previous ones
+            for prev in vectors:
+                prev_norm = _d_dot(prev, prev, degrees)
+                if prev_norm == 0:
+                    continue  # graph of two nodes has no third eigenvector
+                factor = _d_dot(vector, prev, degrees) / prev_norm
+                vector = [x - factor * p for x, p in zip(vector, prev)]
+            # x <- (I + D^-1 A) x / 2
+            next_vector = _normalized([
+                0.5 * (vector[i] + sum(weight * vector[j] for j, weight in adjacency[i]) / degrees[i])
+                for i in range(len(nodes))
+            ])
+            converged = sum(x * y for x, y in zip(vector, next_vector)) > 1 - 1e-9
+            vector = next_vector
+            if converged:
+                break
+        vectors.append(vector)
+    return {node: (vectors[1][i], vectors[2][i]) for i, node in enumerate(nodes)}
+
+
+def traffic_embedding(types: array, src: array, dst: array) -> t.Dict[int, t.Tuple[float, float]]:
+    # coordinates by node symbols (see layout_by_node_ids) of columns of EventStore,
+    # empty if there are too many nodes for layout to be computed in reasonable time
+    graph = traffic_graph(types, src, dst)
+    if len(graph) > TRAFFIC_LAYOUT_MAX_NODES:
+        return {}
+    return spectral_embedding(graph)
+
+
+def layout_by_node_ids(embedding: t.Dict[int, t.Tuple[float, float]]) -> t.Dict[str, t.Tuple[float, float]]:
+    return {NODE_SYMBOLS[node]: point for node, point in embedding.items()}
+
+
+class TrafficLayouts:
+    # layouts of stores computed in one worker process, layout is kept while its store is alive
+    # and is reused until events are appended to store (follow mode)
+    def __init__(self) -> None:
+        self._layouts: 'weakref.WeakKeyDictionary[EventStore, t.Tuple[int, t.Dict[str, t.Tuple[float, float]]]]' = (
+            weakref.WeakKeyDictionary()
+        )
+        self._executor: t.Optional[ProcessPoolExecutor] = None  # started with the first layout
+        self._computing: t.Optional[t.Tuple[EventStore, int, Future]] = None
+
+    def get(self, events: EventStore) -> t.Optional[t.Dict[str, t.Tuple[float, float]]]:
+        # the last computed layout, None if there is no one
+        layout = self._layouts.get(events)
+        return None if layout is None else layout[1]
+
+    def is_actual(self, events: EventStore) -> bool:
+        # layout is computed from all events of store
+        layout = self._layouts.get(events)
+        return layout is not None and layout[0] == len(events)
+
+    def compute(self, events: EventStore) -> bool:
+        # False if computation is not started: layout of other store is computed
+        # (this one is started after it) or pool is broken
+        if self._computing is not None:
+            return False
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        count = len(events)
+        try:
+            # only columns are sent to worker
+            self._computing = (events, count, self._executor.submit(
+                traffic_embedding, events.types[:count], events.src[:count], events.dst[:count]
+            ))
+        except (OSError, RuntimeError, BrokenProcessPool) as e:
+            # pool is broken by its died worker, the next layout starts new one
+            logger.error(f'Can not compute traffic layout: {e}')
+            self._executor = None
+            self._layouts[events] = (count, {})  # nodes stay in id order
+            return False
+        return True
+
+    def poll(self) -> t.Optional[EventStore]:
+        # store which layout is done since last call
+        if self._computing is None or not self._computing[2].done():
+            return None
+        events, count, computing = self._computing
+        self._computing = None
+        error = computing.exception()
+        if error is not None:
+            logger.error(f'Can not compute traffic layout: {error}')
+            if isinstance(error, BrokenProcessPool):
+                self._executor = None
+            self._layouts[events] = (count, {})  # nodes stay in id order
+        else:
+            self._layouts[events] = (count, layout_by_node_ids(computing.result()))
+        return events
+
+    def shutdown(self):
+        # computed layouts are kept, pool is started again by the next computation
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._computing = None
+
+
+def _d_dot(x: t.List[float], y: t.List[float], degrees: t.List[float]) -> float:
+    return sum(a * b * d for a, b, d in zip(x, y, degrees))
+
+
+def _normalized(vector: t.List[float]) -> t.List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return vector
+    return [x / norm for x in vector]
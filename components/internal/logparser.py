@@ -1,46 +1,270 @@
+import glob
+import os
+import os.path as path
 import typing as t
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from components.internal.util import Event, Test, make_test_end_event
+from components.internal.internal_logger import getLogger
+from components.internal.logreader import LogReader, open_log, detect_compression, build_checkpoints_in_background
+from components.internal.parsecache import CACHE_SUFFIX, load_cache, save_cache, cache_path
+from components.internal.util import EventStore, Test, TestSource, make_test_end_event, NODE_SYMBOLS
+from components.static.const import FOLLOW_READ_CHUNK_SIZE
+
+# TODO: add analisable info (msg sizes etc)
+
+logger = getLogger('logparser')
+
+
+def decode_test_events(
+        source: TestSource, with_test_end: bool, log: t.Optional[LogReader] = None) -> EventStore:
+    # module level function to be picklable for process pool
+    if log is None:
+        with open_log(source.path) as log:
+            return decode_test_events(source, with_test_end, log)
+    events = EventStore()
+    line = None
+    for _, line in log.iter_lines(source.begin, source.end):
+        if line[:1] != b'{':
+            # NODE_IDS or empty line
+            if line[:8] == b'NODE_IDS' or not bytes(line).strip():
+                continue
+        events.append_raw(line)
+    line = None  # release last slice of the mapped file
+    if with_test_end:
+        events.append(make_test_end_event(len(events)))
+    return events
 
-# TODO: separate tests by files
-# add analisable info (msg sizes etc)
 
 class LogParser:
     def __init__(self) -> None:
         self.tests: t.Dict[str, Test] = {}
 
-    def parse_log_file(self, file_path: str):
-        with open(file_path, 'rt') as f:
-            last_test_name = ''
-            test_event_counter = 0
+    def parse_log_file(self, file_path: str, workers: int = 1):
+        if workers > 1 and detect_compression(file_path) is not None:
+            # workers can not share checkpoints of decompressor
+            logger.info('Compressed log is parsed in single process')
+            workers = 1
+        if workers > 1:
+            try:
+                self._parse_log_file_parallel(file_path, workers)
+                return
+            except (OSError, BrokenProcessPool) as e:
+                logger.warning(f'Parallel parsing failed ({e}), fallback to single process')
+                self.tests.clear()
+        self.index_log_file(file_path)
+        with open_log(file_path) as log:
+            for test in self.tests.values():
+                test.events = decode_test_events(test.source, test.status is not None, log)
+                test.events_loaded = True
+
+    def index_log_file(self, file_path: str):
+        # first pass: only remember where events of each test are,
+        # events are decoded later by load_test_events
+        with open_log(file_path) as log:
+            last_test: t.Optional[Test] = None
             node_ids = set()
-            for line in f:
-                line = line.strip()
-                if not line:
-                    # for last line (or any empty)
-                    continue
-                if line.startswith("NODE_IDS"):
-                    node_ids = set(line.split(":")[1:])
+            for line_begin, next_line_begin, line in log.iter_marker_lines():
+                line = line.strip().decode()
+                if line.startswith('NODE_IDS'):
+                    node_ids = set(NODE_SYMBOLS.canonical(node_id) for node_id in line.split(':')[1:])
                     continue
-                if line.startswith("TEST_BEGIN"):
+                if line.startswith('TEST_BEGIN'):
+                    if last_test is not None and last_test.status is None:
+                        # previous test has no TEST_END
+                        last_test.source.end = line_begin
                     last_test_name = line.split(':', maxsplit=1)[1]
-                    self.tests[last_test_name] = Test(last_test_name, [], None, None, [])
+                    last_test = Test(
+                        last_test_name, EventStore(), None, None, set(),
+                        source=TestSource(file_path, next_line_begin, next_line_begin),
+                        events_loaded=False
+                    )
+                    self.tests[last_test_name] = last_test
                     continue
-                if line.startswith("TEST_END"):
+                if line.startswith('TEST_END'):
                     _, status, err = line.split(':', maxsplit=2)
-                    err = err if err else None
-                    self.tests[last_test_name].status = status
-                    self.tests[last_test_name].err = err
-                    self.tests[last_test_name].node_ids = node_ids
-                    self.tests[last_test_name].events.append(make_test_end_event(test_event_counter))
-                    test_event_counter = 0
+                    last_test.status = status
+                    last_test.err = err if err else None
+                    last_test.node_ids = node_ids
+                    last_test.source.end = line_begin
                     continue
-
-                self.tests[last_test_name].events.append(Event.from_json(line, test_event_counter))
-                test_event_counter += 1
-
+            if last_test is not None and last_test.status is None:
+                last_test.source.end = log.size
 
         if len(self.tests) == 0:
             raise RuntimeError(
                 f'Parsed empty data. Tests: {len(self.tests)} '
-            )
\ No newline at end of file
+            )
+
+    def _parse_log_file_parallel(self, file_path: str, workers: int):
+        # split file by tests and decode them in separate processes
+        self.index_log_file(file_path)
+        tests = list(self.tests.values())
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                decode_test_events,
+                [test.source for test in tests],
+                [test.status is not None for test in tests],
+                chunksize=max(1, len(tests) // (workers * 4))
+            )
+            # map keeps order of tests in file
+            for test, events in zip(tests, results):
+                test.events = events
+                test.events_loaded = True
+
+    @staticmethod
+    def load_test_events(test: Test):
+        if test.events_loaded:
+            return
+        test.events = decode_test_events(test.source, test.status is not None)
+        test.events_loaded = True
+
+
+def find_log_files(pattern: str) -> t.List[str]:
+    # pattern is a log file, a directory with logs or a glob,
+    # files are sorted to always get the same session
+    if path.isdir(pattern):
+        paths = [path.join(pattern, name) for name in os.listdir(pattern)]
+    elif any(char in pattern for char in '*?['):
+        paths = glob.glob(pattern, recursive=True)
+    else:
+        paths = [pattern]
+    return sorted(
+        file_path for file_path in paths
+        if path.isfile(file_path) and not file_path.endswith((CACHE_SUFFIX, f'{CACHE_SUFFIX}.tmp'))
+    )
+
+
+def load_log_file(file_path: str, workers: int = 0, use_cache: bool = True) -> t.Dict[str, Test]:
+    # workers == 0: only index tests, events are loaded when test is selected
+    tests = load_cache(file_path) if use_cache else None
+    if tests is not None:
+        logger.info(f'Loaded parse cache: {cache_path(file_path)}')
+        if not all(test.events_loaded for test in tests.values()):
+            # compressed log was not read, tests are loaded from it later
+            build_checkpoints_in_background(file_path)
+    else:
+        parser = LogParser()
+        if workers > 0:
+            parser.parse_log_file(file_path, workers=workers)
+        else:
+            parser.index_log_file(file_path)
+        tests = parser.tests
+        if use_cache:
+            save_cache(file_path, tests)
+    for test in tests.values():
+        test.log_path = file_path
+    return tests
+
+
+def load_log_files(
+        file_paths: t.List[str], workers: int = 0, use_cache: bool = True) -> t.Dict[str, t.Dict[str, Test]]:
+    # returns tests of each file, files which can not be parsed are skipped
+    if len(file_paths) == 1:
+        return {file_paths[0]: load_log_file(file_paths[0], workers, use_cache)}
+    if workers > 0:
+        # all events are parsed, one file per process
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        # index pass is short, threads are enough
+        executor = ThreadPoolExecutor(max_workers=min(len(file_paths), os.cpu_count() or 1))
+    tests_by_file = {}
+    with executor:
+        futures = [
+            executor.submit(load_log_file, file_path, min(workers, 1), use_cache)
+            for file_path in file_paths
+        ]
+        for file_path, future in zip(file_paths, futures):
+            try:
+                tests_by_file[file_path] = future.result()
+            except (OSError, RuntimeError, BrokenProcessPool) as e:
+                logger.error(f'Can not parse {file_path}: {e}')
+    if len(tests_by_file) == 0:
+        raise RuntimeError(f'No tests parsed from {len(file_paths)} files')
+    return tests_by_file
+
+
+def merge_log_tests(tests_by_file: t.Dict[str, t.Dict[str, Test]]) -> t.Dict[str, Test]:
+    # tests of all files in one session, files go in sorted order
+    # and test which name is already taken gets name of its file as suffix
+    tests: t.Dict[str, Test] = {}
+    for file_path in sorted(tests_by_file):
+        file_name = path.basename(file_path)
+        for name, test in tests_by_file[file_path].items():
+            unique_name, copy_idx = name, 1
+            while unique_name in tests:
+                unique_name = f'{name} ({file_name})' if copy_idx == 1 else f'{name} ({file_name} #{copy_idx})'
+                copy_idx += 1
+            if unique_name != name:
+                logger.warning(f'Test {name} from {file_path} is renamed to {unique_name}')
+            test.name = unique_name
+            tests[unique_name] = test
+    return tests
+
+
+class LogFollower:
+    # reads log file incrementally while it is still being written,
+    # consumed bytes are never read again
+    def __init__(self, file_path: str) -> None:
+        self.tests: t.Dict[str, Test] = {}
+        self._file_path = file_path
+        self._file = open(file_path, 'rb')
+        self._tail = b''  # incomplete last line
+        self._last_test: t.Optional[Test] = None
+        self._node_ids = set()
+
+    def poll(self) -> t.Tuple[t.List[Test], t.List[Test]]:
+        # returns (started tests, finished tests) since last call,
+        # file is read by chunks not to hold whole existing log in memory on first call
+        started, finished = [], []
+        skipped = 0
+        while True:
+            data = self._file.read(FOLLOW_READ_CHUNK_SIZE)
+            if not data:
+                break
+            lines = (self._tail + data).split(b'\n')
+            self._tail = lines.pop()
+            skipped += self._parse_lines(lines, started, finished)
+        if skipped:
+            logger.warning(f'{skipped} lines of {self._file_path} are outside of tests and skipped')
+        return started, finished
+
+    def _parse_lines(self, lines: t.List[bytes], started: t.List[Test], finished: t.List[Test]) -> int:
+        # returns count of skipped lines: events before first test and TEST_END without running test
+        skipped = 0
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(b'NODE_IDS'):
+                self._node_ids = set(NODE_SYMBOLS.canonical(node_id) for node_id in line.decode().split(':')[1:])
+                if self._last_test is not None and self._last_test.status == Test.Status.RUNNING:
+                    self._last_test.node_ids = self._node_ids
+                continue
+            if line.startswith(b'TEST_BEGIN'):
+                name = line.decode().split(':', maxsplit=1)[1]
+                self._last_test = Test(
+                    name, EventStore(), Test.Status.RUNNING, None, set(), log_path=self._file_path
+                )
+                self.tests[name] = self._last_test
+                started.append(self._last_test)
+                continue
+            if self._last_test is None:
+                skipped += 1
+                continue
+            if line.startswith(b'TEST_END'):
+                if self._last_test.status != Test.Status.RUNNING:
+                    skipped += 1
+                    continue
+                _, status, err = line.decode().split(':', maxsplit=2)
+                self._last_test.status = status
+                self._last_test.err = err if err else None
+                self._last_test.node_ids = self._node_ids
+                self._last_test.events.append(make_test_end_event(len(self._last_test.events)))
+                finished.append(self._last_test)
+                continue
+            self._last_test.events.append_raw(line)
+        return skipped
+
+    def close(self):
+        self._file.close()
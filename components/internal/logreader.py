@@ -0,0 +1,302 @@
+import bisect
+import bz2
+import lzma
+import mmap
+import os
+import re
+import threading
+import typing as t
+import zlib
+
+from components.internal.internal_logger import getLogger
+
+logger = getLogger('logreader')
+
+# lines that are not events
+MARKER_LINE_RE = re.compile(rb'^(?:TEST_|NODE_IDS)[^\n]*', re.M)
+
+
+class MappedLog:
+    # read-only memory map of the log file,
+    # lines are returned as memoryview slices without copying
+    def __init__(self, file_path: str) -> None:
+        self.path = file_path
+        self._file = open(file_path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        if self.size > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b''  # empty file can not be mapped
+        self._view = memoryview(self._map)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._view.release()
+        if isinstance(self._map, mmap.mmap):
+            try:
+                self._map.close()
+            except BufferError:
+                # some line slices are still alive, map is closed when they are collected
+                pass
+        self._file.close()
+
+    def iter_lines(self, begin: int = 0, end: t.Optional[int] = None) -> t.Iterator[t.Tuple[int, memoryview]]:
+        # yields (line offset, line without '\n')
+        end = self.size if end is None else end
+        pos = begin
+        while pos < end:
+            line_end = self._map.find(b'\n', pos, end)
+            if line_end == -1:
+                line_end = end
+            yield pos, self._view[pos:line_end]
+            pos = line_end + 1
+
+    def iter_marker_lines(self) -> t.Iterator[t.Tuple[int, int, bytes]]:
+        # yields (line offset, next line offset, line) for TEST_* lines
+        # and the last NODE_IDS line before each of them, event lines are not touched
+        pos = 0
+        while True:
+            line_begin = self.find_line(b'TEST_', pos)
+            if line_begin == -1:
+                break
+            node_ids_begin = self.rfind_line(b'NODE_IDS', pos, line_begin)
+            if node_ids_begin != -1:
+                node_ids_line, next_pos = self.read_line(node_ids_begin)
+                yield node_ids_begin, next_pos, node_ids_line
+            line, pos = self.read_line(line_begin)
+            yield line_begin, pos, line
+
+    def read_line(self, pos: int) -> t.Tuple[bytes, int]:
+        # returns (line without '\n', offset of the next line)
+        line_end = self._map.find(b'\n', pos)
+        if line_end == -1:
+            line_end = self.size
+        return self._map[pos:line_end], line_end + 1
+
+    def find_line(self, prefix: bytes, begin: int = 0, end: t.Optional[int] = None) -> int:
+        # offset of the first line in [begin, end) that starts with prefix or -1,
+        # begin must be an offset of a line
+        end = self.size if end is None else end
+        if begin < end and self._map[begin:begin + len(prefix)] == prefix:
+            return begin
+        pos = self._map.find(b'\n' + prefix, begin, end)
+        return pos + 1 if pos != -1 else -1
+
+    def rfind_line(self, prefix: bytes, begin: int = 0, end: t.Optional[int] = None) -> int:
+        # offset of the last line in [begin, end) that starts with prefix or -1,
+        # begin must be an offset of a line
+        end = self.size if end is None else end
+        pos = self._map.rfind(b'\n' + prefix, begin, end)
+        if pos != -1:
+            return pos + 1
+        if begin < end and self._map[begin:begin + len(prefix)] == prefix:
+            return begin
+        return -1
+
+
+class Compression:
+    GZIP = 'gzip'
+    BZ2 = 'bz2'
+    XZ = 'xz'
+
+
+COMPRESSION_MAGIC = {
+    Compression.GZIP: b'\x1f\x8b',
+    Compression.BZ2: b'BZh',
+    Compression.XZ: b'\xfd7zXZ\x00',
+}
+
+CHECKPOINT_INTERVAL = 8 * 1024 * 1024  # of uncompressed data
+READ_CHUNK_SIZE = 1024 * 1024  # of compressed data
+DECOMPRESSED_CHUNK_SIZE = 4 * 1024 * 1024  # max output of one decompress call
+
+
+def detect_compression(file_path: str) -> t.Optional[str]:
+    with open(file_path, 'rb') as f:
+        head = f.read(8)
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+class _Checkpoint:
+    # decompression can be resumed from here
+    def __init__(self, in_pos: int, out_pos: int, decompressor) -> None:
+        self.in_pos = in_pos  # offset in compressed file
+        self.out_pos = out_pos  # offset in uncompressed data
+        self.decompressor = decompressor  # None == start of compressed stream
+
+
+class CompressedLog:
+    # Streamed reading of gzip/bz2/xz log with offsets in uncompressed data.
+    # While data is decompressed for the first time, checkpoints are remembered,
+    # so later reads from the middle of the log start from the nearest checkpoint.
+    # gzip state is copied every CHECKPOINT_INTERVAL bytes,
+    # bz2 and xz decompressors can not be copied, so only starts of streams are used
+    # (multistream files from pbzip2 etc), single stream logs are always read from start.
+    # Instances are shared (see open_log) to keep checkpoints between reads,
+    # every read opens its own file, so checkpoints can be built in background (see build_checkpoints).
+    _opened: t.Dict[str, 'CompressedLog'] = {}
+
+    def __init__(self, file_path: str, compression: str) -> None:
+        self.path = file_path
+        self.compression = compression
+        self._checkpoints: t.List[_Checkpoint] = [_Checkpoint(0, 0, None)]
+        self._checkpoint_out_pos = [0]  # for bisect
+        self._checkpoints_lock = threading.Lock()
+        self.size: t.Optional[int] = None  # known when the whole file was decompressed
+
+    @classmethod
+    def open(cls, file_path: str, compression: str) -> 'CompressedLog':
+        key = os.path.abspath(file_path)
+        if key not in cls._opened:
+            cls._opened[key] = cls(file_path, compression)
+        return cls._opened[key]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # log stays opened with its checkpoints for the next reads
+        pass
+
+    def close(self):
+        self._opened.pop(os.path.abspath(self.path), None)
+
+    def build_checkpoints(self):
+        # decompresses the whole log once if it was not done yet (log is indexed by parse cache)
+        if self.size is not None:
+            return
+        for _ in self._iter_chunks(0):
+            pass
+
+    def _new_decompressor(self):
+        if self.compression == Compression.GZIP:
+            return zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        if self.compression == Compression.BZ2:
+            return bz2.BZ2Decompressor()
+        return lzma.LZMADecompressor()
+
+    def _add_checkpoint(self, in_pos: int, out_pos: int, decompressor):
+        with self._checkpoints_lock:
+            if out_pos <= self._checkpoint_out_pos[-1]:
+                return
+            self._checkpoints.append(_Checkpoint(in_pos, out_pos, decompressor))
+            self._checkpoint_out_pos.append(out_pos)
+
+    def _on_end(self, size: int):
+        if self.size is None and self.compression != Compression.GZIP and len(self._checkpoints) == 1:
+            logger.warning(
+                f'{self.path} is a single {self.compression} stream: events of every test are '
+                f'decompressed from the start of file, use gzip or multistream compression for faster loading'
+            )
+        self.size = size
+
+    def _iter_chunks(self, begin: int) -> t.Iterator[t.Tuple[int, bytes]]:
+        # yields (uncompressed offset, data) starting from the checkpoint before begin,
+        # data is at most DECOMPRESSED_CHUNK_SIZE whatever the compression ratio is
+        checkpoint = self._checkpoints[bisect.bisect_right(self._checkpoint_out_pos, begin) - 1]
+        in_pos, out_pos = checkpoint.in_pos, checkpoint.out_pos
+        decompressor = (
+            self._new_decompressor() if checkpoint.decompressor is None
+            else checkpoint.decompressor.copy()
+        )
+        is_gzip = self.compression == Compression.GZIP
+        with open(self.path, 'rb') as f:
+            f.seek(in_pos)
+            raw = b''  # read data which is not given to decompressor yet, file offset of its end is in_pos
+            has_output = False  # decompressor keeps output which did not fit max_length
+            while True:
+                if not raw and not has_output:
+                    raw = f.read(READ_CHUNK_SIZE)
+                    if not raw:
+                        self._on_end(out_pos)
+                        return
+                    in_pos += len(raw)
+                if decompressor.eof:
+                    # next stream (member) of file starts here
+                    self._add_checkpoint(in_pos - len(raw), out_pos, None)
+                    decompressor = self._new_decompressor()
+                data = decompressor.decompress(raw, DECOMPRESSED_CHUNK_SIZE)
+                if decompressor.eof:
+                    raw, has_output = decompressor.unused_data, False
+                elif is_gzip:
+                    # not decompressed input is returned, output can be pending only if limit is reached
+                    raw, has_output = decompressor.unconsumed_tail, len(data) == DECOMPRESSED_CHUNK_SIZE
+                else:
+                    # input is buffered by decompressor
+                    raw, has_output = b'', not decompressor.needs_input
+                if (
+                    is_gzip and not decompressor.eof
+                    and out_pos + len(data) - self._checkpoint_out_pos[-1] >= CHECKPOINT_INTERVAL
+                ):
+                    self._add_checkpoint(in_pos - len(raw), out_pos + len(data), decompressor.copy())
+                if data:
+                    yield out_pos, data
+                out_pos += len(data)
+
+    def iter_lines(self, begin: int = 0, end: t.Optional[int] = None) -> t.Iterator[t.Tuple[int, bytes]]:
+        # yields (line offset, line without '\n')
+        tail, tail_pos = b'', begin
+        for chunk_pos, chunk in self._iter_chunks(begin):
+            if chunk_pos + len(chunk) <= begin:
+                continue
+            if chunk_pos < begin:
+                chunk = chunk[begin - chunk_pos:]
+            data = tail + chunk
+            is_last = end is not None and tail_pos + len(data) >= end
+            if is_last:
+                data = data[:end - tail_pos]
+            pos = 0
+            while True:
+                line_end = data.find(b'\n', pos)
+                if line_end == -1:
+                    break
+                yield tail_pos + pos, data[pos:line_end]
+                pos = line_end + 1
+            tail, tail_pos = data[pos:], tail_pos + pos
+            if is_last:
+                break
+        if tail:
+            yield tail_pos, tail
+
+    def iter_marker_lines(self) -> t.Iterator[t.Tuple[int, int, bytes]]:
+        # yields (line offset, next line offset, line) for all TEST_* and NODE_IDS lines
+        tail, tail_pos = b'', 0
+        for _, chunk in self._iter_chunks(0):
+            data = tail + chunk
+            last_line_end = data.rfind(b'\n')
+            for match in MARKER_LINE_RE.finditer(data, 0, last_line_end + 1):
+                yield tail_pos + match.start(), tail_pos + match.end() + 1, match.group()
+            tail, tail_pos = data[last_line_end + 1:], tail_pos + last_line_end + 1
+        for match in MARKER_LINE_RE.finditer(tail):
+            yield tail_pos + match.start(), tail_pos + match.end() + 1, match.group()
+
+
+LogReader = t.Union[MappedLog, CompressedLog]
+
+
+def build_checkpoints_in_background(file_path: str) -> t.Optional[threading.Thread]:
+    # reads from the middle of compressed log do not start from its beginning after that
+    compression = detect_compression(file_path)
+    if compression is None:
+        return None
+    thread = threading.Thread(
+        target=CompressedLog.open(file_path, compression).build_checkpoints,
+        name=f'checkpoints of {file_path}', daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def open_log(file_path: str) -> LogReader:
+    compression = detect_compression(file_path)
+    if compression is None:
+        return MappedLog(file_path)
+    return CompressedLog.open(file_path, compression)
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import typing as t
+
+from components.internal.internal_logger import getLogger
+from components.internal.util import EventStore, Test, TestSource, NODE_SYMBOLS, MSG_TYPE_SYMBOLS
+
+# Sidecar file with parsed log: <logfile>.vdbcache
+#
+# | header | metadata (json) | columns of loaded tests (raw array bytes) |
+#
+# Cache is valid only for the log file with the same size, mtime
+# and hash of its first HEADER_HASH_SIZE bytes.
+# Sources of tests are saved without path: log and its cache can be moved
+# together or loaded from other working directory.
+
+logger = getLogger('parsecache')
+
+CACHE_SUFFIX = '.vdbcache'
+CACHE_MAGIC = b'VDBCACHE'
+CACHE_VERSION = 3
+HEADER_HASH_SIZE = 64 * 1024
+
+# magic, version, log size, log mtime (ns), log header hash, metadata length
+_HEADER = struct.Struct('<8sIQq20sQ')
+
+
+def cache_path(log_path: str) -> str:
+    return f'{log_path}{CACHE_SUFFIX}'
+
+
+def _log_header_hash(log_path: str) -> bytes:
+    with open(log_path, 'rb') as f:
+        return hashlib.sha1(f.read(HEADER_HASH_SIZE)).digest()
+
+
+def _storage_format() -> t.Dict[str, t.Any]:
+    # arrays are saved in native format
+    return {
+        'byteorder': sys.byteorder,
+        'itemsizes': [
+            column.itemsize for column in EventStore().columns() if hasattr(column, 'itemsize')
+        ]
+    }
+
+
+def save_cache(log_path: str, tests: t.Dict[str, Test]):
+    stat = os.stat(log_path)
+    tests_meta = []
+    columns = []
+    for name, test in tests.items():
+        test_meta = {
+            'name': name,  # name in its log, test can be renamed in multi-file session
+            'status': test.status,
+            'err': test.err,
+            'node_ids': sorted(test.node_ids),
+            'source': None if test.source is None else [test.source.begin, test.source.end],
+            'columns': None,
+        }
+        if test.events_loaded:
+            test_columns = test.events.columns()
+            test_meta['columns'] = [memoryview(column).nbytes for column in test_columns]
+            columns.extend(test_columns)
+        tests_meta.append(test_meta)
+    meta = json.dumps({
+        'format': _storage_format(),
+        # columns keep symbols of session tables
+        'node_symbols': NODE_SYMBOLS.values,
+        'msg_type_symbols': MSG_TYPE_SYMBOLS.values,
+        'tests': tests_meta
+    }).encode()
+    header = _HEADER.pack(
+        CACHE_MAGIC, CACHE_VERSION, stat.st_size, stat.st_mtime_ns,
+        _log_header_hash(log_path), len(meta)
+    )
+    tmp_path = f'{cache_path(log_path)}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(meta)
+            for column in columns:
+                f.write(column)
+        os.replace(tmp_path, cache_path(log_path))
+    except OSError as e:
+        logger.warning(f'Can not save parse cache: {e}')
+
+
+def load_cache(log_path: str) -> t.Optional[t.Dict[str, Test]]:
+    # returns None if there is no valid cache for log
+    try:
+        with open(cache_path(log_path), 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            magic, version, log_size, log_mtime_ns, log_hash, meta_len = _HEADER.unpack(header)
+            stat = os.stat(log_path)
+            if (
+                magic != CACHE_MAGIC or version != CACHE_VERSION
+                or log_size != stat.st_size or log_mtime_ns != stat.st_mtime_ns
+                or log_hash != _log_header_hash(log_path)
+            ):
+                logger.info('Parse cache is stale')
+                return None
+            meta = json.loads(f.read(meta_len))
+            if meta['format'] != _storage_format():
+                return None
+            tests: t.Dict[str, Test] = {}
+            for test_meta in meta['tests']:
+                test = Test(
+                    test_meta['name'], EventStore(), test_meta['status'], test_meta['err'],
+                    set(NODE_SYMBOLS.canonical(node_id) for node_id in test_meta['node_ids']),
+                    source=None if test_meta['source'] is None else TestSource(log_path, *test_meta['source']),
+                    events_loaded=test_meta['columns'] is not None
+                )
+                if test.events_loaded:
+                    columns = [f.read(size) for size in test_meta['columns']]
+                    if [len(column) for column in columns] != test_meta['columns']:
+                        raise ValueError('cache file is truncated')
+                    test.events = EventStore.from_columns(
+                        columns, meta['node_symbols'], meta['msg_type_symbols']
+                    )
+                tests[test.name] = test
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f'Can not load parse cache: {e}')
+        return None
+    if len(tests) == 0:
+        return None
+    return tests
@@ -0,0 +1,113 @@
+import json
+import re
+import typing as t
+from array import array
+
+from components.internal.util import EventStore, NODE_SYMBOLS
+
+# Inverted index of event payloads: token -> sorted indices of events.
+# Payload of message is its type and msg.data, other events are indexed without
+# their time and nodes (nodes are columns of EventStore).
+# Tokens of value at keys path a.b.c are: keys (a, b, c), the path,
+# the value with its words and pairs c=value, a.b.c=value.
+# Query is tokens separated by spaces, events with all of them are found.
+# Tokens and queries are case insensitive.
+
+WORD_RE = re.compile(r'\w+')
+NOT_INDEXED_KEYS = {'ts', 'src', 'dst', 'node'}
+
+
+def _scalar_text(value: t.Any) -> str:
+    if isinstance(value, str):
+        return value.lower()
+    if value is None:
+        return 'null'
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    return str(value)
+
+
+class PayloadIndex:
+    def __init__(self) -> None:
+        self.count = 0  # first events of store are indexed
+        self._postings: t.Dict[str, array] = {}
+
+    def extend(self, events: EventStore, count: int):
+        # may run in background thread: events before count are not changed anymore
+        for idx in range(self.count, min(count, len(events))):
+            payload = events.payload[events.payload_offsets[idx]:events.payload_offsets[idx + 1]]
+            if not payload:
+                continue  # test end
+            data = json.loads(bytes(payload))['data']
+            tokens: t.Set[str] = set()
+            if 'msg' in data:
+                tokens.add(data['msg']['type'].lower())
+                self._collect_tokens(data['msg'].get('data'), '', '', tokens)
+            else:
+                self._collect_tokens(
+                    {key: value for key, value in data.items() if key not in NOT_INDEXED_KEYS}, '', '', tokens
+                )
+            for token in tokens:
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = array('I')
+                posting.append(idx)
+        self.count = max(self.count, count)
+
+    def _collect_tokens(self, value: t.Any, path: str, key: str, tokens: t.Set[str]):
+        # path of value is 'a.b.c' (empty for root), key is the last one ('c')
+        if isinstance(value, dict):
+            for item_key, item in value.items():
+                item_key = item_key.lower()
+                item_path = f'{path}.{item_key}' if path else item_key
+                tokens.add(item_key)
+                tokens.add(item_path)
+                if isinstance(item, (dict, list)):
+                    self._collect_tokens(item, item_path, item_key, tokens)
+                else:
+                    text = _scalar_text(item)
+                    tokens.add(text)
+                    tokens.add(f'{item_key}={text}')
+                    if item_path != item_key:
+                        tokens.add(f'{item_path}={text}')
+                    if isinstance(item, str):
+                        tokens.update(WORD_RE.findall(text))
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, (dict, list)):
+                    self._collect_tokens(item, path, key, tokens)
+                else:
+                    text = _scalar_text(item)
+                    tokens.add(text)
+                    if key:
+                        tokens.add(f'{key}={text}')
+                        if path != key:
+                            tokens.add(f'{path}={text}')
+                    if isinstance(item, str):
+                        tokens.update(WORD_RE.findall(text))
+        elif value is not None:
+            text = _scalar_text(value)
+            tokens.add(text)
+            if isinstance(value, str):
+                tokens.update(WORD_RE.findall(text))
+
+    def search(self, query: str) -> array:
+        postings = [self._postings.get(token, array('I')) for token in query.lower().split()]
+        if not postings:
+            return array('I')
+        postings.sort(key=len)
+        others = [set(posting) for posting in postings[1:]]
+        return array('I', (idx for idx in postings[0] if all(idx in other for other in others)))
+
+
+def hits_by_node(events: EventStore, indices: t.Iterable[int]) -> t.Dict[str, int]:
+    # events of a node are ones it sends, receives or happens at
+    counters: t.Dict[int, int] = {}
+    for idx in indices:
+        src, dst = events.src[idx], events.dst[idx]
+        counters[dst] = counters.get(dst, 0) + 1
+        if src != dst:
+            counters[src] = counters.get(src, 0) + 1
+    return {
+        NODE_SYMBOLS[node]: counter for node, counter in counters.items() if node != EventStore.NO_NODE
+    }
@@ -0,0 +1,89 @@
+import bisect
+import typing as t
+from array import array
+
+from components.internal.clusterstate import ClusterState
+from components.internal.util import EventStore, EVENT_TYPE_CODES, NODE_SYMBOLS, SymbolTable
+
+from components.static.const import EventType, SNAPSHOT_INTERVAL
+
+# Display state after first N events of test is:
+# - persistent state: crosses of crashed nodes, transparency of disconnected
+#   nodes (ClusterState) and records in node info, it is kept in snapshots
+# - transient state of the last event (line, border, icons), it is restored
+#   by showing the last events again
+# so seeking to any event is: nearest snapshot + few events.
+
+_CODE = EVENT_TYPE_CODES
+# events which add record to node info of their 'src', 'dst' or 'node'
+_INFO_OF_SRC = {_CODE[EventType.MESSAGE_SEND], _CODE[EventType.LINK_ENABLED], _CODE[EventType.LINK_DISABLED]}
+_INFO_OF_DST = {
+    _CODE[event_type] for event_type in [
+        EventType.MESSAGE_RECEIVE, EventType.LOCAL_MESSAGE_SEND, EventType.LOCAL_MESSAGE_RECEIVE,
+        EventType.TIMER_FIRED, EventType.NODE_RECOVERED, EventType.NODE_RESTARTED,
+        EventType.NODE_CRASHED, EventType.NODE_CONNECTED, EventType.NODE_DISCONNECTED,
+        EventType.LINK_ENABLED, EventType.LINK_DISABLED
+    ]
+}
+_PARTITION = _CODE[EventType.NETWORK_PARTITION]
+
+
+class DisplaySnapshots:
+    # Snapshots of test state taken every SNAPSHOT_INTERVAL events.
+    # They are built lazily up to the furthest requested event,
+    # events of test can only be appended (follow mode), so built ones stay valid.
+    def __init__(self, events: EventStore) -> None:
+        self._events = events
+        self._snapshots: t.List[ClusterState] = [ClusterState(undoable=False)]  # [k] - after k * interval events
+        self._last = ClusterState(undoable=False)  # after self._applied events
+        self._applied = 0
+        # node symbol -> sorted indices of events in its node info
+        self._node_info_events: t.Dict[int, array] = {}
+
+    def state_at(self, event_idx: int, undoable: bool = False) -> ClusterState:
+        # state after first event_idx events
+        event_idx = min(event_idx, len(self._events))
+        self._build(event_idx)
+        snapshot_idx = event_idx // SNAPSHOT_INTERVAL
+        state = self._snapshots[snapshot_idx].copy(undoable)
+        for idx in range(snapshot_idx * SNAPSHOT_INTERVAL, event_idx):
+            state.apply_at(self._events, idx)
+        return state
+
+    def node_info_events(self, node_id: str, event_idx: int) -> t.Sequence[int]:
+        # indices of events in node info after first event_idx events
+        self._build(event_idx)
+        info_events = self._node_info_events.get(NODE_SYMBOLS.symbol_of(node_id), array('I'))
+        return info_events[:bisect.bisect_left(info_events, event_idx)]
+
+    def build_more(self, events_count: int) -> bool:
+        # builds snapshots for next events_count events, returns False when all events are done
+        self._build(self._applied + events_count)
+        return self._applied < len(self._events)
+
+    def _build(self, event_idx: int):
+        event_idx = min(event_idx, len(self._events))
+        while self._applied < event_idx:
+            self._last.apply_at(self._events, self._applied)
+            self._index_info(self._applied)
+            self._applied += 1
+            if self._applied % SNAPSHOT_INTERVAL == 0:
+                self._snapshots.append(self._last.copy(undoable=False))
+
+    def _index_info(self, idx: int):
+        type_code = self._events.types[idx]
+        if type_code in _INFO_OF_SRC:
+            self._add_info_event(self._events.src[idx], idx)
+        if type_code in _INFO_OF_DST:
+            self._add_info_event(self._events.dst[idx], idx)
+        if type_code == _PARTITION:
+            data = self._events[idx].data
+            for node_id in [*data['group1'], *data['group2']]:
+                self._add_info_event(NODE_SYMBOLS.intern(node_id), idx)
+
+    def _add_info_event(self, node: int, idx: int):
+        if node == SymbolTable.NO_SYMBOL:
+            return
+        if node not in self._node_info_events:
+            self._node_info_events[node] = array('I')
+        self._node_info_events[node].append(idx)
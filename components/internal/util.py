@@ -1,9 +1,15 @@
+import bisect
 import json
+import re
+import threading
 import typing as t
+from array import array
+from collections import OrderedDict
+from itertools import chain
 from dataclasses import dataclass, asdict, field
 from PySide2 import QtWidgets
 
-from components.static.const import EventType
+from components.static.const import EventType, PLAYBACK_BASE_EVENTS_PER_SECOND, MATERIALIZED_EVENTS_CACHE_SIZE
 
 @dataclass
 class Serializable:
@@ -27,7 +33,9 @@ class Event:
     idx: int
 
     @staticmethod
-    def from_json(json_event: str, idx: int):
+    def from_json(json_event: t.Union[str, bytes, memoryview], idx: int):
+        if isinstance(json_event, memoryview):
+            json_event = json_event.tobytes()  # json can not decode buffers
         parsed = json.loads(json_event)
         assert parsed['type'] in Event.EVENT_TYPES, f'Got unexpected event type: {parsed["type"]}'
         return Event(
@@ -46,21 +54,516 @@ class Event:
         return self.to_json()
 
 
+EVENT_TYPE_CODES: t.Dict[str, int] = {
+    event_type.value: code for code, event_type in enumerate(EventType)
+}
+EVENT_TYPE_BY_CODE: t.List[EventType] = list(EventType)
+
+
+class SymbolTable:
+    # Dense numbers of repeated strings (node ids, msg types).
+    # One table is shared by all tests of the session (see NODE_SYMBOLS),
+    # so every string is stored once and compared as int.
+    NO_SYMBOL = -1
+
+    def __init__(self) -> None:
+        self.values: t.List[str] = []
+        self._ids: t.Dict[str, int] = {}
+        self._lock = threading.Lock()  # log files are parsed in threads
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, symbol: int) -> str:
+        return self.values[symbol]
+
+    def intern(self, value: t.Optional[str]) -> int:
+        if value is None:
+            return self.NO_SYMBOL
+        symbol = self._ids.get(value)
+        if symbol is None:
+            with self._lock:
+                symbol = self._ids.get(value)
+                if symbol is None:
+                    symbol = len(self.values)
+                    self.values.append(value)
+                    self._ids[value] = symbol
+        return symbol
+
+    def symbol_of(self, value: str) -> int:
+        # NO_SYMBOL if value was never interned
+        return self._ids.get(value, self.NO_SYMBOL)
+
+    def canonical(self, value: str) -> str:
+        # the same string object for equal values
+        return self.values[self.intern(value)]
+
+    def remap(self, values: t.List[str]) -> t.Optional[t.List[int]]:
+        # symbols in this table of values of another table (by their symbols),
+        # None if they are the same
+        symbols = [self.intern(value) for value in values]
+        return None if symbols == list(range(len(symbols))) else symbols
+
+
+NODE_SYMBOLS = SymbolTable()
+MSG_TYPE_SYMBOLS = SymbolTable()
+
+
+def remap_symbols(column: array, symbols: t.Optional[t.List[int]]):
+    if symbols is None:
+        return
+    column[:] = array(column.typecode, [
+        symbols[symbol] if symbol != SymbolTable.NO_SYMBOL else symbol for symbol in column
+    ])
+
+
+class DeferredMsg(dict):
+    # 'msg' of event with not decoded 'data': raw json of msg data
+    # (json_event[data_begin:data_end]) is decoded on first access and memoized.
+    # If it is not a json value, msg is taken from the whole event.
+    def __init__(self, msg_type: str, json_event: bytes, data_begin: int, data_end: int) -> None:
+        dict.__init__(self, type=msg_type)
+        self._json_event = json_event
+        self._data_begin = data_begin
+        self._data_end = data_end
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._json_event is None
+
+    def has_data(self) -> bool:
+        # data is not an empty object or array, json viewer shows children of msg without decoding it
+        if self._json_event is None:
+            data = dict.get(self, 'data')
+            return len(data) > 0 if isinstance(data, (dict, list)) else data is not None
+        if self._json_event[self._data_begin] == ord('"') or self._data_end - self._data_begin > 16:
+            return True
+        return bool(self._json_event[self._data_begin + 1:self._data_end - 1].strip())
+
+    def _decode(self):
+        if self._json_event is None:
+            return
+        try:
+            self['data'] = json.loads(self._json_event[self._data_begin:self._data_end])
+        except json.JSONDecodeError:
+            # msg has fields after data
+            dict.update(self, json.loads(self._json_event)['data']['msg'])
+        self._json_event = None
+
+    def __missing__(self, key):
+        self._decode()
+        return dict.__getitem__(self, key)
+
+    # everything except msg['type'] needs decoded data
+
+    def get(self, key, default=None):
+        self._decode()
+        return dict.get(self, key, default)
+
+    def keys(self):
+        self._decode()
+        return dict.keys(self)
+
+    def values(self):
+        self._decode()
+        return dict.values(self)
+
+    def items(self):
+        # also used by json encoder
+        self._decode()
+        return dict.items(self)
+
+    def copy(self):
+        self._decode()
+        return dict(self)
+
+    def __iter__(self):
+        self._decode()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._decode()
+        return dict.__len__(self)
+
+    def __contains__(self, key):
+        self._decode()
+        return dict.__contains__(self, key)
+
+    def __eq__(self, other):
+        self._decode()
+        if isinstance(other, DeferredMsg):
+            other._decode()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        self._decode()
+        return dict.__repr__(self)
+
+
+class DeferredMsgData:
+    # 'data' of msg for json viewer, msg is decoded only when data is shown
+    def __init__(self, msg: t.Dict[str, t.Any]) -> None:
+        self._msg = msg
+
+    def has_data(self) -> bool:
+        if isinstance(self._msg, DeferredMsg):
+            return self._msg.has_data()
+        data = self._msg.get('data')
+        return len(data) > 0 if isinstance(data, (dict, list)) else data is not None
+
+    def value(self) -> t.Any:
+        return self._msg['data']
+
+
+# Header of message event: type of event, type of msg and start of msg data
+EVENT_MSG_HEAD_RE = re.compile(
+    rb'^\s*\{\s*"type"\s*:\s*"(\w+)"\s*,\s*"data"\s*:\s*\{\s*'
+    rb'"msg"\s*:\s*\{\s*"type"\s*:\s*"([^"\\]*)"\s*,\s*"data"\s*:'
+)
+# Tail of message event: end of msg and fields of event after it
+EVENT_MSG_TAIL_RE = re.compile(
+    rb'\}\s*,\s*(?:"src"\s*:\s*"([^"\\]*)"\s*,\s*)?"dst"\s*:\s*"([^"\\]*)"\s*,\s*'
+    rb'"ts"\s*:\s*(-?[0-9][0-9.eE+-]*)\s*\}\s*\}\s*$'
+)
+MSG_TAIL_WINDOW = 256
+DEFERRED_MSG_MIN_SIZE = 1024  # of event json
+# deferred msg data is an object, an array or a string: (first byte, last byte)
+DEFERRED_DATA_BOUNDS = {ord('{'): ord('}'), ord('['): ord(']'), ord('"'): ord('"')}
+JSON_WHITESPACE = b' \t\n\r'
+
+
+def _deferred_data_bounds(json_event: bytes, begin: int, end: int) -> t.Optional[t.Tuple[int, int]]:
+    # [begin, end) of msg data without whitespace if it looks like one object, array or string,
+    # msg with fields after data (data is not the whole slice) is not deferred
+    while begin < end and json_event[begin] in JSON_WHITESPACE:
+        begin += 1
+    while end > begin and json_event[end - 1] in JSON_WHITESPACE:
+        end -= 1
+    if end - begin < 2 or DEFERRED_DATA_BOUNDS.get(json_event[begin]) != json_event[end - 1]:
+        return None
+    return begin, end
+
+
+def decode_event_header(json_event: bytes) -> t.Tuple[str, t.Dict[str, t.Any]]:
+    # Returns (event type, event data) where msg data (if any) is not decoded.
+    # Messages in log are written by the same serializer, so their header
+    # and tail are matched directly. Anything else is decoded as usual.
+    # small events are decoded faster by json itself
+    head = EVENT_MSG_HEAD_RE.match(json_event) if len(json_event) >= DEFERRED_MSG_MIN_SIZE else None
+    if head is not None:
+        # tail is short, try to find it at the end of line first
+        tail = EVENT_MSG_TAIL_RE.search(json_event, max(head.end(), len(json_event) - MSG_TAIL_WINDOW))
+        if tail is None:
+            tail = EVENT_MSG_TAIL_RE.search(json_event, head.end())
+        bounds = None if tail is None else _deferred_data_bounds(json_event, head.end(), tail.start())
+        if bounds is not None and head.group(1).decode() in EVENT_TYPE_CODES:
+            data = {'msg': DeferredMsg(head.group(2).decode(), json_event, *bounds)}
+            if tail.group(1) is not None:
+                data['src'] = tail.group(1).decode()
+            data['dst'] = tail.group(2).decode()
+            data['ts'] = json.loads(tail.group(3))
+            return head.group(1).decode(), data
+    parsed = json.loads(json_event)
+    assert parsed['type'] in EVENT_TYPE_CODES, f'Got unexpected event type: {parsed["type"]}'
+    return parsed['type'], parsed['data']
+
+
 def make_test_end_event(idx: int):
     return Event(EventType.TEST_END, {}, idx)
 
 
+@dataclass
+class EventFilter:
+    # shown events have one of types (all types if empty) and match all given nodes and msg type
+    types: t.FrozenSet[str] = frozenset()
+    src: t.Optional[str] = None
+    dst: t.Optional[str] = None
+    node: t.Optional[str] = None  # src or dst
+    msg_type: t.Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return self == EventFilter()
+
+
+class EventPostings:
+    # Sorted indices of events (posting lists) by type, node and msg type of EventStore.
+    # Lists are extended with events appended to store since the last time.
+    def __init__(self) -> None:
+        self.count = 0  # first events of store are in lists
+        self.by_type: t.Dict[int, array] = {}
+        self.by_src: t.Dict[int, array] = {}
+        self.by_dst: t.Dict[int, array] = {}
+        self.by_node: t.Dict[int, array] = {}  # src or dst
+        self.by_msg_type: t.Dict[int, array] = {}
+
+    def extend(self, events: 'EventStore', count: int):
+        count = min(count, len(events))
+        types, src, dst, msg_types = events.types, events.src, events.dst, events.msg_types
+        by_type, by_src, by_dst, by_node, by_msg_type = (
+            self.by_type, self.by_src, self.by_dst, self.by_node, self.by_msg_type
+        )
+        for idx in range(self.count, count):
+            for postings, key in (
+                    (by_type, types[idx]), (by_src, src[idx]), (by_dst, dst[idx]),
+                    (by_node, dst[idx]), (by_msg_type, msg_types[idx])):
+                posting = postings.get(key)
+                if posting is None:
+                    posting = postings[key] = array('I')
+                posting.append(idx)
+            if src[idx] != dst[idx]:
+                posting = by_node.get(src[idx])
+                if posting is None:
+                    posting = by_node[src[idx]] = array('I')
+                posting.append(idx)
+        self.count = max(self.count, count)
+
+
+class EventStore:
+    # Columnar storage of test events: numbers are kept in arrays,
+    # raw json of event is kept in one payload buffer.
+    # Event objects are created only on access (events[idx]).
+    NO_NODE = SymbolTable.NO_SYMBOL
+
+    def __init__(self) -> None:
+        self.types = array('B')  # EVENT_TYPE_CODES
+        self.timestamps = array('d')
+        # symbols of NODE_SYMBOLS: src is 'src' of event,
+        # dst is 'dst' or 'node' of event (the node event happens at)
+        self.src = array('i')
+        self.dst = array('i')
+        self.msg_types = array('i')  # symbols of MSG_TYPE_SYMBOLS
+        self.payload_offsets = array('Q', [0])  # event i: payload[offsets[i]:offsets[i + 1]]
+        self.payload = bytearray()
+        self._postings = EventPostings()  # built lazily, not saved
+        # last accessed events with their memoized msg data, not saved
+        self._materialized: 'OrderedDict[int, Event]' = OrderedDict()
+
+    def __len__(self):
+        return len(self.types)
+
+    def columns(self) -> t.List[t.Union[array, bytearray]]:
+        # raw storage, used to save store to parse cache
+        return [
+            self.types, self.timestamps, self.src, self.dst, self.msg_types,
+            self.payload_offsets, self.payload
+        ]
+
+    @classmethod
+    def from_columns(
+            cls, columns: t.List[bytes],
+            node_symbols: t.List[str], msg_type_symbols: t.List[str]) -> 'EventStore':
+        # *_symbols are values of symbol tables the columns were saved with
+        store = cls()
+        for column, data in zip(store.columns(), columns):
+            if isinstance(column, array):
+                del column[:]
+                column.frombytes(data)
+            else:
+                column += data
+        store._remap(node_symbols, msg_type_symbols)
+        return store
+
+    def _remap(self, node_symbols: t.List[str], msg_type_symbols: t.List[str]):
+        node_remap = NODE_SYMBOLS.remap(node_symbols)
+        remap_symbols(self.src, node_remap)
+        remap_symbols(self.dst, node_remap)
+        remap_symbols(self.msg_types, MSG_TYPE_SYMBOLS.remap(msg_type_symbols))
+
+    def __getstate__(self):
+        # symbol tables of process the store is sent from (process pool)
+        store_dict = {
+            key: value for key, value in self.__dict__.items() if key not in ('_postings', '_materialized')
+        }
+        return store_dict, NODE_SYMBOLS.values, MSG_TYPE_SYMBOLS.values
+
+    def __setstate__(self, state):
+        store_dict, node_symbols, msg_type_symbols = state
+        self.__dict__.update(store_dict)
+        self._postings = EventPostings()
+        self._materialized = OrderedDict()
+        self._remap(node_symbols, msg_type_symbols)
+
+    def __getitem__(self, idx: int) -> Event:
+        if idx < 0:
+            idx += len(self.types)
+        if not 0 <= idx < len(self.types):
+            raise IndexError('event index out of range')
+        # the same event is asked by event list, node info and payload viewer
+        event = self._materialized.get(idx)
+        if event is not None:
+            self._materialized.move_to_end(idx)
+            return event
+        event = self._materialize(idx)
+        self._materialized[idx] = event
+        if len(self._materialized) > MATERIALIZED_EVENTS_CACHE_SIZE:
+            self._materialized.popitem(last=False)
+        return event
+
+    def _materialize(self, idx: int) -> Event:
+        if self.types[idx] == EVENT_TYPE_CODES[EventType.TEST_END]:
+            return make_test_end_event(idx)
+        event_type, data = decode_event_header(
+            bytes(self.payload[self.payload_offsets[idx]:self.payload_offsets[idx + 1]])
+        )
+        # shared strings instead of just decoded ones
+        if 'src' in data:
+            data['src'] = NODE_SYMBOLS[self.src[idx]]
+        if 'dst' in data:
+            data['dst'] = NODE_SYMBOLS[self.dst[idx]]
+        elif 'node' in data:
+            data['node'] = NODE_SYMBOLS[self.dst[idx]]
+        if 'msg' in data:
+            data['msg']['type'] = MSG_TYPE_SYMBOLS[self.msg_types[idx]]
+        return Event(event_type, data, idx)
+
+    def __iter__(self) -> t.Iterator[Event]:
+        for idx in range(len(self.types)):
+            yield self[idx]
+
+    def append_raw(self, json_event: t.Union[bytes, memoryview]):
+        # json_event is a line of log, only its header is decoded here
+        if isinstance(json_event, memoryview):
+            json_event = json_event.tobytes()
+        event_type, data = decode_event_header(json_event)
+        self._append(event_type, data, json_event)
+
+    def append(self, event: Event):
+        payload = b'' if event.type == EventType.TEST_END else event.to_json().encode()
+        self._append(event.type, event.data, payload)
+
+    def _append(self, event_type: str, data: t.Dict[str, t.Any], payload: bytes):
+        self.types.append(EVENT_TYPE_CODES[event_type])
+        if 'ts' in data:
+            self.timestamps.append(data['ts'])
+        else:
+            # keep timestamps sorted for events without time (test end)
+            self.timestamps.append(self.timestamps[-1] if self.timestamps else 0.)
+        self.src.append(NODE_SYMBOLS.intern(data.get('src')))
+        self.dst.append(NODE_SYMBOLS.intern(data.get('dst', data.get('node'))))
+        self.msg_types.append(
+            MSG_TYPE_SYMBOLS.intern(data['msg']['type']) if 'msg' in data else SymbolTable.NO_SYMBOL
+        )
+        self.payload += payload
+        self.payload_offsets.append(len(self.payload))
+
+    ##### QUERIES ###
+    def type_of(self, idx: int) -> EventType:
+        return EVENT_TYPE_BY_CODE[self.types[idx]]
+
+    def postings(self) -> EventPostings:
+        self._postings.extend(self, len(self.types))
+        return self._postings
+
+    def index_more(self, events_count: int) -> bool:
+        # extends posting lists by next events_count events (in background), returns False when all events are done
+        self._postings.extend(self, self._postings.count + events_count)
+        return self._postings.count < len(self.types)
+
+    def indices_of_type(self, event_type: str) -> t.List[int]:
+        return list(self.postings().by_type.get(EVENT_TYPE_CODES[event_type], ()))
+
+    def indices_of_node(self, node_id: str) -> t.List[int]:
+        node = NODE_SYMBOLS.symbol_of(node_id)
+        if node == self.NO_NODE:
+            return []
+        return list(self.postings().by_node.get(node, ()))
+
+    def indices_of_msg_type(self, msg_type: str) -> t.List[int]:
+        msg_type_symbol = MSG_TYPE_SYMBOLS.symbol_of(msg_type)
+        if msg_type_symbol == SymbolTable.NO_SYMBOL:
+            return []
+        return list(self.postings().by_msg_type.get(msg_type_symbol, ()))
+
+    def node_ids(self) -> t.List[str]:
+        return [NODE_SYMBOLS[node] for node in self.postings().by_node if node != self.NO_NODE]
+
+    def msg_types_of_events(self) -> t.List[str]:
+        return [
+            MSG_TYPE_SYMBOLS[msg_type] for msg_type in self.postings().by_msg_type
+            if msg_type != SymbolTable.NO_SYMBOL
+        ]
+
+    def indices_of_filter(self, event_filter: EventFilter) -> array:
+        # posting lists of filter are intersected: the shortest one is walked,
+        # other constraints are checked by columns of its events
+        postings = self.postings()
+        if event_filter.types:
+            type_codes = {EVENT_TYPE_CODES[event_type] for event_type in event_filter.types}
+            # lists of different types do not intersect
+            by_types = array('I', sorted(chain.from_iterable(
+                postings.by_type.get(code, ()) for code in type_codes
+            )))
+        else:
+            type_codes = None
+            by_types = None
+        constraints: t.List[t.Tuple[t.Sequence[int], t.Callable[[int], bool]]] = []
+        if by_types is not None:
+            types = self.types
+            constraints.append((by_types, lambda idx: types[idx] in type_codes))
+        for value, symbols, by_symbol, column in (
+                (event_filter.src, NODE_SYMBOLS, postings.by_src, self.src),
+                (event_filter.dst, NODE_SYMBOLS, postings.by_dst, self.dst),
+                (event_filter.msg_type, MSG_TYPE_SYMBOLS, postings.by_msg_type, self.msg_types)):
+            if value is not None:
+                symbol = symbols.symbol_of(value)
+                constraints.append((
+                    by_symbol.get(symbol, ()),
+                    lambda idx, column=column, symbol=symbol: column[idx] == symbol
+                ))
+        if event_filter.node is not None:
+            node = NODE_SYMBOLS.symbol_of(event_filter.node)
+            src, dst = self.src, self.dst
+            constraints.append((
+                postings.by_node.get(node, ()),
+                lambda idx: src[idx] == node or dst[idx] == node
+            ))
+        if not constraints:
+            return array('I', range(len(self.types)))
+        constraints.sort(key=lambda constraint: len(constraint[0]))
+        indices: t.Iterable[int] = constraints[0][0]
+        for _, check in constraints[1:]:
+            indices = filter(check, indices)
+        return array('I', indices)
+
+    def count_by_type(self) -> t.Dict[EventType, int]:
+        counters = [0] * len(EVENT_TYPE_BY_CODE)
+        for type_code in self.types:
+            counters[type_code] += 1
+        return {
+            EVENT_TYPE_BY_CODE[code]: counter for code, counter in enumerate(counters) if counter
+        }
+
+    def seek_ts(self, ts: float) -> int:
+        # index of the first event at or after ts
+        return bisect.bisect_left(self.timestamps, ts)
+
+
+@dataclass
+class TestSource:
+    # [begin, end) byte range of test events in the log file
+    path: str
+    begin: int
+    end: int
+
+
 @dataclass
 class Test:
     class Status:
         PASSED = "PASSED"
         FAILED = "FAILED"
+        RUNNING = "RUNNING"  # TEST_END is not written yet (follow mode)
 
     name: int
-    events: t.List[Event]
+    events: EventStore
     status: Status = None
     err: t.Optional[str] = None
     node_ids: t.Set[str] = field(default_factory=set)
+    source: t.Optional[TestSource] = None  # set when events are loaded lazily
+    events_loaded: bool = True
+    log_path: t.Optional[str] = None  # log file (shard) of the test
 
     def to_json(self, indent=None):
         return json.dumps({
@@ -90,7 +593,23 @@ class TestDebugData:
 
 @dataclass
 class DebuggerSettings(Serializable):
-    next_step_delay: int = 200
+    playback_speed: int = 1  # multiplier of PLAYBACK_BASE_EVENTS_PER_SECOND
+    # last stepped events which keep undo info and node info records,
+    # older ones are restored from snapshots and event store when needed
+    live_steps: int = 1000
+
+    @classmethod
+    def deserialize(cls, data: t.Dict[t.Any, t.Any]):
+        # settings file of older version can have other fields (next_step_delay)
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+    def events_per_second(self) -> float:
+        return PLAYBACK_BASE_EVENTS_PER_SECOND * self.playback_speed
+
+    @property
+    def next_step_delay(self) -> float:
+        # time of one event while running (ms), animations of events take this time
+        return 1000 / self.events_per_second()
 
 
 class FramedGroup(QtWidgets.QFrame):
@@ -9,15 +9,38 @@ SETTINGS_PATH = f'{STATIC_PATH}/settings.json'
 
 EVENT_STEP_TO_ANIM_STEP_RATIO = 10  # TODO: add this parameter to debsettings?
 ENVELOPE_STEPS_COUNT = EVENT_STEP_TO_ANIM_STEP_RATIO - 1
+ANIMATION_FRAME_MS = 16  # shortest tick of animation clock, faster steps are done several per tick
+# distance between nodes in layouts in node icon sizes: room for label and state icons around node
+NODE_LAYOUT_SPACING = (2.5, 2.0)
 
-MIN_STEP_DELAY_MS = 0
-MAX_STEP_DELAY_MS = 2000
+PLAYBACK_FRAME_MS = 33  # ~30 frames per second while running
+PLAYBACK_BASE_EVENTS_PER_SECOND = 5  # events per second at speed x1
+PLAYBACK_SPEEDS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+PLAYBACK_STEPS_PER_FRAME = 3  # more events per frame are skipped without their widgets
+
+FOLLOW_POLL_INTERVAL_MS = 500  # how often log file is checked for new lines in follow mode
+FOLLOW_READ_CHUNK_SIZE = 1 << 20  # bytes of followed log read at once
+SEARCH_POLL_INTERVAL_MS = 100  # how often background indexing of payloads is checked
+LAYOUT_POLL_INTERVAL_MS = 100  # how often background computation of traffic layout is checked
+TRAFFIC_LAYOUT_ITERATIONS = 300  # max power iterations per eigenvector of traffic graph
+TRAFFIC_LAYOUT_MAX_NODES = 10000  # nodes of larger clusters stay in id order
+
+SNAPSHOT_INTERVAL = 1000  # events between display snapshots, used for seeking
+SEEK_MATERIALIZED_EVENTS = 40  # last events shown in event menu after seeking
+LIVE_STEPS_RANGE = (100, 100000)  # choices of stepped events kept with undo info and node info records
+SKIP_EVENTS_COUNTS = [100, 1000, 10000]  # choices of skip buttons
+TIMELINE_STEPS = 10000  # positions of timeline slider
+SNAPSHOT_BUILD_CHUNK = 2000  # events added to snapshots in background per event loop iteration
+MATERIALIZED_EVENTS_CACHE_SIZE = 512  # last accessed events kept decoded by EventStore
 
 # ENUMS
 class NodePlotRule(int, Enum):
     CIRCLE = 0
     ROW = 1
     COLUMN = 2
+    GRID = 3
+    RINGS = 4  # concentric rings, inner ones are filled first
+    TRAFFIC = 5  # grid where communicating nodes are close, computed from messages of test
 
 class EventType(str, Enum):
     MESSAGE_SEND = 'MessageSend'
@@ -39,6 +62,15 @@ class EventType(str, Enum):
     # additional type for internal process
     TEST_END = "TestEnd"
 
+class StateChangeKind(str, Enum):
+    # key of change in ClusterState
+    CRASH_COUNTER = 'CrashCounter'  # node id
+    DISCONNECT_COUNTER = 'DisconnectCounter'  # node id
+    LINK = 'Link'  # (src, dst), value is True if link is enabled
+    PARTITION = 'Partition'  # None, value is (group1, group2) or None
+    MESSAGE_SENT = 'MessageSent'  # (src, dst, msg type), value is index of send event
+    MESSAGE_DONE = 'MessageDone'  # same as MESSAGE_SENT, message is received, dropped or discarded
+
 class MsgBoxColors(str, Enum):
     GREEN = 'green'
     YELLOW = '#F98800'
@@ -40,6 +40,9 @@ QPushButton:pressed#PASSED {
 QPushButton:pressed#FAILED {
     background-color: red;
 }
+QPushButton:pressed#RUNNING {
+    background-color: #F98800;
+}
 
 QScrollArea#PASSED {
     border: 3px solid green;
@@ -49,6 +52,10 @@ QScrollArea#FAILED {
     border: 3px solid red;
     border-radius: 3px;
 }
+QScrollArea#RUNNING {
+    border: 3px solid #F98800;
+    border-radius: 3px;
+}
 
 QScrollBar:vertical {
     background: white;
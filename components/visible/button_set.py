@@ -2,15 +2,19 @@ import typing as t
 
 from PySide2 import QtCore, QtWidgets, QtGui
 
+from components.static.const import SKIP_EVENTS_COUNTS
 from components.static.stylesheets import BUTTON_SET_STYLESHEET
 
 LAYOUT_GRID = {
+    'Q': (0, 0, 1, 1),
     'W': (0, 1, 1, 1),
+    'E': (0, 2, 1, 1),
     'R': (0, 3, 1, 1),
     'A': (1, 0, 1, 1),
     'S': (1, 1, 1, 1),
     'D': (1, 2, 1, 1),
     'C': (2, 2, 1, 1),
+    'skip count': (2, 0, 1, 1),
 }
 
 class ButtonSet(QtWidgets.QWidget):
@@ -25,6 +29,11 @@ class ButtonSet(QtWidgets.QWidget):
         self.run_or_stop_button = QtWidgets.QPushButton('(S)\nRun/Stop', self)
         self.clear_button = QtWidgets.QPushButton('(C)\nClear', self)
         self.run_back_button = QtWidgets.QPushButton('(W)\nRun back', self)
+        self.skip_back_button = QtWidgets.QPushButton('(Q)\n<<< Skip', self)
+        self.skip_button = QtWidgets.QPushButton('(E)\nSkip >>>', self)
+        self.skip_count_list = QtWidgets.QComboBox(self)
+        for count in SKIP_EVENTS_COUNTS:
+            self.skip_count_list.addItem(f'{count} events', count)
         self.setStyleSheet(BUTTON_SET_STYLESHEET)
 
         self.prev_button.setShortcut(QtGui.QKeySequence(QtCore.Qt.Key_A))
@@ -33,6 +42,8 @@ class ButtonSet(QtWidgets.QWidget):
         self.clear_button.setShortcut(QtGui.QKeySequence(QtCore.Qt.Key_C))
         self.run_back_button.setShortcut(QtGui.QKeySequence(QtCore.Qt.Key_W))
         self.run_or_stop_button.setShortcut(QtGui.QKeySequence(QtCore.Qt.Key_S))
+        self.skip_back_button.setShortcut(QtGui.QKeySequence(QtCore.Qt.Key_Q))
+        self.skip_button.setShortcut(QtGui.QKeySequence(QtCore.Qt.Key_E))
 
         self._button_set_layout.addWidget(self.run_back_button, *LAYOUT_GRID['W'])
         self._button_set_layout.addWidget(self.prev_button, *LAYOUT_GRID['A'])
@@ -40,6 +51,9 @@ class ButtonSet(QtWidgets.QWidget):
         self._button_set_layout.addWidget(self.run_or_stop_button, *LAYOUT_GRID['S'])
         self._button_set_layout.addWidget(self.next_button, *LAYOUT_GRID['D'])
         self._button_set_layout.addWidget(self.clear_button, *LAYOUT_GRID['C'])
+        self._button_set_layout.addWidget(self.skip_back_button, *LAYOUT_GRID['Q'])
+        self._button_set_layout.addWidget(self.skip_button, *LAYOUT_GRID['E'])
+        self._button_set_layout.addWidget(self.skip_count_list, *LAYOUT_GRID['skip count'])
 
         # self._button_set_layout.addWidget(self.run_back_button, alignment=QtCore.Qt.AlignLeft)
         # self._button_set_layout.addWidget(self.prev_button, alignment=QtCore.Qt.AlignLeft)
@@ -49,3 +63,6 @@ class ButtonSet(QtWidgets.QWidget):
         # self._button_set_layout.addWidget(self.clear_button, alignment=QtCore.Qt.AlignRight)
 
         self.setLayout(self._button_set_layout)
+
+    def get_skip_count(self) -> int:
+        return self.skip_count_list.currentData()
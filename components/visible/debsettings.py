@@ -2,7 +2,7 @@ from PySide2 import QtCore, QtWidgets, QtGui
 import typing as t
 import json
 
-from components.static.const import SETTINGS_PATH, MIN_STEP_DELAY_MS, MAX_STEP_DELAY_MS
+from components.static.const import SETTINGS_PATH, PLAYBACK_SPEEDS, LIVE_STEPS_RANGE
 from components.static.stylesheets import SETTINGS_EDITOR_STYLESHEET
 
 from components.internal.util import DebuggerSettings
@@ -20,14 +20,25 @@ class SettingsEditor(QtWidgets.QWidget):
         
         self._slider_box = QtWidgets.QGroupBox(self)
         self._slider_layout = QtWidgets.QVBoxLayout(self._slider_box)
-        self._nsd_slider_lbl = QtWidgets.QLabel(f'Next step delay: {self._settings.next_step_delay}', self)
-        self._next_step_delay_slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
-        self._next_step_delay_slider.setMinimum(MIN_STEP_DELAY_MS)
-        self._next_step_delay_slider.setMaximum(MAX_STEP_DELAY_MS)
-        self._next_step_delay_slider.setValue(self._settings.next_step_delay)
-        self._slider_layout.addWidget(self._nsd_slider_lbl, alignment=QtCore.Qt.AlignCenter)
-        self._slider_layout.addWidget(self._next_step_delay_slider, alignment=QtCore.Qt.AlignVCenter)
-        self._next_step_delay_slider.valueChanged.connect(self.slider_val_changed)
+        self._speed_slider_lbl = QtWidgets.QLabel(f'Playback speed: x{self._settings.playback_speed}', self)
+        # slider value is index in PLAYBACK_SPEEDS
+        self._speed_slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        self._speed_slider.setMinimum(0)
+        self._speed_slider.setMaximum(len(PLAYBACK_SPEEDS) - 1)
+        self._speed_slider.setValue(self._speed_idx(self._settings.playback_speed))
+        self._slider_layout.addWidget(self._speed_slider_lbl, alignment=QtCore.Qt.AlignCenter)
+        self._slider_layout.addWidget(self._speed_slider, alignment=QtCore.Qt.AlignVCenter)
+        self._speed_slider.valueChanged.connect(self.slider_val_changed)
+
+        self._live_steps_box = QtWidgets.QGroupBox(self)
+        self._live_steps_layout = QtWidgets.QHBoxLayout(self._live_steps_box)
+        self._live_steps_lbl = QtWidgets.QLabel('Steps kept live: ', self)
+        self._live_steps_spin = QtWidgets.QSpinBox(self)
+        self._live_steps_spin.setRange(*LIVE_STEPS_RANGE)
+        self._live_steps_spin.setSingleStep(LIVE_STEPS_RANGE[0])
+        self._live_steps_spin.setValue(self._settings.live_steps)
+        self._live_steps_layout.addWidget(self._live_steps_lbl)
+        self._live_steps_layout.addWidget(self._live_steps_spin)
 
         self._btn_layout = QtWidgets.QHBoxLayout()
         self._save_btn = QtWidgets.QPushButton('Save', self)
@@ -42,18 +53,23 @@ class SettingsEditor(QtWidgets.QWidget):
         self._reset_btn.clicked.connect(self.reset_settings)
 
         self._main_layout.addWidget(self._slider_box)
+        self._main_layout.addWidget(self._live_steps_box)
         self._main_layout.addLayout(self._btn_layout)
         self.setLayout(self._main_layout)
 
         self.setStyleSheet(SETTINGS_EDITOR_STYLESHEET)
     
+    @staticmethod
+    def _speed_idx(speed: int) -> int:
+        # the closest of PLAYBACK_SPEEDS
+        return min(range(len(PLAYBACK_SPEEDS)), key=lambda idx: abs(PLAYBACK_SPEEDS[idx] - speed))
+
     def slider_val_changed(self, value: int):
-        real_value = value - value % 10  # round value
-        self._next_step_delay_slider.setValue(real_value)
-        self._nsd_slider_lbl.setText(f'Next step delay: {real_value}')
+        self._speed_slider_lbl.setText(f'Playback speed: x{PLAYBACK_SPEEDS[value]}')
 
     def save(self):
-        self._settings.next_step_delay = self._next_step_delay_slider.value()
+        self._settings.playback_speed = PLAYBACK_SPEEDS[self._speed_slider.value()]
+        self._settings.live_steps = self._live_steps_spin.value()
         with open(SETTINGS_PATH, 'wt') as settings_file:
             json.dump(self._settings.serialize(), settings_file, indent=2)
         self.hide()
@@ -62,7 +78,8 @@ class SettingsEditor(QtWidgets.QWidget):
         self.show()
     
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
-        self._next_step_delay_slider.setValue(self._settings.next_step_delay)
+        self._speed_slider.setValue(self._speed_idx(self._settings.playback_speed))
+        self._live_steps_spin.setValue(self._settings.live_steps)
         return super().closeEvent(event)
     
     def get_settings(self):
@@ -72,4 +89,5 @@ class SettingsEditor(QtWidgets.QWidget):
         self._settings = DebuggerSettings()
         with open(SETTINGS_PATH, 'wt') as settings_file:
             json.dump(self._settings.serialize(), settings_file, indent=2)
-        self._next_step_delay_slider.setValue(self._settings.next_step_delay)
+        self._speed_slider.setValue(self._speed_idx(self._settings.playback_speed))
+        self._live_steps_spin.setValue(self._settings.live_steps)
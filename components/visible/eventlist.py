@@ -0,0 +1,390 @@
+from PySide2 import QtCore, QtWidgets, QtGui
+import bisect
+import typing as t
+from array import array
+
+from components.internal.util import EventStore, EventFilter
+from components.static.const import EventType
+
+# Event menu list is virtual: rows are indices of shown events in EventStore,
+# captions are made from columns of the store only when rows are painted.
+# Qt views lay out every row of model on each change, so the model has only
+# rows which fit in the view (window) and the list has its own scroll bar over all rows,
+# memory and time of changes do not depend on count of shown events.
+
+EVENT_IDX_ROLE = QtCore.Qt.UserRole
+EVENT_ROW_LINES = 2  # rows have the same height, captions have up to 2 lines
+EVENT_ROW_MARGIN = 4
+WHEEL_SCROLL_ROWS = 3
+
+
+class EventListModel(QtCore.QAbstractListModel):
+    # emitted when count of all rows (not only window ones) is changed
+    rows_count_changed = QtCore.Signal()
+
+    def __init__(
+            self, caption_of: t.Callable[[EventStore, int], str],
+            parent: t.Optional[QtCore.QObject] = None) -> None:
+        QtCore.QAbstractListModel.__init__(self, parent)
+        self._caption_of = caption_of
+        self._events = EventStore()
+        self._events_count = 0  # first events of store are shown
+        self._filter = EventFilter()
+        # indices of all events of store matching filter, shown rows are ones before events count
+        self._filter_rows: t.Optional[array] = None
+        self._filter_covered = 0  # events of store when filter rows were found
+        self._highlight: t.Dict[int, str] = {}  # event idx -> color of selected event
+        self._window_first = 0  # first row of all rows in window
+        self._window_size = 0
+
+    def set_events(self, events: EventStore):
+        self.beginResetModel()
+        self._events = events
+        self._events_count = 0
+        self._filter = EventFilter()
+        self._filter_rows = None
+        self._highlight.clear()
+        self.endResetModel()
+        self.rows_count_changed.emit()
+
+    def events_count(self) -> int:
+        return self._events_count
+
+    def set_events_count(self, events_count: int):
+        if events_count == self._events_count:
+            return
+        self.beginResetModel()
+        self._events_count = events_count
+        if self._filter_rows is not None and events_count > self._filter_covered:
+            self._find_filter_rows()  # events were appended to store (follow mode)
+        self.endResetModel()
+        self.rows_count_changed.emit()
+
+    def set_filter(self, event_filter: EventFilter):
+        self.beginResetModel()
+        self._filter = event_filter
+        if event_filter.is_empty():
+            self._filter_rows = None
+        else:
+            self._find_filter_rows()
+        self.endResetModel()
+        self.rows_count_changed.emit()
+
+    def _find_filter_rows(self):
+        self._filter_covered = len(self._events)
+        self._filter_rows = self._events.indices_of_filter(self._filter)
+
+    def all_rows_count(self) -> int:
+        if self._filter_rows is None:
+            return self._events_count
+        return bisect.bisect_left(self._filter_rows, self._events_count)
+
+    def set_window(self, first: int, size: int):
+        if (first, size) == (self._window_first, self._window_size):
+            return
+        self.beginResetModel()
+        self._window_first = first
+        self._window_size = size
+        self.endResetModel()
+
+    def set_highlight(self, event_idx: int, color: t.Optional[str]):
+        if color is None:
+            self._highlight.pop(event_idx, None)
+        else:
+            self._highlight[event_idx] = color
+        row = self.row_of(event_idx)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [QtCore.Qt.BackgroundRole])
+
+    def event_idx(self, row: int) -> int:
+        row += self._window_first
+        return row if self._filter_rows is None else self._filter_rows[row]
+
+    def row_of(self, event_idx: int) -> t.Optional[int]:
+        # row of event in window
+        if self._filter_rows is None:
+            row = event_idx if event_idx < self._events_count else None
+        else:
+            row = bisect.bisect_left(self._filter_rows, event_idx)
+            if row == len(self._filter_rows) or self._filter_rows[row] != event_idx or event_idx >= self._events_count:
+                row = None
+        if row is None or not 0 <= row - self._window_first < self.rowCount():
+            return None
+        return row - self._window_first
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return max(0, min(self._window_size, self.all_rows_count() - self._window_first))
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        event_idx = self.event_idx(index.row())
+        if role == QtCore.Qt.DisplayRole:
+            return self._caption_of(self._events, event_idx)
+        if role == EVENT_IDX_ROLE:
+            return event_idx
+        if role == QtCore.Qt.BackgroundRole and event_idx in self._highlight:
+            return QtGui.QColor(self._highlight[event_idx])
+        return None
+
+
+class EventDelegate(QtWidgets.QStyledItemDelegate):
+    # paints caption of event in the middle of row
+    # with color of selected (hovered or pinned) event
+    def __init__(self, parent: t.Optional[QtCore.QObject] = None) -> None:
+        QtWidgets.QStyledItemDelegate.__init__(self, parent)
+        self._text_option = QtGui.QTextOption(QtCore.Qt.AlignCenter)
+
+    @staticmethod
+    def row_height(font_metrics: QtGui.QFontMetrics) -> int:
+        return font_metrics.lineSpacing() * EVENT_ROW_LINES + EVENT_ROW_MARGIN * 2
+
+    def paint(self, painter: QtGui.QPainter, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex):
+        painter.save()
+        rect = option.rect.adjusted(EVENT_ROW_MARGIN, EVENT_ROW_MARGIN // 2, -EVENT_ROW_MARGIN, -EVENT_ROW_MARGIN // 2)
+        color = index.data(QtCore.Qt.BackgroundRole)
+        if color is not None:
+            painter.fillRect(rect, color)
+        painter.setPen(option.palette.color(QtGui.QPalette.Mid))
+        painter.drawRect(rect)
+        painter.setPen(option.palette.color(QtGui.QPalette.Text))
+        painter.drawText(QtCore.QRectF(rect), index.data(QtCore.Qt.DisplayRole), self._text_option)
+        painter.restore()
+
+    def sizeHint(self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> QtCore.QSize:
+        return QtCore.QSize(option.rect.width(), self.row_height(option.fontMetrics))
+
+
+class EventRowsView(QtWidgets.QListView):
+    # rows of window, signals get index of event, hovered is -1 when mouse leaves events
+    hovered = QtCore.Signal(int)
+    left_clicked = QtCore.Signal(int)
+    right_clicked = QtCore.Signal(int)
+    wheel_scrolled = QtCore.Signal(int)  # rows
+    resized = QtCore.Signal()
+
+    def __init__(self, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
+        QtWidgets.QListView.__init__(self, parent)
+        self.setItemDelegate(EventDelegate(self))
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self._hovered_event_idx = -1
+
+    def rows_fit(self) -> int:
+        return max(1, self.viewport().height() // EventDelegate.row_height(self.fontMetrics()))
+
+    def _event_idx_at(self, pos: QtCore.QPoint) -> int:
+        index = self.indexAt(pos)
+        return index.data(EVENT_IDX_ROLE) if index.isValid() else -1
+
+    def set_hovered(self, event_idx: int):
+        if event_idx == self._hovered_event_idx:
+            return
+        self._hovered_event_idx = event_idx
+        self.hovered.emit(event_idx)
+
+    def mouseMoveEvent(self, event: QtGui.QMouseEvent) -> None:
+        self.set_hovered(self._event_idx_at(event.pos()))
+        return super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event: QtCore.QEvent) -> None:
+        self.set_hovered(-1)
+        return super().leaveEvent(event)
+
+    def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:
+        event_idx = self._event_idx_at(event.pos())
+        if event_idx != -1:
+            if event.button() == QtCore.Qt.MouseButton.LeftButton:
+                self.left_clicked.emit(event_idx)
+            elif event.button() == QtCore.Qt.MouseButton.RightButton:
+                self.right_clicked.emit(event_idx)
+        return super().mousePressEvent(event)
+
+    def wheelEvent(self, event: QtGui.QWheelEvent) -> None:
+        self.wheel_scrolled.emit(-event.angleDelta().y() // 120 * WHEEL_SCROLL_ROWS)
+        self.set_hovered(self._event_idx_at(event.pos()))
+        event.accept()
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self.resized.emit()
+
+
+class EventList(QtWidgets.QWidget):
+    hovered = QtCore.Signal(int)
+    left_clicked = QtCore.Signal(int)
+    right_clicked = QtCore.Signal(int)
+
+    def __init__(self, model: EventListModel, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
+        QtWidgets.QWidget.__init__(self, parent)
+        self._model = model
+        self._main_layout = QtWidgets.QHBoxLayout(self)
+        self._main_layout.setContentsMargins(0, 0, 0, 0)
+        self._main_layout.setSpacing(0)
+
+        self._rows_view = EventRowsView(self)
+        self._rows_view.setModel(model)
+        self._rows_view.hovered.connect(self.hovered)
+        self._rows_view.left_clicked.connect(self.left_clicked)
+        self._rows_view.right_clicked.connect(self.right_clicked)
+        self._rows_view.wheel_scrolled.connect(self.scroll_by)
+        self._rows_view.resized.connect(self.update_scroll_bar)
+        self._scroll_bar = QtWidgets.QScrollBar(QtCore.Qt.Vertical, self)
+        self._scroll_bar.valueChanged.connect(self.update_window)
+        self._main_layout.addWidget(self._rows_view)
+        self._main_layout.addWidget(self._scroll_bar)
+        self.setLayout(self._main_layout)
+
+        model.rows_count_changed.connect(self.update_scroll_bar)
+        self.update_scroll_bar()
+
+    def update_scroll_bar(self):
+        rows_fit = self._rows_view.rows_fit()
+        self._scroll_bar.setPageStep(rows_fit)
+        self._scroll_bar.setRange(0, max(0, self._model.all_rows_count() - rows_fit))
+        self.update_window()
+
+    def update_window(self):
+        self._model.set_window(self._scroll_bar.value(), self._rows_view.rows_fit())
+
+    def scroll_by(self, rows: int):
+        self._scroll_bar.setValue(self._scroll_bar.value() + rows)
+
+    def scroll_to_bottom(self):
+        self._scroll_bar.setValue(self._scroll_bar.maximum())
+
+    def clear_hovered(self):
+        # hovered row is going to be removed under the mouse
+        self._rows_view.set_hovered(-1)
+
+
+NULL_FILTER_VALUE = 'None'  # no constraint
+
+
+class _StayOpenMenu(QtWidgets.QMenu):
+    # several checkable actions are toggled without reopening menu
+    def mouseReleaseEvent(self, event: QtGui.QMouseEvent) -> None:
+        action = self.activeAction()
+        if action is not None and action.isCheckable():
+            action.trigger()
+            return
+        return super().mouseReleaseEvent(event)
+
+
+class FilterValueBox(QtWidgets.QComboBox):
+    # values are got when popup is shown, store of events can grow (follow mode)
+    def __init__(self, values_of: t.Callable[[], t.List[str]], parent: t.Optional[QtWidgets.QWidget] = None) -> None:
+        QtWidgets.QComboBox.__init__(self, parent)
+        self._values_of = values_of
+        self.addItem(NULL_FILTER_VALUE)
+        self.setSizeAdjustPolicy(QtWidgets.QComboBox.AdjustToContents)
+
+    def value(self) -> t.Optional[str]:
+        text = self.currentText()
+        return None if text == NULL_FILTER_VALUE else text
+
+    def reset(self):
+        self.setCurrentIndex(0)
+
+    def showPopup(self) -> None:
+        current = self.currentText()
+        self.blockSignals(True)
+        self.clear()
+        self.addItems([NULL_FILTER_VALUE, *self._values_of()])
+        self.setCurrentIndex(max(0, self.findText(current)))
+        self.blockSignals(False)
+        return super().showPopup()
+
+
+class EventFilterBar(QtWidgets.QWidget):
+    # types (several at once), nodes and msg type of shown events
+    filter_changed = QtCore.Signal()
+
+    def __init__(self, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
+        QtWidgets.QWidget.__init__(self, parent)
+        self._events = EventStore()
+        self._filter = EventFilter()
+        self._main_layout = QtWidgets.QGridLayout(self)
+
+        self._types_button = QtWidgets.QToolButton(self)
+        self._types_button.setPopupMode(QtWidgets.QToolButton.InstantPopup)
+        self._types_menu = _StayOpenMenu(self._types_button)
+        self._type_actions: t.List[QtWidgets.QAction] = []
+        for event_type in EventType:
+            action = self._types_menu.addAction(event_type.value)
+            action.setCheckable(True)
+            action.toggled.connect(self.update_filter)
+            self._type_actions.append(action)
+        self._types_button.setMenu(self._types_menu)
+        self._main_layout.addWidget(QtWidgets.QLabel('Filter by: ', self), 0, 0)
+        self._main_layout.addWidget(self._types_button, 0, 1, 1, 3)
+
+        self._node_box = FilterValueBox(self._node_ids, self)
+        self._src_box = FilterValueBox(self._node_ids, self)
+        self._dst_box = FilterValueBox(self._node_ids, self)
+        self._msg_type_box = FilterValueBox(self._msg_types, self)
+        for num, (name, box) in enumerate([
+            ('Node: ', self._node_box), ('Msg: ', self._msg_type_box),
+            ('Src: ', self._src_box), ('Dst: ', self._dst_box)
+        ]):
+            row, col = 1 + num // 2, num % 2 * 2
+            self._main_layout.addWidget(QtWidgets.QLabel(name, self), row, col)
+            self._main_layout.addWidget(box, row, col + 1)
+            box.currentTextChanged.connect(self.update_filter)
+        self.setLayout(self._main_layout)
+        self._update_types_text()
+
+    def set_events(self, events: EventStore):
+        self._events = events
+        self.reset()
+
+    def _node_ids(self) -> t.List[str]:
+        node_ids = self._events.node_ids()
+        if all(node_id.isdigit() for node_id in node_ids):
+            return sorted(node_ids, key=int)
+        return sorted(node_ids)
+
+    def _msg_types(self) -> t.List[str]:
+        return sorted(self._events.msg_types_of_events())
+
+    def event_filter(self) -> EventFilter:
+        return self._filter
+
+    def reset(self):
+        if self._filter.is_empty():
+            return
+        for widget in [*self._type_actions, self._node_box, self._src_box, self._dst_box, self._msg_type_box]:
+            widget.blockSignals(True)
+        for action in self._type_actions:
+            action.setChecked(False)
+        for box in [self._node_box, self._src_box, self._dst_box, self._msg_type_box]:
+            box.reset()
+        for widget in [*self._type_actions, self._node_box, self._src_box, self._dst_box, self._msg_type_box]:
+            widget.blockSignals(False)
+        self.update_filter()
+
+    def _update_types_text(self):
+        types = [action.text() for action in self._type_actions if action.isChecked()]
+        if not types:
+            self._types_button.setText(NULL_FILTER_VALUE)
+        elif len(types) == 1:
+            self._types_button.setText(types[0])
+        else:
+            self._types_button.setText(f'{len(types)} types')
+
+    def update_filter(self):
+        self._update_types_text()
+        event_filter = EventFilter(
+            frozenset(action.text() for action in self._type_actions if action.isChecked()),
+            self._src_box.value(), self._dst_box.value(), self._node_box.value(), self._msg_type_box.value()
+        )
+        if event_filter == self._filter:
+            return
+        self._filter = event_filter
+        self.filter_changed.emit()
@@ -0,0 +1,134 @@
+from PySide2 import QtCore, QtWidgets
+import bisect
+import typing as t
+import weakref
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from components.internal.internal_logger import getLogger
+from components.internal.search import PayloadIndex, hits_by_node
+from components.internal.util import EventStore
+from components.static.const import SEARCH_POLL_INTERVAL_MS
+
+logger = getLogger('event_search')
+
+
+class EventSearchBar(QtWidgets.QWidget):
+    # search in payloads of test events, index of test is built in background thread
+    # when test is selected and it is kept while test is alive
+    jump_requested = QtCore.Signal(int)  # index of found event
+
+    def __init__(
+            self, current_event_idx: t.Callable[[], int],
+            parent: t.Optional[QtWidgets.QWidget] = None) -> None:
+        QtWidgets.QWidget.__init__(self, parent)
+        self._current_event_idx = current_event_idx  # last shown event, matches are looked for after it
+        self._main_layout = QtWidgets.QGridLayout(self)
+
+        self._query_edit = QtWidgets.QLineEdit(self)
+        self._query_edit.setPlaceholderText('key, value or key=value ...')
+        self._query_edit.returnPressed.connect(self.search)
+        self._prev_button = QtWidgets.QPushButton('<', self)
+        self._prev_button.clicked.connect(self.prev_match)
+        self._next_button = QtWidgets.QPushButton('>', self)
+        self._next_button.clicked.connect(self.next_match)
+        self._status_lbl = QtWidgets.QLabel('', self)
+        self._status_lbl.setWordWrap(True)
+        self._main_layout.addWidget(QtWidgets.QLabel('Search: ', self), 0, 0)
+        self._main_layout.addWidget(self._query_edit, 0, 1)
+        self._main_layout.addWidget(self._prev_button, 0, 2)
+        self._main_layout.addWidget(self._next_button, 0, 3)
+        self._main_layout.addWidget(self._status_lbl, 1, 0, 1, 4)
+        self.setLayout(self._main_layout)
+
+        self._events = EventStore()
+        self._indices: 'weakref.WeakKeyDictionary[EventStore, PayloadIndex]' = weakref.WeakKeyDictionary()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._indexing: t.Optional[Future] = None
+        self._poll_timer = QtCore.QTimer(self)
+        self._poll_timer.timeout.connect(self.poll_indexing)
+        self._search_pending = False  # query is run when index is built
+        self._matches = array('I')
+        self._hits_text = ''  # hit counts of matches by nodes
+
+    def set_events(self, events: EventStore):
+        self._events = events
+        self._matches = array('I')
+        self._search_pending = False
+        self._status_lbl.setText('')
+        self._index_events()
+
+    def _index(self) -> PayloadIndex:
+        index = self._indices.get(self._events)
+        if index is None:
+            index = self._indices[self._events] = PayloadIndex()
+        return index
+
+    def _index_events(self) -> bool:
+        # True if index has all events of store
+        if self._indexing is not None:
+            return False
+        index = self._index()
+        if index.count >= len(self._events):
+            return True
+        self._indexing = self._executor.submit(index.extend, self._events, len(self._events))
+        self._poll_timer.start(SEARCH_POLL_INTERVAL_MS)
+        return False
+
+    def poll_indexing(self):
+        if self._indexing is None or not self._indexing.done():
+            return
+        self._poll_timer.stop()
+        error = self._indexing.exception()
+        self._indexing = None
+        if error is not None:
+            logger.error(f'Can not index events: {error}')
+            self._status_lbl.setText('Search is not available')
+            self._search_pending = False
+            return
+        if self._search_pending:
+            self._search_pending = False
+            self.search()
+        elif self._index().count < len(self._events):
+            self._index_events()  # events were appended while indexing (follow mode)
+
+    def search(self):
+        query = self._query_edit.text()
+        if not query.split():
+            self._matches = array('I')
+            self._status_lbl.setText('')
+            return
+        if not self._index_events():
+            # index of other test can be still built, then events of this one are indexed
+            self._search_pending = True
+            self._status_lbl.setText('Indexing events ...')
+            return
+        self._matches = self._index().search(query)
+        if len(self._matches) == 0:
+            self._status_lbl.setText('No matches')
+            return
+        hits = hits_by_node(self._events, self._matches)
+        self._hits_text = ', '.join(f'{node_id}: {hits[node_id]}' for node_id in sorted(hits, key=_node_order))
+        self.next_match()
+
+    def _show_match(self, match: int):
+        self._status_lbl.setText(
+            f'Match {match + 1}/{len(self._matches)} (event #{self._matches[match] + 1}) | by nodes: {self._hits_text}'
+        )
+        self.jump_requested.emit(self._matches[match])
+
+    def next_match(self):
+        if len(self._matches) == 0:
+            return
+        match = bisect.bisect_right(self._matches, self._current_event_idx())
+        self._show_match(match if match < len(self._matches) else 0)
+
+    def prev_match(self):
+        if len(self._matches) == 0:
+            return
+        match = bisect.bisect_left(self._matches, self._current_event_idx()) - 1
+        self._show_match(match if match >= 0 else len(self._matches) - 1)
+
+
+def _node_order(node_id: str) -> t.Tuple[int, t.Union[int, str]]:
+    return (0, int(node_id)) if node_id.isdigit() else (1, node_id)
@@ -0,0 +1,43 @@
+from PySide2 import QtGui
+import typing as t
+
+from components.internal.internal_logger import getLogger
+
+logger = getLogger('icons')
+
+
+class IconCache:
+    # Images of scene items are decoded once and scaled once per size,
+    # pixmaps are shared by all nodes and events (QPixmap copies share data).
+    # Scene is zoomed by view transform, so sizes depend only on node icon size.
+    def __init__(self) -> None:
+        self._images: t.Dict[str, QtGui.QImage] = {}
+        self._pixmaps: t.Dict[t.Tuple[str, t.Optional[int], t.Optional[int]], QtGui.QPixmap] = {}
+
+    def _image(self, path: str) -> QtGui.QImage:
+        if path not in self._images:
+            image = QtGui.QImage(path)
+            if image.isNull():
+                logger.error(f'Can not load icon: {path}')
+            self._images[path] = image
+        return self._images[path]
+
+    def pixmap(self, path: str, width: t.Optional[float] = None, height: t.Optional[float] = None) -> QtGui.QPixmap:
+        # scaled to width and height, aspect ratio is kept if only one of them is given
+        width = None if width is None else int(width)
+        height = None if height is None else int(height)
+        key = (path, width, height)
+        if key not in self._pixmaps:
+            image = self._image(path)
+            if width is not None and height is not None:
+                image = image.scaled(width, height)
+            elif width is not None:
+                image = image.scaledToWidth(width)
+            elif height is not None:
+                image = image.scaledToHeight(height)
+            self._pixmaps[key] = QtGui.QPixmap.fromImage(image)
+        return self._pixmaps[key]
+
+    def invalidate(self):
+        # scaled pixmaps of old sizes are not needed anymore
+        self._pixmaps.clear()
@@ -1,8 +1,28 @@
 import typing as t
 from PySide2 import QtWidgets, QtCore, QtGui
 
+from components.internal.util import DeferredMsgData
 from components.static.stylesheets import JSON_VIEWER_STYLESHEET
 
+
+def _has_children(value) -> bool:
+    if isinstance(value, DeferredMsgData):
+        return value.has_data()
+    if isinstance(value, (dict, list, tuple)):
+        return len(value) > 0
+    return value is not None
+
+
+class JsonItem(QtWidgets.QTreeWidgetItem):
+    # children are made from value only when item is expanded for the first time,
+    # most of payloads are never expanded
+    def __init__(self, text: str, value=None) -> None:
+        QtWidgets.QTreeWidgetItem.__init__(self, [text])
+        self.pending_value = value
+        if _has_children(value):
+            self.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+
+
 class JsonViewer(QtWidgets.QTreeWidget):
     def __init__(
             self, 
@@ -16,6 +36,7 @@ class JsonViewer(QtWidgets.QTreeWidget):
         self.setHeaderLabel(header)
         self.header().setStretchLastSection(False)
         self.header().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+        self.itemExpanded.connect(self.populate)
         self.reset_value(value=json_value, set_expanded=set_expanded)
         
         self._last_selected_item: t.Optional[QtWidgets.QTreeWidgetItem] = None
@@ -56,15 +77,29 @@ class JsonViewer(QtWidgets.QTreeWidget):
             self._new_item(item, str(value))
 
     def _new_item(self, parent, text, value=None):
-        child = QtWidgets.QTreeWidgetItem([text])
-        self._fill_item(child, value)
-        parent.addChild(child)
+        parent.addChild(JsonItem(text, value))
+
+    def populate(self, item: QtWidgets.QTreeWidgetItem):
+        if not isinstance(item, JsonItem) or item.pending_value is None:
+            return
+        value, item.pending_value = item.pending_value, None
+        if isinstance(value, DeferredMsgData):
+            value = value.value()
+        self._fill_item(item, value)
     
     def reset_value(self, value: dict, set_expanded: bool = False):
         self.clear()
         self._fill_item(self.invisibleRootItem(), value)
         if set_expanded:
-            self.expandAll()
+            for item_idx in range(self.topLevelItemCount()):
+                self.expand_recursively(self.topLevelItem(item_idx))
+
+    def expand_recursively(self, item: QtWidgets.QTreeWidgetItem):
+        # expandRecursively of view does not know children which are not made yet
+        self.populate(item)
+        self.expandItem(item)
+        for child_idx in range(item.childCount()):
+            self.expand_recursively(item.child(child_idx))
 
     def enterEvent(self, event: QtCore.QEvent) -> None:
         if self._expanded_w_ratio is not None:
@@ -97,19 +132,22 @@ class JsonViewer(QtWidgets.QTreeWidget):
                     self.collapseRecursively(item)
                     self._last_selected_item_expanded = False
                 else:
-                    self.expandRecursively(self.indexFromItem(item))
+                    self.expand_recursively(item)
                     self._last_selected_item_expanded = True
                 self._last_selected_item = item
             elif self._last_selected_item_expanded:
                 self.collapseRecursively(item)
                 self._last_selected_item_expanded = False
             else:
-                self.expandRecursively(self.indexFromItem(self._last_selected_item))
+                self.expand_recursively(self._last_selected_item)
                 self._last_selected_item_expanded = True
         return super().mouseReleaseEvent(event)
     
     def add_value_to_root(self, name: str, json_value: dict):
         self._new_item(self.invisibleRootItem(), name, json_value)
+
+    def insert_value_to_root(self, idx: int, name: str, json_value: dict):
+        self.invisibleRootItem().insertChild(idx, JsonItem(name, json_value))
     
     def hide_root_child_at(self, idx: int):
         child = self.invisibleRootItem().child(idx)
@@ -121,3 +159,9 @@ class JsonViewer(QtWidgets.QTreeWidget):
     
     def remove_root_child(self, idx: int):
         self.invisibleRootItem().removeChild(self.invisibleRootItem().child(idx))
+
+    def remove_first_root_children(self, count: int):
+        # removeChild frees items, taken ones would be kept by their python wrappers
+        root = self.invisibleRootItem()
+        for _ in range(count):
+            root.removeChild(root.child(0))
@@ -1,8 +1,10 @@
 from PySide2 import QtCore, QtWidgets, QtGui
 from dataclasses import dataclass
+import bisect
 import typing as t
+from array import array
 
-from components.internal.util import Serializable
+from components.internal.util import DeferredMsgData, EventStore, Serializable
 
 from components.static.const import EventType
 from components.static.stylesheets import NODE_INFO_DISPLAY_STYLESHEET
@@ -35,6 +37,22 @@ NODE_EVENTS = [
     EventType.NETWORK_PARTITION,
 ]
 
+ADD_METHOD_BY_TYPE = {
+    EventType.MESSAGE_SEND: 'add_sent_msg',
+    EventType.MESSAGE_RECEIVE: 'add_received_msg',
+    EventType.LOCAL_MESSAGE_SEND: 'add_local_sent_msg',
+    EventType.LOCAL_MESSAGE_RECEIVE: 'add_local_rcv_msg',
+    EventType.TIMER_FIRED: 'add_timer_fired',
+    EventType.NODE_RECOVERED: 'add_node_recovered',
+    EventType.NODE_CRASHED: 'add_node_crashed',
+    EventType.NODE_RESTARTED: 'add_node_restarted',
+    EventType.NODE_CONNECTED: 'add_node_connected',
+    EventType.NODE_DISCONNECTED: 'add_node_disconnected',
+    EventType.LINK_DISABLED: 'add_link_disabled',
+    EventType.LINK_ENABLED: 'add_link_enabled',
+    EventType.NETWORK_PARTITION: 'add_network_partition',
+}
+
 @dataclass
 class NodeEvent(Serializable):
     event_type: EventType
@@ -43,7 +61,7 @@ class NodeEvent(Serializable):
 class MsgSentEvent(NodeEvent):
     src: str
     dst: str
-    msg: t.Dict[t.Any, t.Any]
+    msg: t.Union[t.Dict[t.Any, t.Any], DeferredMsgData]
     ts: float
     msg_type: t.Optional[str] = None
 
@@ -51,7 +69,7 @@ class MsgSentEvent(NodeEvent):
     def deserialize(cls, data: t.Dict[t.Any, t.Any]):
         result = cls(**data)
         result.msg_type = result.msg['type']
-        result.msg = result.msg['data']
+        result.msg = DeferredMsgData(result.msg)  # decoded when record is expanded
         return result
 
 @dataclass
@@ -67,7 +85,7 @@ class TimerFiredEvent(NodeEvent):
 @dataclass
 class LocalMsgSentEvent(NodeEvent):
     dst: str
-    msg: t.Dict[t.Any, t.Any]
+    msg: t.Union[t.Dict[t.Any, t.Any], DeferredMsgData]
     ts: float
     msg_type: t.Optional[str] = None
 
@@ -75,7 +93,7 @@ class LocalMsgSentEvent(NodeEvent):
     def deserialize(cls, data: t.Dict[t.Any, t.Any]):
         result = cls(**data)
         result.msg_type = result.msg['type']
-        result.msg = result.msg['data']
+        result.msg = DeferredMsgData(result.msg)  # decoded when record is expanded
         return result
 
 @dataclass
@@ -146,6 +164,11 @@ class NodeInfoDisplay(QtWidgets.QWidget):
         self._main_layout.addWidget(self._viewer, *DISPLAY_GRID[2])
 
         self._events: t.List[NodeEvent] = []
+        self._event_indices: t.List[int] = []  # index of event in test for each record
+        # events before shown ones (see set_history), added to viewer when info is shown
+        self._history_store: t.Optional[EventStore] = None
+        self._history: t.Sequence[int] = []
+        self._history_insert_idx: t.Optional[int] = None
 
         self.setLayout(self._main_layout)
 
@@ -159,133 +182,133 @@ class NodeInfoDisplay(QtWidgets.QWidget):
         self._close_shortcut_2 = QtWidgets.QShortcut('Esc', self)
         self._close_shortcut_2.activated.connect(self.close)
 
-    def add_sent_msg(self, event_data: dict):
-        event_data.update(event_type=EventType.MESSAGE_SEND)
-        event = MsgSentEvent.deserialize(event_data)
+    def add_sent_msg(self, event_data: dict, event_idx: int):
+        event = MsgSentEvent.deserialize(dict(event_data, event_type=EventType.MESSAGE_SEND))
         name = f'{event.ts:.3f} | {event.src} --> {event.dst} | {event.msg_type}'
-        self._viewer.add_value_to_root(name, event.msg)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.MESSAGE_SEND]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, event.msg, event_idx)
     
-    def add_received_msg(self, event_data: dict):
-        event_data.update(event_type=EventType.MESSAGE_RECEIVE)
-        event = MsgReceivedEvent.deserialize(event_data)
+    def add_received_msg(self, event_data: dict, event_idx: int):
+        event = MsgReceivedEvent.deserialize(dict(event_data, event_type=EventType.MESSAGE_RECEIVE))
         name = f'{event.ts:.3f} | {event.src} <-- {event.dst} | {event.msg_type}'
-        self._viewer.add_value_to_root(name, event.msg)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.MESSAGE_RECEIVE]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, event.msg, event_idx)
     
-    def add_local_sent_msg(self, event_data: dict):
-        event_data.update(event_type=EventType.LOCAL_MESSAGE_SEND)
-        event = LocalMsgSentEvent.deserialize(event_data)
+    def add_local_sent_msg(self, event_data: dict, event_idx: int):
+        event = LocalMsgSentEvent.deserialize(dict(event_data, event_type=EventType.LOCAL_MESSAGE_SEND))
         name = f'{event.ts:.3f} | {event.dst} >>> local | {event.msg_type}'
-        self._viewer.add_value_to_root(name, event.msg)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.LOCAL_MESSAGE_SEND]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, event.msg, event_idx)
     
-    def add_local_rcv_msg(self, event_data: dict):
-        event_data.update(event_type=EventType.LOCAL_MESSAGE_RECEIVE)
-        event = LocalMsgRcvEvent.deserialize(event_data)
+    def add_local_rcv_msg(self, event_data: dict, event_idx: int):
+        event = LocalMsgRcvEvent.deserialize(dict(event_data, event_type=EventType.LOCAL_MESSAGE_RECEIVE))
         name = f'{event.ts:.3f} | {event.dst} <<< local | {event.msg_type}'
-        self._viewer.add_value_to_root(name, event.msg)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.LOCAL_MESSAGE_RECEIVE]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, event.msg, event_idx)
     
-    def add_timer_fired(self, event_data: dict):
-        event_data.update(event_type=EventType.TIMER_FIRED)
-        event = TimerFiredEvent.deserialize(event_data)
+    def add_timer_fired(self, event_data: dict, event_idx: int):
+        event = TimerFiredEvent.deserialize(dict(event_data, event_type=EventType.TIMER_FIRED))
         name = f'{event.ts:.3f} | {event.node} !-- timer (name: {event.name})'
-        self._viewer.add_value_to_root(name, None)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.TIMER_FIRED]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, None, event_idx)
     
-    def add_node_recovered(self, event_data: dict):
-        event_data.update(event_type=EventType.NODE_RECOVERED)
-        event = NodeRecovered.deserialize(event_data)
+    def add_node_recovered(self, event_data: dict, event_idx: int):
+        event = NodeRecovered.deserialize(dict(event_data, event_type=EventType.NODE_RECOVERED))
         name = f'{event.ts:.3f} | {event.node} RECOVERED!'
-        self._viewer.add_value_to_root(name, None)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.NODE_RECOVERED]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, None, event_idx)
     
-    def add_node_crashed(self, event_data: dict):
-        event_data.update(event_type=EventType.NODE_CRASHED)
-        event = NodeCrashed.deserialize(event_data)
+    def add_node_crashed(self, event_data: dict, event_idx: int):
+        event = NodeCrashed.deserialize(dict(event_data, event_type=EventType.NODE_CRASHED))
         name = f'{event.ts:.3f} | {event.node} CRASHED!'
-        self._viewer.add_value_to_root(name, None)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.NODE_CRASHED]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, None, event_idx)
     
-    def add_node_restarted(self, event_data: dict):
-        event_data.update(event_type=EventType.NODE_RESTARTED)
-        event = NodeRestarted.deserialize(event_data)
+    def add_node_restarted(self, event_data: dict, event_idx: int):
+        event = NodeRestarted.deserialize(dict(event_data, event_type=EventType.NODE_RESTARTED))
         name = f'{event.ts:.3f} | {event.node} RESTARTED!'
-        self._viewer.add_value_to_root(name, None)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.NODE_RESTARTED]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, None, event_idx)
     
-    def add_node_disconnected(self, event_data: dict):
-        event_data.update(event_type=EventType.NODE_DISCONNECTED)
-        event = NodeDisconnected.deserialize(event_data)
+    def add_node_disconnected(self, event_data: dict, event_idx: int):
+        event = NodeDisconnected.deserialize(dict(event_data, event_type=EventType.NODE_DISCONNECTED))
         name = f'{event.ts:.3f} | {event.node} DISCONNECTED!'
-        self._viewer.add_value_to_root(name, None)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.NODE_DISCONNECTED]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, None, event_idx)
     
-    def add_node_connected(self, event_data: dict):
-        event_data.update(event_type=EventType.NODE_CONNECTED)
-        event = NodeConnected.deserialize(event_data)
+    def add_node_connected(self, event_data: dict, event_idx: int):
+        event = NodeConnected.deserialize(dict(event_data, event_type=EventType.NODE_CONNECTED))
         name = f'{event.ts:.3f} | {event.node} CONNECTED!'
-        self._viewer.add_value_to_root(name, None)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.NODE_CONNECTED]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, None, event_idx)
     
-    def add_link_disabled(self, event_data: dict):
-        event_data.update(event_type=EventType.LINK_DISABLED)
-        event = LinkDisabled.deserialize(event_data)
+    def add_link_disabled(self, event_data: dict, event_idx: int):
+        event = LinkDisabled.deserialize(dict(event_data, event_type=EventType.LINK_DISABLED))
         name = f'{event.ts:.3f} | {event.src} --> {event.dst} | LINK DISABLED'
-        self._viewer.add_value_to_root(name, None)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.LINK_DISABLED]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, None, event_idx)
     
-    def add_link_enabled(self, event_data: dict):
-        event_data.update(event_type=EventType.LINK_ENABLED)
-        event = LinkEnabled.deserialize(event_data)
+    def add_link_enabled(self, event_data: dict, event_idx: int):
+        event = LinkEnabled.deserialize(dict(event_data, event_type=EventType.LINK_ENABLED))
         name = f'{event.ts:.3f} | {event.src} --> {event.dst} | LINK ENABLED'
-        self._viewer.add_value_to_root(name, None)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.LINK_ENABLED]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, None, event_idx)
     
-    def add_network_partition(self, event_data: dict):
-        event_data.update(event_type=EventType.NETWORK_PARTITION)
-        event = NetworkPartition.deserialize(event_data)
+    def add_network_partition(self, event_data: dict, event_idx: int):
+        event = NetworkPartition.deserialize(dict(event_data, event_type=EventType.NETWORK_PARTITION))
         node_group = 1 if self._node_id in event.group1 else 2
         name = f'{event.ts:.3f} | NETWORK PARTITION (in group {node_group})'
         data = {
             'group1': event.group1,
             'group2': event.group2,
         }
-        self._viewer.add_value_to_root(name, data)
-        self._events.append(event)
-        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, EventType.NETWORK_PARTITION]:
-            self._viewer.hide_root_child_at(len(self._events) - 1)
+        self._add_entry(event, name, data, event_idx)
     
-    def pop_event(self):
-        event = self._events.pop()
-        event_idx = len(self._events)
-        self._viewer.remove_root_child(event_idx)
-        return event
+    def _add_entry(self, event: NodeEvent, name: str, value, event_idx: int):
+        idx = len(self._events) if self._history_insert_idx is None else self._history_insert_idx
+        self._viewer.insert_value_to_root(idx, name, value)
+        self._events.insert(idx, event)
+        self._event_indices.insert(idx, event_idx)
+        if self._filter_list.currentText() not in [NULL_EVENT_TYPE, event.event_type]:
+            self._viewer.hide_root_child_at(idx)
+
+    def set_history(self, events: EventStore, event_indices: t.Sequence[int]):
+        # replaces all records with records of events[event_indices]
+        self._viewer.clear()
+        self._events.clear()
+        self._event_indices.clear()
+        self._history_store = events
+        self._history = event_indices
+        if self.isVisible():
+            self._load_history()
+
+    def _load_history(self):
+        if not self._history:
+            return
+        self._history_insert_idx = 0
+        for event_idx in self._history:
+            event = self._history_store[event_idx]
+            getattr(self, ADD_METHOD_BY_TYPE[event.type])(event.data, event_idx)
+            self._history_insert_idx += 1
+        self._history_insert_idx = None
+        self._history = []
+
+    def forget_records(self, events: EventStore, first_event_idx: int):
+        # records of events before first_event_idx become indices of history,
+        # they are added to viewer again when info is shown
+        if self.isVisible():
+            return
+        forgotten = bisect.bisect_left(self._event_indices, first_event_idx)
+        if forgotten == 0:
+            return
+        if self._history_store is not events:
+            self._history_store = events
+            self._history = []
+        self._history = array('I', [*self._history, *self._event_indices[:forgotten]])
+        self._viewer.remove_first_root_children(forgotten)
+        del self._events[:forgotten]
+        del self._event_indices[:forgotten]
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        self._load_history()
+        return super().showEvent(event)
+
+    def truncate(self, next_event_idx: int):
+        # removes records of events which are not shown (after stepping back)
+        while self._event_indices and self._event_indices[-1] >= next_event_idx:
+            self._event_indices.pop()
+            self._events.pop()
+            self._viewer.remove_root_child(len(self._events))
+        if not self._event_indices:
+            self._history = self._history[:bisect.bisect_left(self._history, next_event_idx)]
     
     def filter_value_changed(self):
         filter_type = self._filter_list.currentText()
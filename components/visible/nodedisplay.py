@@ -2,11 +2,17 @@ from PySide2 import QtCore, QtWidgets, QtGui
 import math
 import typing as t
 
+from components.visible.icons import IconCache
 from components.visible.node_info_display import NodeInfoDisplay
 
 from components.internal.internal_logger import getLogger
+from components.internal.clusterstate import ClusterState, Partition, StateChange
+from components.internal.layout import TrafficLayouts
+from components.internal.snapshots import DisplaySnapshots
+from components.internal.util import EventStore, NODE_SYMBOLS
 
-from components.static.const import STATIC_PATH, NodePlotRule
+from components.static.const import STATIC_PATH, ANIMATION_FRAME_MS, NODE_LAYOUT_SPACING, NodePlotRule, StateChangeKind
+from components.static.const import LAYOUT_POLL_INTERVAL_MS
 from components.static.const import OnMouseEventColor
 
 logger = getLogger('nodedisplay')
@@ -31,9 +37,10 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
         self._node_size = size
         self._display = display
         
-        self._node_pixmap = QtGui.QPixmap(self.ICON_PATH).scaled(size[0], size[1])
-        self._node_group_1_pixmap = QtGui.QPixmap(self.ICON_GROUP_1).scaled(size[0], size[1])
-        self._node_group_2_pixmap = QtGui.QPixmap(self.ICON_GROUP_2).scaled(size[0], size[1])
+        icons = display.icons
+        self._node_pixmap = icons.pixmap(self.ICON_PATH, size[0], size[1])
+        self._node_group_1_pixmap = icons.pixmap(self.ICON_GROUP_1, size[0], size[1])
+        self._node_group_2_pixmap = icons.pixmap(self.ICON_GROUP_2, size[0], size[1])
         self._node = QtWidgets.QGraphicsPixmapItem(self._node_pixmap)
         self.addToGroup(self._node)
 
@@ -43,7 +50,7 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
         self._border.hide()
         self.addToGroup(self._border)
 
-        pixmap = QtGui.QPixmap(self.CROSS_PATH).scaledToWidth(size[0] * 1.2)
+        pixmap = icons.pixmap(self.CROSS_PATH, width=size[0] * 1.2)
         self._cross_size = (pixmap.width(), pixmap.height())
         self._cross = QtWidgets.QGraphicsPixmapItem(pixmap)
         self._cross.hide()
@@ -55,21 +62,21 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
         self._text.setPos(size[0] // 2 - self._text.boundingRect().width() // 2, size[1])
         self.addToGroup(self._text)
 
-        pixmap = QtGui.QPixmap(self.LOCAL_USER_PATH).scaledToWidth(size[0] * 0.7)
+        pixmap = icons.pixmap(self.LOCAL_USER_PATH, width=size[0] * 0.7)
         self._local_user_size = (pixmap.width(), pixmap.height())
         self._local_user = QtWidgets.QGraphicsPixmapItem(pixmap)
         self._local_user.setPos(-pixmap.width(), -pixmap.height())
         self._local_user.hide()
         self.addToGroup(self._local_user)
 
-        pixmap = QtGui.QPixmap(self.TIMER_PATH).scaledToHeight(self._local_user_size[1])
+        pixmap = icons.pixmap(self.TIMER_PATH, height=self._local_user_size[1])
         self.timer_size = (pixmap.width(), pixmap.height())
         self._timer = QtWidgets.QGraphicsPixmapItem(pixmap)
         self._timer.setPos(size[0], -pixmap.height())
         self._timer.hide()
         self.addToGroup(self._timer)
 
-        pixmap = QtGui.QPixmap(self.RESTART_PATH).scaledToHeight(self._local_user_size[1])
+        pixmap = icons.pixmap(self.RESTART_PATH, height=self._local_user_size[1])
         self.restart_size = (pixmap.width(), pixmap.height())
         self._restart_icon = QtWidgets.QGraphicsPixmapItem(pixmap)
         self._restart_icon.setPos(size[0], -pixmap.height())
@@ -82,6 +89,10 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
         self.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable)
 
         self._connections_counter = 0  # for lines, that represent events (disables movement)
+        # persistent state is set from ClusterState, show counters are for selected events
+        self._is_crashed = False
+        self._is_disconnected = False
+        self._partition_group = 0  # 1 or 2 in last partition
         self._border_show_counter = 0  # border can be really hidden only when this counter = 0
         self._local_user_show_counter = 0  # same as border counter for local user
         self._cross_show_counter = 0
@@ -103,6 +114,10 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
         elif was_zero:
             self.setFlags(self.flags() & ~QtWidgets.QGraphicsItem.ItemIsMovable)
     
+    def set_crashed(self, is_crashed: bool):
+        self._is_crashed = is_crashed
+        self._cross.setVisible(is_crashed or self._cross_show_counter > 0)
+
     def show_cross(self):
         if self._cross_show_counter == 0:
             self._cross.show()
@@ -113,7 +128,7 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
             0 if self._cross_show_counter == 0
             else self._cross_show_counter - 1
         )
-        if self._cross_show_counter == 0:
+        if self._cross_show_counter == 0 and not self._is_crashed:
             self._cross.hide()
     
     def show_local_user(self):
@@ -168,6 +183,10 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
         if self._restart_icon_show_counter == 0:
             self._restart_icon.hide()
     
+    def set_disconnected(self, is_disconnected: bool):
+        self._is_disconnected = is_disconnected
+        self.setOpacity(0.3 if is_disconnected or self._disconnect_show_counter > 0 else 1)
+
     def show_disconnect(self):
         if self._disconnect_show_counter == 0:
             self.setOpacity(0.3)
@@ -178,15 +197,24 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
             0 if self._disconnect_show_counter == 0
             else self._disconnect_show_counter - 1
         )
-        if self._disconnect_show_counter == 0:
+        if self._disconnect_show_counter == 0 and not self._is_disconnected:
             self.setOpacity(1)
     
+    def _group_pixmap(self, group: int) -> QtGui.QPixmap:
+        if group == 1:
+            return self._node_group_1_pixmap
+        if group == 2:
+            return self._node_group_2_pixmap
+        return self._node_pixmap
+
+    def set_partition_group(self, group: int):
+        self._partition_group = group
+        if self._partition_show_counter == 0:
+            self._node.setPixmap(self._group_pixmap(group))
+
     def show_partition(self, group: int):
         if self._partition_show_counter == 0:
-            if group == 1:
-                self._node.setPixmap(self._node_group_1_pixmap)
-            else:
-                self._node.setPixmap(self._node_group_2_pixmap)
+            self._node.setPixmap(self._group_pixmap(group))
         self._partition_show_counter += 1
 
     def hide_partition(self):
@@ -195,11 +223,12 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
             else self._partition_show_counter - 1
         )
         if self._partition_show_counter == 0:
-            self._node.setPixmap(self._node_pixmap)
+            self._node.setPixmap(self._group_pixmap(self._partition_group))
     
     def show_info(self):
         self._display.hide_shown_node_info()
         self._display.set_node_with_shown_info(self._id)
+        self._info_viewer.truncate(self._display.next_event_idx)
         self._info_viewer.show()
     
     def hide_info(self):
@@ -209,47 +238,120 @@ class DisplayedNode(QtWidgets.QGraphicsItemGroup):
     def is_info_shown(self):
         return not self._info_viewer.isHidden()
     
-    def add_received_msg(self, msg: dict):
-        self._info_viewer.add_received_msg(msg)
+    def add_received_msg(self, msg: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_received_msg(msg, event_idx)
 
-    def add_sent_msg(self, msg: dict):
-        self._info_viewer.add_sent_msg(msg)
+    def add_sent_msg(self, msg: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_sent_msg(msg, event_idx)
     
-    def add_timer_fired(self, data: dict):
-        self._info_viewer.add_timer_fired(data)
+    def add_timer_fired(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_timer_fired(data, event_idx)
     
-    def add_local_sent_msg(self, data: dict):
-        self._info_viewer.add_local_sent_msg(data)
+    def add_local_sent_msg(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_local_sent_msg(data, event_idx)
     
-    def add_local_rcv_msg(self, data: dict):
-        self._info_viewer.add_local_rcv_msg(data)
+    def add_local_rcv_msg(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_local_rcv_msg(data, event_idx)
 
-    def add_node_recovered(self, data: dict):
-        self._info_viewer.add_node_recovered(data)
+    def add_node_recovered(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_node_recovered(data, event_idx)
     
-    def add_node_crashed(self, data: dict):
-        self._info_viewer.add_node_crashed(data)
+    def add_node_crashed(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_node_crashed(data, event_idx)
     
-    def add_node_restarted(self, data: dict):
-        self._info_viewer.add_node_restarted(data)
+    def add_node_restarted(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_node_restarted(data, event_idx)
     
-    def add_node_disconnected(self, data: dict):
-        self._info_viewer.add_node_disconnected(data)
+    def add_node_disconnected(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_node_disconnected(data, event_idx)
 
-    def add_node_connected(self, data: dict):
-        self._info_viewer.add_node_connected(data)
+    def add_node_connected(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_node_connected(data, event_idx)
     
-    def add_link_disabled(self, data: dict):
-        self._info_viewer.add_link_disabled(data)
+    def add_link_disabled(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_link_disabled(data, event_idx)
     
-    def add_link_enabled(self, data: dict):
-        self._info_viewer.add_link_enabled(data)
+    def add_link_enabled(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_link_enabled(data, event_idx)
     
-    def add_network_partition(self, data: dict):
-        self._info_viewer.add_network_partition(data)
+    def add_network_partition(self, data: dict, event_idx: int):
+        self._info_viewer.truncate(event_idx)
+        self._info_viewer.add_network_partition(data, event_idx)
     
-    def pop_event(self):
-        return self._info_viewer.pop_event()
+    def truncate_info(self, next_event_idx: int):
+        self._info_viewer.truncate(next_event_idx)
+
+    def forget_info_records(self, events: EventStore, first_event_idx: int):
+        self._info_viewer.forget_records(events, first_event_idx)
+
+    def set_state(self, is_crashed: bool, is_disconnected: bool, events: EventStore, info_events: t.Sequence[int]):
+        # state after seeking: persistent state from snapshot,
+        # icons of transient and selected events are hidden
+        self._cross_show_counter = 0
+        self.set_crashed(is_crashed)
+        self._disconnect_show_counter = 0
+        self.set_disconnected(is_disconnected)
+        self._border_show_counter = 0
+        self._border.hide()
+        self._local_user_show_counter = 0
+        self._local_user.hide()
+        self._timer_show_counter = 0
+        self._timer.hide()
+        self._restart_icon_show_counter = 0
+        self._restart_icon.hide()
+        self._partition_show_counter = 0
+        self.set_partition_group(0)  # partition is set by display for its nodes only
+        self._connections_counter = 0
+        self.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable)
+        self._info_viewer.set_history(events, info_events)
+
+
+class DisplayedNodes:
+    # displayed nodes in list by their symbol in NODE_SYMBOLS,
+    # can be indexed by symbol or by node id
+    def __init__(self) -> None:
+        self._nodes: t.List[t.Optional[DisplayedNode]] = []
+
+    def _symbol(self, node: t.Union[int, str]) -> int:
+        return NODE_SYMBOLS.symbol_of(node) if isinstance(node, str) else node
+
+    def __getitem__(self, node: t.Union[int, str]) -> DisplayedNode:
+        symbol = self._symbol(node)
+        displayed_node = self._nodes[symbol] if 0 <= symbol < len(self._nodes) else None
+        if displayed_node is None:
+            raise KeyError(node)
+        return displayed_node
+
+    def __setitem__(self, node: t.Union[int, str], displayed_node: DisplayedNode):
+        symbol = NODE_SYMBOLS.intern(node) if isinstance(node, str) else node
+        if symbol >= len(self._nodes):
+            self._nodes.extend([None] * (symbol + 1 - len(self._nodes)))
+        self._nodes[symbol] = displayed_node
+
+    def __contains__(self, node: t.Union[int, str]) -> bool:
+        symbol = self._symbol(node)
+        return 0 <= symbol < len(self._nodes) and self._nodes[symbol] is not None
+
+    def __iter__(self) -> t.Iterator[DisplayedNode]:
+        return (displayed_node for displayed_node in self._nodes if displayed_node is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def clear(self):
+        self._nodes.clear()
 
 
 class CustomGraphicsScene(QtWidgets.QGraphicsScene):
@@ -269,6 +371,9 @@ class CustomGraphicsScene(QtWidgets.QGraphicsScene):
 
 
 class CentralDisplay(QtWidgets.QGraphicsView):
+    # emitted when traffic layout of shown test is computed, nodes are to be plotted again
+    traffic_layout_ready = QtCore.Signal()
+
     def __init__(
         self,
         parent: t.Optional[QtWidgets.QWidget] = None, 
@@ -283,38 +388,81 @@ class CentralDisplay(QtWidgets.QGraphicsView):
         self._scene.setParent(self)
         # self._scene.setBackgroundBrush(QtCore.Qt.green)
         self.setScene(self._scene)
-        self.setSceneRect(-1000, -1000, 2000, 2000)
+        self._min_scene_rect = QtCore.QRectF(-1000, -1000, 2000, 2000)  # it grows to fit large layouts
+        self.setSceneRect(self._min_scene_rect)
         
-        self._node_ids: t.Set[str] = None
-        self.displayed_nodes: t.Dict[str, DisplayedNode] = {}
+        self._node_ids: t.List[str] = None  # in plot order
+        self.plot_rule = NodePlotRule.CIRCLE
+        # traffic layouts are computed in worker process when needed and kept while test is alive
+        self._events = EventStore()
+        self._traffic_layouts = TrafficLayouts()
+        self._layout_poll_timer = QtCore.QTimer(self)
+        self._layout_poll_timer.timeout.connect(self.poll_traffic_layout)
+        self.displayed_nodes = DisplayedNodes()
         self._node_icon_size: t.Optional[t.Tuple[int, int]] = None
+        self.icons = IconCache()  # pixmaps of nodes and events
+        self._last_node_icon_size: t.Optional[t.Tuple[int, int]] = None  # icons are scaled to it
         self._node_with_shown_info: t.Optional[str] = None
+        # events before it are shown, records of later events in node info are removed lazily:
+        # on next record of node or when node info is shown
+        self.next_event_idx = 0
+        # one clock moves envelopes and crosses of all shown messages and stops when there are none
+        self._animations: t.Set[t.Callable[[int], None]] = set()  # advance(steps) of running animations
+        self._animation_step_ms = 0.0
+        self._animation_steps = 0  # steps done since clock start
+        self._animation_clock = QtCore.QElapsedTimer()
+        self._animation_timer = QtCore.QTimer(self)
+        self._animation_timer.timeout.connect(self.advance_animations)
 
     
     def clear(self):
         self.hide_shown_node_info()
+        self._animations.clear()
+        self._animation_timer.stop()
         self._scene.clear()
         self.displayed_nodes.clear()
     
     def set_node_ids(self, node_ids: t.Set[str]):
-        self._node_ids = node_ids
+        # sorted once per test, not on every plot
+        self._node_ids = list(node_ids)
+        if self.is_ids_ints():
+            self._node_ids.sort(key=int)
+        else:
+            self._node_ids.sort()
+
+    def set_events(self, events: EventStore):
+        # events of shown test, source of traffic layout
+        self._events = events
 
     def on_startup(self):
         self.clear()
+        self._node_icon_size = None  # icons fit current size of display
         self.plot_nodes(self._node_ids)
 
-    def plot_nodes(self, node_ids: t.Set[str], plot_rule: NodePlotRule = NodePlotRule.CIRCLE):
-        points = self.calc_node_positions(plot_rule)
+    def plot_nodes(self, node_ids: t.Set[str], plot_rule: t.Optional[NodePlotRule] = None):
+        points = self.calc_node_positions(self.plot_rule if plot_rule is None else plot_rule)
         node_size = self.get_node_icon_size()
-        if self.is_ids_ints():
-            node_ids = sorted(self._node_ids, key=int)
-        else:
-            node_ids = sorted(self._node_ids)
-        for num, node_id in enumerate(node_ids):
+        for num, node_id in enumerate(self._node_ids):
             x, y = points[num]
-            self.displayed_nodes[node_id] = DisplayedNode(node_id, node_size, self, None)
-            self._scene.addItem(self.displayed_nodes[node_id])
-            self.displayed_nodes[node_id].setPos(x, y)
+            displayed_node = DisplayedNode(node_id, node_size, self, None)
+            self.displayed_nodes[node_id] = displayed_node
+            self._scene.addItem(displayed_node)
+            displayed_node.setPos(x, y)
+        self.fit_nodes()
+
+    def fit_nodes(self):
+        nodes_rect = self._scene.itemsBoundingRect()
+        node_size = self.get_node_icon_size()
+        self.setSceneRect(
+            nodes_rect.adjusted(-node_size[0], -node_size[1], node_size[0], node_size[1]).united(self._min_scene_rect)
+        )
+        # layout larger than display is zoomed out to be seen whole
+        scale = self.transform().m11()
+        viewport_size = self.viewport().size()
+        if self.isVisible() and (
+                nodes_rect.width() * scale > viewport_size.width() or
+                nodes_rect.height() * scale > viewport_size.height()):
+            self.fitInView(nodes_rect, QtCore.Qt.KeepAspectRatio)
     
     def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:
         self.setDragMode(QtWidgets.QGraphicsView.ScrollHandDrag)
@@ -341,47 +489,144 @@ class CentralDisplay(QtWidgets.QGraphicsView):
     
     def set_node_with_shown_info(self, node_id: str):
         self._node_with_shown_info = node_id
+
+    def set_next_event_idx(self, next_event_idx: int):
+        self.next_event_idx = next_event_idx
+        if self._node_with_shown_info is not None:
+            self.displayed_nodes[self._node_with_shown_info].truncate_info(next_event_idx)
     
     def run_to_event(self, event_idx: int):
         self._parent_window.run_to_event(event_idx)
+
+    def forget_node_info_records(self, events: EventStore, first_event_idx: int):
+        # records of hidden node infos are restored from events when they are shown
+        for node_id in self._node_ids:
+            self.displayed_nodes[node_id].forget_info_records(events, first_event_idx)
+
+    def set_snapshot(self, state: ClusterState, snapshots: DisplaySnapshots, events: EventStore, event_idx: int):
+        # state of nodes after first event_idx events without transient effects
+        for node_id in self._node_ids:
+            self.displayed_nodes[node_id].set_state(
+                state.is_crashed(node_id), state.is_disconnected(node_id),
+                events, snapshots.node_info_events(node_id, event_idx)
+            )
+        self.set_partition(None, state.partition)
+
+    def apply_state_changes(self, changes: t.List[StateChange]):
+        # changes returned by ClusterState.apply/revert, only changed nodes are redrawn
+        for change in changes:
+            if change.kind == StateChangeKind.CRASH_COUNTER and change.key in self.displayed_nodes:
+                self.displayed_nodes[change.key].set_crashed(change.new > 0)
+            elif change.kind == StateChangeKind.DISCONNECT_COUNTER and change.key in self.displayed_nodes:
+                self.displayed_nodes[change.key].set_disconnected(change.new > 0)
+            elif change.kind == StateChangeKind.PARTITION:
+                self.set_partition(change.old, change.new)
+
+    def set_partition(self, old: t.Optional[Partition], new: t.Optional[Partition]):
+        # marks of old partition are replaced by new ones, nodes which stay
+        # in the same group are not redrawn (undo of partition is also done by it)
+        old_groups, new_groups = _partition_groups(old), _partition_groups(new)
+        for group, nodes in enumerate(new_groups, 1):
+            for node_id in nodes - old_groups[group - 1]:
+                if node_id in self.displayed_nodes:
+                    self.displayed_nodes[node_id].set_partition_group(group)
+        for nodes in old_groups:
+            for node_id in nodes - new_groups[0] - new_groups[1]:
+                if node_id in self.displayed_nodes:
+                    self.displayed_nodes[node_id].set_partition_group(0)
         
     ##### HELPERS ###
-    def calc_node_positions(self, plot_rule: NodePlotRule = NodePlotRule.CIRCLE) -> t.List[t.Tuple[int, int]]:
-        # return circled coords
-        max_x, max_y = (
-            self.width(), self.height()
-        )
+    def calc_node_positions(self, plot_rule: NodePlotRule = NodePlotRule.CIRCLE) -> t.List[t.Tuple[float, float]]:
+        # return top left corners of node icons, layout is centered at (0, 0)
+        count = len(self._node_ids)
         node_size = self.get_node_icon_size()
+        # nodes are spaced by their icon size, so large clusters do not overlap but grow beyond display
+        step_x, step_y = node_size[0] * NODE_LAYOUT_SPACING[0], node_size[1] * NODE_LAYOUT_SPACING[1]
         if plot_rule == NodePlotRule.CIRCLE:
-            radius, curr_angle = (
-                min(
-                    max_x // 2 - node_size[0], 
-                    max_y // 2 - node_size[1]
-                ), 
-                math.pi / 2
+            # circle fits display while its nodes fit circle
+            radius = max(
+                min(self.width() // 2 - node_size[0], self.height() // 2 - node_size[1]),
+                count * step_x / (2 * math.pi)
             )
-            angle_delta = 2 * math.pi / len(self._node_ids)
-            center = (0 - node_size[0] // 2, 0 - node_size[1] // 2)
-            resulting_points = []
-            for i in range(len(self._node_ids)):
-                resulting_points.append((
-                    center[0] + math.cos(curr_angle) * radius,
-                    center[1] - math.sin(curr_angle) * radius,
-                ))
-                curr_angle -= angle_delta
-            return resulting_points
-        if plot_rule == NodePlotRule.ROW:
-            raise NotImplementedError()
-        if plot_rule == NodePlotRule.COLUMN:
-            raise NotImplementedError()
+            centers = _ring_points(count, radius)
+        elif plot_rule == NodePlotRule.ROW:
+            centers = _grid_points(count, count, step_x, step_y)
+        elif plot_rule == NodePlotRule.COLUMN:
+            centers = _grid_points(count, 1, step_x, step_y)
+        elif plot_rule == NodePlotRule.GRID:
+            centers = _grid_points(count, math.ceil(math.sqrt(count)), step_x, step_y)
+        elif plot_rule == NodePlotRule.RINGS:
+            centers = _rings_points(count, step_x, max(step_x, step_y))
+        elif plot_rule == NodePlotRule.TRAFFIC:
+            # nodes are in grid in id order until layout is computed
+            centers = _grid_points(count, math.ceil(math.sqrt(count)), step_x, step_y)
+            if not self._traffic_layouts.is_actual(self._events):
+                # layout of test which is still running is kept until the new one is computed
+                self.compute_traffic_layout()
+            layout = self._traffic_layouts.get(self._events)
+            if layout is not None:
+                centers = _snap_to_grid(self._node_ids, layout, centers, math.ceil(math.sqrt(count)))
+        else:
+            raise ValueError(f'Unknown plot rule: {plot_rule}')
+        shift_x, shift_y = node_size[0] // 2, node_size[1] // 2
+        return [(x - shift_x, y - shift_y) for x, y in centers]
     
+    def compute_traffic_layout(self):
+        if self._traffic_layouts.compute(self._events):
+            self._layout_poll_timer.start(LAYOUT_POLL_INTERVAL_MS)
+
+    def poll_traffic_layout(self):
+        events = self._traffic_layouts.poll()
+        if events is None:
+            return
+        self._layout_poll_timer.stop()
+        if self.plot_rule != NodePlotRule.TRAFFIC:
+            return
+        if events is self._events:
+            self.traffic_layout_ready.emit()
+        elif not self._traffic_layouts.is_actual(self._events):
+            self.compute_traffic_layout()
+
+    def shutdown_workers(self):
+        # display is closed, layout which is computed is not needed
+        self._layout_poll_timer.stop()
+        self._traffic_layouts.shutdown()
+
+    def start_animation(self, advance: t.Callable[[int], None], step_ms: float):
+        self._animations.add(advance)
+        if self._animation_timer.isActive() and step_ms == self._animation_step_ms:
+            return
+        # (re)started with new speed of steps
+        self._animation_step_ms = step_ms
+        self._animation_steps = 0
+        self._animation_clock.start()
+        self._animation_timer.start(max(ANIMATION_FRAME_MS, int(step_ms)))
+
+    def stop_animation(self, advance: t.Callable[[int], None]):
+        self._animations.discard(advance)
+        if not self._animations:
+            self._animation_timer.stop()
+
+    def advance_animations(self):
+        # all items are moved in one pass, scene repaints them at once
+        steps_done = int(self._animation_clock.elapsed() / self._animation_step_ms)
+        steps = steps_done - self._animation_steps
+        if steps <= 0:
+            return
+        self._animation_steps = steps_done
+        for advance in self._animations:
+            advance(steps)
+
     def get_node_icon_size(self):
         if self._node_icon_size is None:
-            pixmap = QtGui.QPixmap(DisplayedNode.ICON_PATH)
-            pixmap = pixmap.scaledToHeight(self.height() // 8)
-            self._node_icon_size = (
+            pixmap = self.icons.pixmap(DisplayedNode.ICON_PATH, height=self.height() // 8)
+            node_icon_size = (
                 pixmap.width(), pixmap.height()
             )
+            if node_icon_size != self._last_node_icon_size:
+                self.icons.invalidate()
+                self._last_node_icon_size = node_icon_size
+            self._node_icon_size = node_icon_size
             return self._node_icon_size
         return self._node_icon_size
     
@@ -389,3 +634,62 @@ class CentralDisplay(QtWidgets.QGraphicsView):
         return all(
             node_id.isdigit() for node_id in self._node_ids
         )
+
+
+def _partition_groups(partition: t.Optional[Partition]) -> t.Tuple[t.Set[str], t.Set[str]]:
+    if partition is None:
+        return set(), set()
+    return set(partition[0]), set(partition[1])
+
+
+def _ring_points(count: int, radius: float, start_angle: float = math.pi / 2) -> t.List[t.Tuple[float, float]]:
+    # clockwise from start angle
+    angle_delta = 2 * math.pi / max(count, 1)
+    return [
+        (math.cos(start_angle - i * angle_delta) * radius, -math.sin(start_angle - i * angle_delta) * radius)
+        for i in range(count)
+    ]
+
+
+def _grid_points(count: int, columns: int, step_x: float, step_y: float) -> t.List[t.Tuple[float, float]]:
+    # row by row, left to right
+    columns = max(columns, 1)
+    rows = math.ceil(count / columns)
+    shift_x, shift_y = (min(count, columns) - 1) / 2, (rows - 1) / 2
+    return [((i % columns - shift_x) * step_x, (i // columns - shift_y) * step_y) for i in range(count)]
+
+
+def _rings_points(count: int, step: float, ring_step: float) -> t.List[t.Tuple[float, float]]:
+    # ring k has radius k * ring_step and as many nodes as fit it with step between them,
+    # last ring is spread evenly; single node is at center
+    if count <= 1:
+        return [(0.0, 0.0)] * count
+    points = []
+    ring = 1
+    while len(points) < count:
+        radius = ring * ring_step
+        capacity = max(int(2 * math.pi * radius / step), 1)
+        points.extend(_ring_points(min(capacity, count - len(points)), radius))
+        ring += 1
+    return points
+
+
+def _snap_to_grid(
+        node_ids: t.List[str], layout: t.Dict[str, t.Tuple[float, float]],
+        slots: t.List[t.Tuple[float, float]], columns: int) -> t.List[t.Tuple[float, float]]:
+    # slots of _grid_points are given to nodes by their layout coordinates:
+    # rows of nodes by y, in row by x; nodes without traffic take the last slots in given order
+    with_traffic = sorted(
+        (idx for idx, node_id in enumerate(node_ids) if node_id in layout),
+        key=lambda idx: layout[node_ids[idx]][1]
+    )
+    order = with_traffic + [idx for idx, node_id in enumerate(node_ids) if node_id not in layout]
+    points: t.List[t.Tuple[float, float]] = [None] * len(node_ids)
+    for row_start in range(0, len(order), columns):
+        row = sorted(
+            order[row_start:row_start + columns],
+            key=lambda idx: (node_ids[idx] not in layout, layout.get(node_ids[idx], (0.0, 0.0))[0])
+        )
+        for slot, idx in enumerate(row, row_start):
+            points[idx] = slots[slot]
+    return points
@@ -1,56 +1,83 @@
 from PySide2 import QtCore, QtWidgets, QtGui
 import typing as t
 
-from components.internal.util import Event
+from components.internal.util import Event, EventStore, EVENT_TYPE_BY_CODE, NODE_SYMBOLS, MSG_TYPE_SYMBOLS
 from components.internal.internal_logger import getLogger
 
 from components.static.const import EventType, OnMouseEventColor
 from components.static.const import STATIC_PATH, EVENT_STEP_TO_ANIM_STEP_RATIO, ENVELOPE_STEPS_COUNT
 
 from components.visible.debsettings import SettingsEditor
+from components.visible.eventlist import EventList, EventListModel, EventFilterBar
+from components.visible.eventsearch import EventSearchBar
 from components.visible.jsonviewer import JsonViewer
 from components.visible.nodedisplay import CentralDisplay
 
 logger = getLogger('event_menu')
 
-DISPLAYED_EVENT_GRID = (
-    (1, 0, 1, 1),
-    (0, 1, 3, 3)
-)
+ENVELOPE_PATH = f'{STATIC_PATH}/pics/envelope.png'
+CROSS_PATH = f'{STATIC_PATH}/pics/cross.png'
 
-NULL_EVENT_TYPE = 'None'
 
+def _src(events: EventStore, idx: int) -> str:
+    return NODE_SYMBOLS[events.src[idx]]
 
-class DisplayedEvent(QtWidgets.QWidget):
+
+def _dst(events: EventStore, idx: int) -> str:
+    # 'dst' or 'node' of event
+    return NODE_SYMBOLS[events.dst[idx]]
+
+
+def _msg_type(events: EventStore, idx: int) -> str:
+    return MSG_TYPE_SYMBOLS[events.msg_types[idx]]
+
+
+class DisplayedEvent:
     '''
     Abstract class.
     '''
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        QtWidgets.QWidget.__init__(self, parent)
+    # Shows event on display, rows of event menu are painted by EventDelegate,
+    # so objects of this class are only made for shown or selected events.
+    # transient event is shown only while it is the last one,
+    # persistent one (crash, disconnect etc) stays shown: state of nodes it changes
+    # is drawn from changes of ClusterState (see CentralDisplay.apply_state_changes)
+    IS_TRANSIENT = True
+    PAYLOAD_EXPANDED = True  # payload tree is expanded when event is chosen
+
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
         self._event = event
         self._display = display
-        self._main_layout = QtWidgets.QGridLayout(self)
-
-        self._main_lbl = QtWidgets.QLabel(self)
-        self._main_lbl.setAlignment(QtCore.Qt.AlignCenter)
-        self._main_layout.addWidget(self._main_lbl, *DISPLAYED_EVENT_GRID[0])
-
-        self.setLayout(self._main_layout)
+        self._settings_editor = settings_editor
 
         self._show_counter = 0  # can hide only when this counter = 0
         self._select_counter = 0
         self._is_pinned = False  # == selected by left click on it
         self._color = None
-    
+
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        # text of row in event menu, made only from columns of store
+        nodes = ' --> '.join(
+            NODE_SYMBOLS[node] for node in dict.fromkeys((events.src[idx], events.dst[idx]))
+            if node != EventStore.NO_NODE
+        )
+        caption = f'{events.timestamps[idx]:.3f} | {events.type_of(idx).value}'
+        return f'{caption} | {nodes}' if nodes else caption
+
+    @staticmethod
+    def payload(event: Event) -> t.Any:
+        # value for payload viewer of event menu
+        return None
+
+    def add_to_node_info(self):
+        pass
+
     def get_underlying_event(self):
         return self._event
-    
-    def hide_widget(self):
-        super().hide()
-    
-    def show_widget(self):
-        super().show()
-    
+
+    def get_color(self) -> t.Optional[str]:
+        return self._color
+
     def show(self):
         if self._show_counter == 0:
             self._show()
@@ -63,6 +90,9 @@ class DisplayedEvent(QtWidgets.QWidget):
         if self._show_counter == 0:
             self._hide()
 
+    def is_shown(self):
+        return self._show_counter > 0
+
     def _show(self):
         pass
 
@@ -82,68 +112,53 @@ class DisplayedEvent(QtWidgets.QWidget):
             self._deselect()
 
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self.show()
 
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self.hide()
 
-    def get_underlying_event(self):
-        return self._event
-
     def is_selected(self):
         return self._select_counter > 0
-    
-    def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:
-        if event.button() == QtCore.Qt.MouseButton.LeftButton:
-            if self._is_pinned:
-                self.deselect()
-                self._is_pinned = False
-            else:
-                self.select()
-                self._is_pinned = True
-        elif event.button() == QtCore.Qt.MouseButton.RightButton:
-            self._display.run_to_event(self._event.idx)
-        return super().mousePressEvent(event)
-    
-    def enterEvent(self, event: QtCore.QEvent) -> None:
-        self.select()
-        return super().enterEvent(event)
-    
-    def leaveEvent(self, event: QtCore.QEvent) -> None:
-        self.deselect()
-        return super().leaveEvent(event)
+
+    def is_pinned(self):
+        return self._is_pinned
+
+    def toggle_pin(self):
+        if self._is_pinned:
+            self.deselect()
+            self._is_pinned = False
+        else:
+            self.select()
+            self._is_pinned = True
 
 
 class DisplayedMsgSend(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["src"]} --> {event.data["dst"]} | {event.data["msg"]["type"]}'
-        )
-        self._main_lbl.setText(caption)
+    PAYLOAD_EXPANDED = False
 
-        self._msg_viewer = JsonViewer(event.data['msg']['data'], "Data", self, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_src(events, idx)} --> {_dst(events, idx)} | {_msg_type(events, idx)}'
+
+    @staticmethod
+    def payload(event: Event) -> t.Any:
+        return event.data['msg']['data']
+
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._line: t.Optional[QtWidgets.QGraphicsLineItem] = None
         self._color: str = OnMouseEventColor.MESSAGE_SEND
 
         node_icon_size = self._display.get_node_icon_size()
-        pixmap = QtGui.QPixmap(QtGui.QImage(f'{STATIC_PATH}/pics/envelope.png')).scaledToWidth(node_icon_size[0] // 2)
+        pixmap = self._display.icons.pixmap(ENVELOPE_PATH, width=node_icon_size[0] // 2)
         self._envelope_size = (pixmap.width(), pixmap.height())
         self._envelope = QtWidgets.QGraphicsPixmapItem(pixmap)
 
         self._envelope_positions = self._calc_envelope_positions()
         self._envelope_pos_idx = 0
-        
-        self._timer = QtCore.QTimer()
-        self._timer.timeout.connect(self.advance_envelope)
-        self._settings_editor = settings_editor
 
-        # add msg to node info
-        self._display.displayed_nodes[event.data['src']].add_sent_msg(event.data)
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['src']].add_sent_msg(self._event.data, self._event.idx)
     
     def _show(self):
         self.draw_line()
@@ -152,13 +167,11 @@ class DisplayedMsgSend(DisplayedEvent):
         self.remove_line()
     
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self.show()
         # self._line.setPen(QtGui.QPen(QtGui.QColor(self._color), 3))
         self._line.setZValue(1)  # this brings line to the top of all other items to be seen
     
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         # self._line.setPen(QtGui.QPen(QtGui.QColor(self._color), 3))
         self._line.setZValue(0)
         self.hide()
@@ -194,13 +207,15 @@ class DisplayedMsgSend(DisplayedEvent):
             self._envelope_positions[0][1]
         )
         self._display.scene().addItem(self._envelope)
-        self._timer.start(self._settings_editor.get_settings().next_step_delay / EVENT_STEP_TO_ANIM_STEP_RATIO)
+        self._display.start_animation(
+            self.advance_envelope, self._settings_editor.get_settings().next_step_delay / EVENT_STEP_TO_ANIM_STEP_RATIO
+        )
     
     def remove_line(self):
         if self._line is None:
             logger.debug(f"Line already removed {self._event.data['src']} --> {self._event.data['dst']}")
             return
-        self._timer.stop()
+        self._display.stop_animation(self.advance_envelope)
         src_node, dst_node = (
             self._display.displayed_nodes[self._event.data['src']],
             self._display.displayed_nodes[self._event.data['dst']]
@@ -212,8 +227,8 @@ class DisplayedMsgSend(DisplayedEvent):
         self._display.scene().removeItem(self._envelope)
         self._line = None
     
-    def advance_envelope(self):
-        self._envelope_pos_idx = (self._envelope_pos_idx + 1) % (ENVELOPE_STEPS_COUNT + 1)
+    def advance_envelope(self, steps: int = 1):
+        self._envelope_pos_idx = (self._envelope_pos_idx + steps) % (ENVELOPE_STEPS_COUNT + 1)
         self._envelope.setPos(
             self._envelope_positions[self._envelope_pos_idx][0],
             self._envelope_positions[self._envelope_pos_idx][1]
@@ -245,33 +260,32 @@ class DisplayedMsgSend(DisplayedEvent):
 
 
 class DisplayedMsgRcv(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["dst"]} <-- {event.data["src"]} | {event.data["msg"]["type"]}'
-        )
-        self._main_lbl.setText(caption)
+    PAYLOAD_EXPANDED = False
 
-        self._msg_viewer = JsonViewer(event.data['msg']['data'], "Data", self, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_dst(events, idx)} <-- {_src(events, idx)} | {_msg_type(events, idx)}'
+
+    @staticmethod
+    def payload(event: Event) -> t.Any:
+        return event.data['msg']['data']
+
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._line: t.Optional[QtWidgets.QGraphicsLineItem] = None
         self._color: str = OnMouseEventColor.MESSAGE_RECEIVE
 
         node_icon_size = self._display.get_node_icon_size()
-        pixmap = QtGui.QPixmap(QtGui.QImage(f'{STATIC_PATH}/pics/envelope.png')).scaledToWidth(node_icon_size[0] // 2)
+        pixmap = self._display.icons.pixmap(ENVELOPE_PATH, width=node_icon_size[0] // 2)
         self._envelope_size = (pixmap.width(), pixmap.height())
         self._envelope = QtWidgets.QGraphicsPixmapItem(pixmap)
 
         self._envelope_positions = self._calc_envelope_positions()
         self._envelope_pos_idx = 0
-        
-        self._timer = QtCore.QTimer()
-        self._timer.timeout.connect(self.advance_envelope)
-        self._settings_editor = settings_editor
 
-        # add msg to node info
-        self._display.displayed_nodes[event.data['dst']].add_received_msg(event.data)
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['dst']].add_received_msg(self._event.data, self._event.idx)
     
     def _show(self):
         self.draw_line()
@@ -280,12 +294,10 @@ class DisplayedMsgRcv(DisplayedEvent):
         self.remove_line()
     
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self.show()
         self._line.setZValue(1)
 
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self._line.setZValue(0)
         self.hide()
 
@@ -320,13 +332,15 @@ class DisplayedMsgRcv(DisplayedEvent):
             self._envelope_positions[0][1]
         )
         self._display.scene().addItem(self._envelope)
-        self._timer.start(self._settings_editor.get_settings().next_step_delay / EVENT_STEP_TO_ANIM_STEP_RATIO)
+        self._display.start_animation(
+            self.advance_envelope, self._settings_editor.get_settings().next_step_delay / EVENT_STEP_TO_ANIM_STEP_RATIO
+        )
     
     def remove_line(self):
         if self._line is None:
             logger.debug(f"Line already removed {self._event.data['dst']} <-- {self._event.data['src']}")
             return
-        self._timer.stop()
+        self._display.stop_animation(self.advance_envelope)
         src_node, dst_node = (
             self._display.displayed_nodes[self._event.data['src']],
             self._display.displayed_nodes[self._event.data['dst']]
@@ -338,8 +352,8 @@ class DisplayedMsgRcv(DisplayedEvent):
         self._display.scene().removeItem(self._envelope)
         self._line = None
     
-    def advance_envelope(self):
-        self._envelope_pos_idx = (self._envelope_pos_idx + 1) % (ENVELOPE_STEPS_COUNT + 1)
+    def advance_envelope(self, steps: int = 1):
+        self._envelope_pos_idx = (self._envelope_pos_idx + steps) % (ENVELOPE_STEPS_COUNT + 1)
         self._envelope.setPos(
             self._envelope_positions[self._envelope_pos_idx][0],
             self._envelope_positions[self._envelope_pos_idx][1]
@@ -371,20 +385,23 @@ class DisplayedMsgRcv(DisplayedEvent):
 
 
 class DisplayedMsgSendLocal(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["dst"]} >>> local | {event.data["msg"]["type"]}'
-        )
-        self._main_lbl.setText(caption)
+    PAYLOAD_EXPANDED = False
+
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_dst(events, idx)} >>> local | {_msg_type(events, idx)}'
+
+    @staticmethod
+    def payload(event: Event) -> t.Any:
+        return event.data['msg']['data']
 
-        self._msg_viewer = JsonViewer(event.data['msg']['data'], "Data", self, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._color: str = OnMouseEventColor.LOCAL_MESSAGE
 
-        # add msg to node info
-        self._display.displayed_nodes[event.data['dst']].add_local_sent_msg(event.data)
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['dst']].add_local_sent_msg(self._event.data, self._event.idx)
 
     def _show(self):
         self._display.displayed_nodes[self._event.data['dst']].show_border()
@@ -396,20 +413,23 @@ class DisplayedMsgSendLocal(DisplayedEvent):
 
 
 class DisplayedMsgRcvLocal(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["dst"]} <<< local | {event.data["msg"]["type"]}'
-        )
-        self._main_lbl.setText(caption)
+    PAYLOAD_EXPANDED = False
+
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_dst(events, idx)} <<< local | {_msg_type(events, idx)}'
+
+    @staticmethod
+    def payload(event: Event) -> t.Any:
+        return event.data['msg']['data']
 
-        self._msg_viewer = JsonViewer(event.data['msg']['data'], "Data", self, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._color: str = OnMouseEventColor.LOCAL_MESSAGE
 
-        # add msg to node info
-        self._display.displayed_nodes[event.data['dst']].add_local_rcv_msg(event.data)
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['dst']].add_local_rcv_msg(self._event.data, self._event.idx)
 
     def _show(self):
         self._display.displayed_nodes[self._event.data['dst']].show_border()
@@ -421,32 +441,32 @@ class DisplayedMsgRcvLocal(DisplayedEvent):
     
 
 class DisplayedMsgDrop(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
+    PAYLOAD_EXPANDED = False
 
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["src"]} --x {event.data["dst"]} '
-            f'| {event.data["msg"]["type"]}\n(Dropped)'
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return (
+            f'{events.timestamps[idx]:.3f} | {_src(events, idx)} --x {_dst(events, idx)} '
+            f'| {_msg_type(events, idx)}\n(Dropped)'
         )
-        self._main_lbl.setText(caption)
 
-        self._msg_viewer = JsonViewer(event.data['msg']['data'], "Data", self, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    @staticmethod
+    def payload(event: Event) -> t.Any:
+        return event.data['msg']['data']
+
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._line: t.Optional[QtWidgets.QGraphicsLineItem] = None
         self._color: str = OnMouseEventColor.MESSAGE_DROPPED
 
         node_icon_size = self._display.get_node_icon_size()
-        pixmap = QtGui.QPixmap(QtGui.QImage(f'{STATIC_PATH}/pics/cross.png')).scaledToWidth(node_icon_size[0] // 1.5)
+        pixmap = self._display.icons.pixmap(CROSS_PATH, width=node_icon_size[0] // 1.5)
         self._cross_size = (pixmap.width(), pixmap.height())
         self._cross = QtWidgets.QGraphicsPixmapItem(pixmap)
 
         self._cross_positions = self._calc_cross_positions()
         self._cross_pos_idx = 0
-        
-        self._timer = QtCore.QTimer()
-        self._timer.timeout.connect(self.advance_cross)
-        self._settings_editor = settings_editor
 
     def _show(self):
         self.draw_line()
@@ -455,12 +475,10 @@ class DisplayedMsgDrop(DisplayedEvent):
         self.remove_line()
     
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self.show()
         self._line.setZValue(1)
     
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self._line.setZValue(0)
         self.hide()
 
@@ -495,13 +513,15 @@ class DisplayedMsgDrop(DisplayedEvent):
             self._cross_positions[0][1]
         )
         self._display.scene().addItem(self._cross)
-        self._timer.start(self._settings_editor.get_settings().next_step_delay / EVENT_STEP_TO_ANIM_STEP_RATIO)
+        self._display.start_animation(
+            self.advance_cross, self._settings_editor.get_settings().next_step_delay / EVENT_STEP_TO_ANIM_STEP_RATIO
+        )
     
     def remove_line(self):
         if self._line is None:
             logger.debug(f"Line already removed {self._event.data['dst']} <-- {self._event.data['src']}")
             return
-        self._timer.stop()
+        self._display.stop_animation(self.advance_cross)
         src_node, dst_node = (
             self._display.displayed_nodes[self._event.data['src']],
             self._display.displayed_nodes[self._event.data['dst']]
@@ -513,8 +533,8 @@ class DisplayedMsgDrop(DisplayedEvent):
         self._display.scene().removeItem(self._cross)
         self._line = None
     
-    def advance_cross(self):
-        self._cross_pos_idx = (self._cross_pos_idx + 1) % (ENVELOPE_STEPS_COUNT + 1)
+    def advance_cross(self, steps: int = 1):
+        self._cross_pos_idx = (self._cross_pos_idx + steps) % (ENVELOPE_STEPS_COUNT + 1)
         self._cross.setPos(
             self._cross_positions[self._cross_pos_idx][0],
             self._cross_positions[self._cross_pos_idx][1]
@@ -546,32 +566,32 @@ class DisplayedMsgDrop(DisplayedEvent):
 
 
 class DisplayedMsgDiscard(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
+    PAYLOAD_EXPANDED = False
 
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["src"]} --x {event.data["dst"]} '
-            f'| {event.data["msg"]["type"]}\n(Discarded)'
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return (
+            f'{events.timestamps[idx]:.3f} | {_src(events, idx)} --x {_dst(events, idx)} '
+            f'| {_msg_type(events, idx)}\n(Discarded)'
         )
-        self._main_lbl.setText(caption)
 
-        self._msg_viewer = JsonViewer(event.data['msg']['data'], "Data", self, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    @staticmethod
+    def payload(event: Event) -> t.Any:
+        return event.data['msg']['data']
+
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._line: t.Optional[QtWidgets.QGraphicsLineItem] = None
         self._color: str = OnMouseEventColor.MESSAGE_DROPPED
 
         node_icon_size = self._display.get_node_icon_size()
-        pixmap = QtGui.QPixmap(QtGui.QImage(f'{STATIC_PATH}/pics/cross.png')).scaledToWidth(node_icon_size[0] // 1.5)
+        pixmap = self._display.icons.pixmap(CROSS_PATH, width=node_icon_size[0] // 1.5)
         self._cross_size = (pixmap.width(), pixmap.height())
         self._cross = QtWidgets.QGraphicsPixmapItem(pixmap)
 
         self._cross_positions = self._calc_cross_positions()
         self._cross_pos_idx = 0
-        
-        self._timer = QtCore.QTimer()
-        self._timer.timeout.connect(self.advance_cross)
-        self._settings_editor = settings_editor
     
     def _show(self):
         self.draw_line()
@@ -580,12 +600,10 @@ class DisplayedMsgDiscard(DisplayedEvent):
         self.remove_line()
     
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self.show()
         self._line.setZValue(1)
 
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self._line.setZValue(0)
         self.hide()
 
@@ -620,13 +638,15 @@ class DisplayedMsgDiscard(DisplayedEvent):
             self._cross_positions[0][1]
         )
         self._display.scene().addItem(self._cross)
-        self._timer.start(self._settings_editor.get_settings().next_step_delay / EVENT_STEP_TO_ANIM_STEP_RATIO)
+        self._display.start_animation(
+            self.advance_cross, self._settings_editor.get_settings().next_step_delay / EVENT_STEP_TO_ANIM_STEP_RATIO
+        )
     
     def remove_line(self):
         if self._line is None:
             logger.debug(f"Line already removed {self._event.data['dst']} <-- {self._event.data['src']}")
             return
-        self._timer.stop()
+        self._display.stop_animation(self.advance_cross)
         src_node, dst_node = (
             self._display.displayed_nodes[self._event.data['src']],
             self._display.displayed_nodes[self._event.data['dst']]
@@ -638,8 +658,8 @@ class DisplayedMsgDiscard(DisplayedEvent):
         self._display.scene().removeItem(self._cross)
         self._line = None
     
-    def advance_cross(self):
-        self._cross_pos_idx = (self._cross_pos_idx + 1) % (ENVELOPE_STEPS_COUNT + 1)
+    def advance_cross(self, steps: int = 1):
+        self._cross_pos_idx = (self._cross_pos_idx + steps) % (ENVELOPE_STEPS_COUNT + 1)
         self._cross.setPos(
             self._cross_positions[self._cross_pos_idx][0],
             self._cross_positions[self._cross_pos_idx][1]
@@ -671,20 +691,21 @@ class DisplayedMsgDiscard(DisplayedEvent):
 
 
 class DisplayedTimerFired(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["node"]} !-- timer'
-        )
-        self._main_lbl.setText(caption)
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_dst(events, idx)} !-- timer'
 
-        self._msg_viewer = JsonViewer({'name': event.data['name']}, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    @staticmethod
+    def payload(event: Event) -> t.Any:
+        return {'name': event.data['name']}
+
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._color: str = OnMouseEventColor.TIMER_FIRED
 
-        # add timer to node info
-        self._display.displayed_nodes[event.data['node']].add_timer_fired(event.data)
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['node']].add_timer_fired(self._event.data, self._event.idx)
 
     def _show(self):
         self._display.displayed_nodes[self._event.data['node']].show_border()
@@ -696,144 +717,105 @@ class DisplayedTimerFired(DisplayedEvent):
     
 
 class DisplayedNodeCrash(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["node"]} CRASHED!'
-        )
-        self._main_lbl.setText(caption)
+    IS_TRANSIENT = False
 
-        self._msg_viewer = JsonViewer(None, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_dst(events, idx)} CRASHED!'
 
-        self._color: str = OnMouseEventColor.NODE_CRASHED
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
-        # add to node info
-        self._display.displayed_nodes[event.data['node']].add_node_crashed(event.data)
+        self._color: str = OnMouseEventColor.NODE_CRASHED
 
-    def _show(self):
-        self._display.displayed_nodes[self._event.data['node']].show_cross()
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['node']].add_node_crashed(self._event.data, self._event.idx)
 
-    def _hide(self):
-        self._display.displayed_nodes[self._event.data['node']].hide_cross()
-    
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self._display.displayed_nodes[self._event.data['node']].show_cross()
     
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self._display.displayed_nodes[self._event.data['node']].hide_cross()
     
 
 class DisplayedNodeRecover(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["node"]} RECOVERED!'
-        )
-        self._main_lbl.setText(caption)
-
-        self._msg_viewer = JsonViewer(None, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    IS_TRANSIENT = False
 
-        self._color: str = OnMouseEventColor.NODE_RECOVERED
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_dst(events, idx)} RECOVERED!'
 
-        # add to node info
-        self._display.displayed_nodes[event.data['node']].add_node_recovered(event.data)
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
-    def _show(self):
-        self._display.displayed_nodes[self._event.data['node']].hide_cross()
+        self._color: str = OnMouseEventColor.NODE_RECOVERED
 
-    def _hide(self):
-        self._display.displayed_nodes[self._event.data['node']].show_cross()
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['node']].add_node_recovered(self._event.data, self._event.idx)
 
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self._display.displayed_nodes[self._event.data['node']].show_border()
     
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self._display.displayed_nodes[self._event.data['node']].hide_border()
     
 
 class DisplayedNodeDisconnect(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["node"]} DISCONNECTED!'
-        )
-        self._main_lbl.setText(caption)
+    IS_TRANSIENT = False
 
-        self._msg_viewer = JsonViewer(None, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_dst(events, idx)} DISCONNECTED!'
 
-        self._color: str = OnMouseEventColor.NODE_DISCONNECTED
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
-        # add to node info
-        self._display.displayed_nodes[event.data['node']].add_node_disconnected(event.data)
+        self._color: str = OnMouseEventColor.NODE_DISCONNECTED
 
-    def _show(self):
-        self._display.displayed_nodes[self._event.data['node']].show_disconnect()
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['node']].add_node_disconnected(self._event.data, self._event.idx)
 
-    def _hide(self):
-        self._display.displayed_nodes[self._event.data['node']].hide_disconnect()
-    
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self._display.displayed_nodes[self._event.data['node']].show_disconnect()
     
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self._display.displayed_nodes[self._event.data['node']].hide_disconnect()
 
 
 class DisplayedNodeConnect(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["node"]} CONNECTED!'
-        )
-        self._main_lbl.setText(caption)
+    IS_TRANSIENT = False
 
-        self._msg_viewer = JsonViewer(None, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_dst(events, idx)} CONNECTED!'
 
-        self._color: str = OnMouseEventColor.NODE_DISCONNECTED
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
-        # add to node info
-        self._display.displayed_nodes[event.data['node']].add_node_connected(event.data)
+        self._color: str = OnMouseEventColor.NODE_DISCONNECTED
 
-    def _show(self):
-        self._display.displayed_nodes[self._event.data['node']].hide_disconnect()
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['node']].add_node_connected(self._event.data, self._event.idx)
 
-    def _hide(self):
-        self._display.displayed_nodes[self._event.data['node']].show_disconnect()
-    
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self._display.displayed_nodes[self._event.data['node']].show_border()
 
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self._display.displayed_nodes[self._event.data['node']].hide_border()
 
 
 class DisplayedNodeRestart(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["node"]} RESTARTED!'
-        )
-        self._main_lbl.setText(caption)
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_dst(events, idx)} RESTARTED!'
 
-        self._msg_viewer = JsonViewer(None, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._color: str = OnMouseEventColor.NODE_RESTARTED
 
-        # add to node info
-        self._display.displayed_nodes[event.data['node']].add_node_restarted(event.data)
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['node']].add_node_restarted(self._event.data, self._event.idx)
 
     def _show(self):
         self._display.displayed_nodes[self._event.data['node']].show_border()
@@ -844,32 +826,28 @@ class DisplayedNodeRestart(DisplayedEvent):
         self._display.displayed_nodes[self._event.data['node']].hide_restart_icon()
     
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self.show()
 
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self.hide()
 
 
 class DisplayedLinkDisabled(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["src"]} --> {event.data["dst"]} | LINK DISABLED'
-        )
-        self._main_lbl.setText(caption)
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_src(events, idx)} --> {_dst(events, idx)} | LINK DISABLED'
+
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._line: t.Optional[QtWidgets.QGraphicsLineItem] = None
 
-        self._msg_viewer = JsonViewer(None, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
 
         self._color: str = OnMouseEventColor.LINK_DISABLED
 
-        # add to node info
-        self._display.displayed_nodes[event.data['src']].add_link_disabled(event.data)
-        self._display.displayed_nodes[event.data['dst']].add_link_disabled(event.data)
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['src']].add_link_disabled(self._event.data, self._event.idx)
+        self._display.displayed_nodes[self._event.data['dst']].add_link_disabled(self._event.data, self._event.idx)
     
     def _show(self):
         self.draw_line()
@@ -878,12 +856,10 @@ class DisplayedLinkDisabled(DisplayedEvent):
         self.remove_line()
     
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self.show()
         self._line.setZValue(1)
 
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self._line.setZValue(0)
         self.hide()
 
@@ -926,23 +902,21 @@ class DisplayedLinkDisabled(DisplayedEvent):
         self._line = None
     
 class DisplayedLinkEnabled(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | {event.data["src"]} --> {event.data["dst"]} | LINK ENABLED'
-        )
-        self._main_lbl.setText(caption)
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | {_src(events, idx)} --> {_dst(events, idx)} | LINK ENABLED'
+
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._line: t.Optional[QtWidgets.QGraphicsLineItem] = None
 
-        self._msg_viewer = JsonViewer(None, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
 
         self._color: str = OnMouseEventColor.LINK_ENABLED
 
-        # add to node info
-        self._display.displayed_nodes[event.data['src']].add_link_enabled(event.data)
-        self._display.displayed_nodes[event.data['dst']].add_link_enabled(event.data)
+    def add_to_node_info(self):
+        self._display.displayed_nodes[self._event.data['src']].add_link_enabled(self._event.data, self._event.idx)
+        self._display.displayed_nodes[self._event.data['dst']].add_link_enabled(self._event.data, self._event.idx)
     
     def _show(self):
         self.draw_line()
@@ -951,12 +925,10 @@ class DisplayedLinkEnabled(DisplayedEvent):
         self.remove_line()
     
     def _select(self):
-        self._main_lbl.setStyleSheet(f'background-color: {self._color};')
         self.show()
         self._line.setZValue(1)
 
     def _deselect(self):
-        self._main_lbl.setStyleSheet('')
         self._line.setZValue(0)
         self.hide()
 
@@ -1000,35 +972,37 @@ class DisplayedLinkEnabled(DisplayedEvent):
 
 
 class DisplayedNetworkPartition(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'{event.data["ts"]:.3f} | NETWORK PARTITION'
-        )
-        self._main_lbl.setText(caption)
+    IS_TRANSIENT = False  # groups of last partition stay marked
+
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return f'{events.timestamps[idx]:.3f} | NETWORK PARTITION'
 
-        data = {
+    @staticmethod
+    def payload(event: Event) -> t.Any:
+        return {
             "group1": event.data["group1"],
             "group2": event.data["group2"],
         }
-        self._msg_viewer = JsonViewer(data, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._color: str = OnMouseEventColor.NETWORK_PARTITION
 
-        # add to node info
-        for node_id in event.data['group1']:
-            self._display.displayed_nodes[node_id].add_network_partition(event.data)
-        for node_id in event.data['group2']:
-            self._display.displayed_nodes[node_id].add_network_partition(event.data)
+    def add_to_node_info(self):
+        for node_id in self._event.data['group1']:
+            self._display.displayed_nodes[node_id].add_network_partition(self._event.data, self._event.idx)
+        for node_id in self._event.data['group2']:
+            self._display.displayed_nodes[node_id].add_network_partition(self._event.data, self._event.idx)
     
-    def _show(self):
+    def _select(self):
         for node_id in self._event.data["group1"]:
             self._display.displayed_nodes[node_id].show_partition(1)
         for node_id in self._event.data["group2"]:
             self._display.displayed_nodes[node_id].show_partition(2)
 
-    def _hide(self):
+    def _deselect(self):
         for node_id in self._event.data["group1"]:
             self._display.displayed_nodes[node_id].hide_partition()
         for node_id in self._event.data["group2"]:
@@ -1036,401 +1010,241 @@ class DisplayedNetworkPartition(DisplayedEvent):
 
 
 class DisplayedTestEnd(DisplayedEvent):
-    def __init__(self, event: Event, display: CentralDisplay, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
-        DisplayedEvent.__init__(self, event, display, parent)
-        caption = (
-            f'TEST ENDED!'
-        )
-        self._main_lbl.setText(caption)
+    IS_TRANSIENT = False
+
+    @staticmethod
+    def caption(events: EventStore, idx: int) -> str:
+        return 'TEST ENDED!'
 
-        self._msg_viewer = JsonViewer(None, "Data", self, True, expanded_h_ratio=3)
-        self._main_layout.addWidget(self._msg_viewer, *DISPLAYED_EVENT_GRID[1])
+    def __init__(self, event: Event, display: CentralDisplay, settings_editor: SettingsEditor) -> None:
+        DisplayedEvent.__init__(self, event, display, settings_editor)
 
         self._color: str = OnMouseEventColor.TEST_END
 
 
+DISPLAYED_EVENT_BY_TYPE: t.Dict[str, t.Type[DisplayedEvent]] = {
+    EventType.MESSAGE_SEND: DisplayedMsgSend,
+    EventType.MESSAGE_RECEIVE: DisplayedMsgRcv,
+    EventType.LOCAL_MESSAGE_SEND: DisplayedMsgSendLocal,
+    EventType.LOCAL_MESSAGE_RECEIVE: DisplayedMsgRcvLocal,
+    EventType.MESSAGE_DROPPED: DisplayedMsgDrop,
+    EventType.MESSAGE_DISCARDED: DisplayedMsgDiscard,
+    EventType.TIMER_FIRED: DisplayedTimerFired,
+    EventType.NODE_RECOVERED: DisplayedNodeRecover,
+    EventType.NODE_CRASHED: DisplayedNodeCrash,
+    EventType.NODE_CONNECTED: DisplayedNodeConnect,
+    EventType.NODE_DISCONNECTED: DisplayedNodeDisconnect,
+    EventType.NODE_RESTARTED: DisplayedNodeRestart,
+    EventType.LINK_DISABLED: DisplayedLinkDisabled,
+    EventType.LINK_ENABLED: DisplayedLinkEnabled,
+    EventType.NETWORK_PARTITION: DisplayedNetworkPartition,
+    EventType.TEST_END: DisplayedTestEnd,
+}
+
+
+def event_caption(events: EventStore, idx: int) -> str:
+    return DISPLAYED_EVENT_BY_TYPE[EVENT_TYPE_BY_CODE[events.types[idx]]].caption(events, idx)
+
+
 class EventMenu(QtWidgets.QWidget):
     def __init__(self, display: CentralDisplay, settings_editor: SettingsEditor, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
         QtWidgets.QWidget.__init__(self, parent)
         self._settings_editor = settings_editor
         self._main_layout = QtWidgets.QVBoxLayout(self)
 
-        # filter list
-        self._event_filter = QtWidgets.QWidget(self)
-        self._event_filter_layout = QtWidgets.QHBoxLayout(self._event_filter)
-        self._event_filter_lbl = QtWidgets.QLabel('Filter by: ', self._event_filter)
-        self._filter_list = QtWidgets.QComboBox(self._event_filter)
-        for type in [
-            NULL_EVENT_TYPE,
-            *list(EventType)
-        ]:
-            self._filter_list.addItem(type)
-        self._filter_list.currentTextChanged.connect(self.filter_value_changed)
-        self._current_filter_value = self._filter_list.currentText()
-        self._event_filter_layout.addWidget(self._event_filter_lbl)
-        self._event_filter_layout.addWidget(self._filter_list)
-        self._event_filter.setLayout(self._event_filter_layout)
+        # filter of events list, shown events are found by posting lists of events
+        self._event_filter = EventFilterBar(self)
+        self._event_filter.filter_changed.connect(self.filter_value_changed)
         self._main_layout.addWidget(self._event_filter)
 
-        # events scroll area
-        self._events_scroll = QtWidgets.QScrollArea(self, widgetResizable=True)
-        self._scroll_bar = self._events_scroll.verticalScrollBar()
-        self._force_prevent_scrolling = True
-        self._scroll_bar.rangeChanged.connect(self.scroll_events_down)  # auto scroll when content changes
-        # self._events_scroll.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOn)
-        # self._events_scroll.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
-        self._events_wgt = QtWidgets.QWidget(self)
-        self._events_layout = QtWidgets.QVBoxLayout(self._events_wgt)
-        self._events_layout.addStretch(1)
-        self._events_wgt.setLayout(self._events_layout)
-        self._events_scroll.setWidget(self._events_wgt)
-        self._main_layout.addWidget(self._events_scroll)
+        # search in payloads, found event becomes the last shown one
+        self._event_search = EventSearchBar(lambda: self._events_model.events_count() - 1, self)
+        self._event_search.jump_requested.connect(self.event_right_clicked)
+        self._main_layout.addWidget(self._event_search)
+
+        # events list: shown events are rows of model over events of test,
+        # only visible rows are painted
+        self._events_model = EventListModel(event_caption, self)
+        self._events_view = EventList(self._events_model, self)
+        self._events_view.hovered.connect(self.event_hovered)
+        self._events_view.left_clicked.connect(self.event_left_clicked)
+        self._events_view.right_clicked.connect(self.event_right_clicked)
+        self._main_layout.addWidget(self._events_view, stretch=3)
+
+        # payload of pinned event or of the last shown one
+        self._payload_viewer = JsonViewer(None, 'Data', self)
+        self._main_layout.addWidget(self._payload_viewer, stretch=1)
+        self._chosen_event_idx: t.Optional[int] = None
+        # payload tree is built once per event loop iteration, not for every event of playback
+        self._payload_timer = QtCore.QTimer(self)
+        self._payload_timer.setSingleShot(True)
+        self._payload_timer.timeout.connect(self.update_payload)
         
         self.setLayout(self._main_layout)
 
-        self._last_shown_event: DisplayedEvent = None
         self._display = display
+        self._events = EventStore()
 
-        # {node_id: crash_event}
-        self._crash_node_events: t.Dict[str, DisplayedNodeCrash] = {}
-        self._disconnect_node_events: t.Dict[str, DisplayedNodeDisconnect] = {}
+        # objects only for events which are shown on display or selected
+        self._last_shown_event: t.Optional[DisplayedEvent] = None
+        self._hovered_event: t.Optional[DisplayedEvent] = None
+        self._pinned_events: t.Dict[int, DisplayedEvent] = {}
 
-        self._event_stack: t.List[DisplayedEvent] = []
+        self._first_event_idx = 0  # events before it are not shown on display (only in list)
     
-    def next_event(self, event: Event):
-        self._filter_list.setCurrentIndex(0)  # show all events for better experience
+    def first_event_idx(self) -> int:
+        return self._first_event_idx
+
+    def set_first_event_idx(self, first_event_idx: int):
+        # older stepped events stay in list, pinned ones stay on display
+        self._first_event_idx = first_event_idx
+
+    def set_events(self, events: EventStore):
+        # events of selected test
+        self.clear_events()
+        self._events = events
+        self._event_filter.set_events(events)
+        self._event_search.set_events(events)
+        self._events_model.set_events(events)
+
+    def _displayed_event(self, event_idx: int) -> DisplayedEvent:
+        # the same object is used for event while it is shown or selected
+        for displayed_event in [self._last_shown_event, self._hovered_event, self._pinned_events.get(event_idx)]:
+            if displayed_event is not None and displayed_event.get_underlying_event().idx == event_idx:
+                return displayed_event
+        event = self._events[event_idx]
+        return DISPLAYED_EVENT_BY_TYPE[event.type](event, self._display, self._settings_editor)
+
+    def _update_highlight(self, displayed_event: DisplayedEvent):
+        self._events_model.set_highlight(
+            displayed_event.get_underlying_event().idx,
+            displayed_event.get_color() if displayed_event.is_selected() else None
+        )
 
-        self._force_prevent_scrolling = False
+    def next_event(self, event: Event):
+        self._event_filter.reset()  # show all events for better experience
 
         if self._last_shown_event is not None:
             # hide prev step event
             self._last_shown_event.hide()
             self._last_shown_event = None
-        
-        if not self._event_stack:
-            # first call to next event --> add dummy event to stack
-            self._event_stack.append(None)
-        
-        if event.type == EventType.MESSAGE_SEND:
-            self._last_shown_event = DisplayedMsgSend(event, self._display, self._settings_editor, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-
-        elif event.type == EventType.MESSAGE_RECEIVE:
-            self._last_shown_event = DisplayedMsgRcv(event, self._display, self._settings_editor, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-
-        elif event.type == EventType.LOCAL_MESSAGE_SEND:
-            self._last_shown_event = DisplayedMsgSendLocal(event, self._display, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-            
-        elif event.type == EventType.LOCAL_MESSAGE_RECEIVE:
-            self._last_shown_event = DisplayedMsgRcvLocal(event, self._display, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-
-        elif event.type == EventType.MESSAGE_DROPPED:
-            self._last_shown_event = DisplayedMsgDrop(event, self._display, self._settings_editor, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-        
-        elif event.type == EventType.MESSAGE_DISCARDED:
-            self._last_shown_event = DisplayedMsgDiscard(event, self._display, self._settings_editor, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-
-        elif event.type == EventType.TIMER_FIRED:
-            self._last_shown_event = DisplayedTimerFired(event, self._display, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-
-        elif event.type == EventType.NODE_RECOVERED:
-            new_display_event = DisplayedNodeRecover(event, self._display, self._events_wgt)
-            self._event_stack.append(new_display_event)
-            self._events_layout.addWidget(
-                new_display_event, alignment=QtCore.Qt.AlignTop
-            )
-            new_display_event.show()
-
-        elif event.type == EventType.NODE_CRASHED:
-            new_display_event = DisplayedNodeCrash(event, self._display, self._events_wgt)
-            self._event_stack.append(new_display_event)
-            self._events_layout.addWidget(
-                new_display_event, alignment=QtCore.Qt.AlignTop
-            )
-            new_display_event.show()
-        
-        elif event.type == EventType.NODE_CONNECTED:
-            new_display_event = DisplayedNodeConnect(event, self._display, self._events_wgt)
-            self._event_stack.append(new_display_event)
-            self._events_layout.addWidget(
-                new_display_event, alignment=QtCore.Qt.AlignTop
-            )
-            new_display_event.show()
-        
-        elif event.type == EventType.NODE_DISCONNECTED:
-            new_display_event = DisplayedNodeDisconnect(event, self._display, self._events_wgt)
-            self._event_stack.append(new_display_event)
-            self._events_layout.addWidget(
-                new_display_event, alignment=QtCore.Qt.AlignTop
-            )
-            new_display_event.show()
-        
-        elif event.type == EventType.NODE_RESTARTED:
-            self._last_shown_event = DisplayedNodeRestart(event, self._display, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-        
-        elif event.type == EventType.LINK_DISABLED:
-            self._last_shown_event = DisplayedLinkDisabled(event, self._display, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-        
-        elif event.type == EventType.LINK_ENABLED:
-            self._last_shown_event = DisplayedLinkEnabled(event, self._display, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-        
-        elif event.type == EventType.NETWORK_PARTITION:
-            self._last_shown_event = DisplayedNetworkPartition(event, self._display, self._events_wgt)
-            self._event_stack.append(self._last_shown_event)
-            self._events_layout.addWidget(
-                self._last_shown_event, alignment=QtCore.Qt.AlignTop
-            )
-            self._last_shown_event.show()
-        
-        elif event.type == EventType.TEST_END:
-            new_display_event = DisplayedTestEnd(event, self._display, self._events_wgt)
-            self._event_stack.append(new_display_event)
-            self._events_layout.addWidget(
-                new_display_event, alignment=QtCore.Qt.AlignTop
-            )
-            new_display_event.show()
 
-        else:
+        if event.type not in DISPLAYED_EVENT_BY_TYPE:
             logger.error(f'Not implemented handler for event type: {event.type}')
             raise RuntimeError('Handler not implemented')
+
+        self._display.set_next_event_idx(event.idx + 1)
+        displayed_event = DISPLAYED_EVENT_BY_TYPE[event.type](event, self._display, self._settings_editor)
+        displayed_event.add_to_node_info()
+        self._events_model.set_events_count(event.idx + 1)
+        displayed_event.show()
+        if displayed_event.IS_TRANSIENT:
+            self._last_shown_event = displayed_event
+        self._events_view.scroll_to_bottom()
+        self.request_payload()
     
     def prev_event(self):
-        self._filter_list.setCurrentIndex(0)  # show all events for better experience
-        
-        if len(self._event_stack) == 1:
-            # only first dummy event left
-            return
-        
-        self._force_prevent_scrolling = False
-        
-        curr_displayed_event = self._event_stack.pop()
-        prev_displayed_event = self._event_stack[-1]
-        curr_event = curr_displayed_event.get_underlying_event()
-        if prev_displayed_event is not None:  # check if this is dummy first event
-            prev_event = prev_displayed_event.get_underlying_event()
-
-        # 1. process removing current event
-        curr_displayed_event._hide()
-        if curr_event.type == EventType.MESSAGE_SEND:
-            self._display.displayed_nodes[curr_event.data['src']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.MESSAGE_RECEIVE:
-            self._display.displayed_nodes[curr_event.data['dst']].pop_event()
-            curr_displayed_event.deleteLater()
-        
-        elif curr_event.type == EventType.LOCAL_MESSAGE_SEND:
-            self._display.displayed_nodes[curr_event.data['dst']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.LOCAL_MESSAGE_RECEIVE:
-            self._display.displayed_nodes[curr_event.data['dst']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.MESSAGE_DROPPED:
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.MESSAGE_DISCARDED:
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.TIMER_FIRED:
-            self._display.displayed_nodes[curr_event.data['node']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.NODE_RECOVERED:
-            self._display.displayed_nodes[curr_event.data['node']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.NODE_RESTARTED:
-            self._display.displayed_nodes[curr_event.data['node']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.NODE_CRASHED:
-            self._display.displayed_nodes[curr_event.data['node']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.NODE_CONNECTED:
-            self._display.displayed_nodes[curr_event.data['node']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.NODE_DISCONNECTED:
-            self._display.displayed_nodes[curr_event.data['node']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.LINK_ENABLED:
-            self._display.displayed_nodes[curr_event.data['src']].pop_event()
-            self._display.displayed_nodes[curr_event.data['dst']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.LINK_DISABLED:
-            self._display.displayed_nodes[curr_event.data['src']].pop_event()
-            self._display.displayed_nodes[curr_event.data['dst']].pop_event()
-            curr_displayed_event.deleteLater()
-
-        elif curr_event.type == EventType.NETWORK_PARTITION:
-            for node_id in curr_event.data['group1']:
-                self._display.displayed_nodes[node_id].pop_event()
-            for node_id in curr_event.data['group2']:
-                self._display.displayed_nodes[node_id].pop_event()
-            curr_displayed_event.deleteLater()
-        
-        elif curr_event.type == EventType.TEST_END:
-            curr_displayed_event.deleteLater()
+        self._event_filter.reset()  # show all events for better experience
 
-        else:
-            logger.error(f'Not implemented handler for event type: {curr_event.type}')
-            raise RuntimeError('Handler not implemented')
-        
-        if prev_displayed_event is None:
-            # nothing to do with dummy event
+        curr_event_idx = self._events_model.events_count() - 1
+        if curr_event_idx < self._first_event_idx:
+            # no shown events left
             return
 
-        # 2. process showing prev_event
-        if prev_event.type == EventType.MESSAGE_SEND:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.MESSAGE_RECEIVE:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-        
-        elif prev_event.type == EventType.LOCAL_MESSAGE_SEND:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.LOCAL_MESSAGE_RECEIVE:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.MESSAGE_DROPPED:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.MESSAGE_DISCARDED:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.TIMER_FIRED:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.NODE_RECOVERED:
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.NODE_RESTARTED:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.NODE_CRASHED:
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.NODE_CONNECTED:
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.NODE_DISCONNECTED:
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.LINK_ENABLED:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.LINK_DISABLED:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
-
-        elif prev_event.type == EventType.NETWORK_PARTITION:
-            self._last_shown_event = prev_displayed_event
-            prev_displayed_event.show()
+        # persistent state of nodes is reverted from changes of ClusterState before it,
+        # here current event is hidden and previous one is shown again if it is transient,
+        # records of current event in node info are removed lazily (see CentralDisplay.next_event_idx)
+        curr_displayed_event = self._displayed_event(curr_event_idx)
+        self._forget_event(curr_event_idx)
+        if curr_displayed_event.is_selected():
+            curr_displayed_event._deselect()  # pinned event leaves no highlight on nodes
+        curr_displayed_event._hide()  # force hide
+        self._events_model.set_events_count(curr_event_idx)
+        self._display.set_next_event_idx(curr_event_idx)
+        self._events_view.scroll_to_bottom()
+        self.request_payload()
+
+        if curr_event_idx == self._first_event_idx:
+            return
+        prev_event_idx = curr_event_idx - 1
+        if DISPLAYED_EVENT_BY_TYPE[self._events.type_of(prev_event_idx)].IS_TRANSIENT:
+            self._last_shown_event = self._displayed_event(prev_event_idx)
+            self._last_shown_event.show()
 
+    def _forget_event(self, event_idx: int):
+        # event is removed from list
+        if self._hovered_event is not None and self._hovered_event.get_underlying_event().idx == event_idx:
+            self._events_view.clear_hovered()
+        self._pinned_events.pop(event_idx, None)
+        self._events_model.set_highlight(event_idx, None)
+        if self._last_shown_event is not None and self._last_shown_event.get_underlying_event().idx == event_idx:
+            self._last_shown_event = None
+        if self._chosen_event_idx == event_idx:
+            self._chosen_event_idx = None
+
+    def event_hovered(self, event_idx: int):
+        if self._hovered_event is not None:
+            self._hovered_event.deselect()
+            self._update_highlight(self._hovered_event)
+            self._hovered_event = None
+        if event_idx != -1:
+            self._hovered_event = self._displayed_event(event_idx)
+            self._hovered_event.select()
+            self._update_highlight(self._hovered_event)
+
+    def event_left_clicked(self, event_idx: int):
+        displayed_event = self._displayed_event(event_idx)
+        displayed_event.toggle_pin()
+        if displayed_event.is_pinned():
+            self._pinned_events[event_idx] = displayed_event
+            self._chosen_event_idx = event_idx
         else:
-            logger.error(f'Not implemented handler for event type: {prev_event.type}')
-            raise RuntimeError('Handler not implemented')
-    
-    def scroll_events_down(self):
-        if self._force_prevent_scrolling:
-            # to prevent scrolling when expanding msg info viewer
+            self._pinned_events.pop(event_idx, None)
+            self._chosen_event_idx = None
+        self._update_highlight(displayed_event)
+        self.request_payload()
+
+    def event_right_clicked(self, event_idx: int):
+        self._display.run_to_event(event_idx)
+
+    def request_payload(self):
+        if not self._payload_timer.isActive():
+            self._payload_timer.start(0)
+
+    def update_payload(self):
+        event_idx = self._chosen_event_idx
+        if event_idx is None:
+            event_idx = self._events_model.events_count() - 1
+        if event_idx < 0:
+            self._payload_viewer.setHeaderLabel('Data')
+            self._payload_viewer.reset_value(None)
             return
-        self._force_prevent_scrolling = True
-        self._scroll_bar.setValue(self._scroll_bar.maximum())
+        event = self._events[event_idx]
+        displayed_event_cls = DISPLAYED_EVENT_BY_TYPE[event.type]
+        self._payload_viewer.setHeaderLabel(f'Data of event #{event_idx + 1}')
+        self._payload_viewer.reset_value(displayed_event_cls.payload(event), displayed_event_cls.PAYLOAD_EXPANDED)
     
-    def clear_events(self):
+    def clear_events(self, first_event_idx: int = 0):
+        # list keeps events before first_event_idx, but they are not shown on display
+        self._events_view.clear_hovered()
+        for displayed_event in [self._last_shown_event, *self._pinned_events.values()]:
+            if displayed_event is not None:
+                displayed_event._hide()  # force hide
+                self._events_model.set_highlight(displayed_event.get_underlying_event().idx, None)
         self._last_shown_event = None
-        self._crash_node_events.clear()
-        self._disconnect_node_events.clear()
-        layout = self._events_layout
-        for i in reversed(range(layout.count())):
-            item = layout.itemAt(i).widget()
-            if item:
-                item._hide()  # force hide
-                item.deleteLater()
+        self._pinned_events.clear()
+        self._chosen_event_idx = None
+        self._events_model.set_events_count(first_event_idx)
+        self._first_event_idx = first_event_idx
+        self._display.set_next_event_idx(first_event_idx)
+        self._events_view.scroll_to_bottom()
+        self.request_payload()
     
     def hide_all_events(self):
-        if self._last_shown_event is not None:
-            self._last_shown_event._hide()
-        layout = self._events_layout
-        for i in reversed(range(layout.count())):
-            item = layout.itemAt(i).widget()
-            if item:
-                item._hide()  # force hide
+        for displayed_event in [self._last_shown_event, self._hovered_event, *self._pinned_events.values()]:
+            if displayed_event is not None:
+                displayed_event._hide()  # force hide
     
     def filter_value_changed(self):
-        filter_type = self._filter_list.currentText()
-        if self._current_filter_value == filter_type:
-            return
-        self._current_filter_value = filter_type
-        for event in self._event_stack:
-            if event is None:
-                continue
-            if event.get_underlying_event().type == filter_type or filter_type == NULL_EVENT_TYPE:
-                event.show_widget()
-            else:
-                event.hide_widget()
+        self._events_view.clear_hovered()
+        self._events_model.set_filter(self._event_filter.event_filter())
@@ -7,6 +7,12 @@ from components.internal.util import Test, SessionData
 
 from components.static.stylesheets import STARTUP_PAGE_STYLESHEET
 
+STATUS_TO_COLOR = {
+    Test.Status.PASSED: QtGui.QColor('green'),
+    Test.Status.FAILED: QtGui.QColor('red'),
+    Test.Status.RUNNING: QtGui.QColor('#F98800'),
+}
+
 class TestsView(QtWidgets.QWidget):
     def __init__(self, status: str, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
         QtWidgets.QWidget.__init__(self, parent)
@@ -32,28 +38,31 @@ class TestsView(QtWidgets.QWidget):
             return
         self._tests[test.name] = QtWidgets.QPushButton(test.name, self._scroll_wgt)
         self._tests[test.name].setObjectName(self._main_lbl.text())  # for stylesheet
+        if test.log_path is not None:
+            self._tests[test.name].setToolTip(test.log_path)
         self._tests[test.name].clicked.connect(callback)
         self._scroll_layout.addWidget(self._tests[test.name])
 
+    def remove_test(self, test_name: str):
+        if test_name not in self._tests:
+            return
+        button = self._tests.pop(test_name)
+        self._scroll_layout.removeWidget(button)
+        button.deleteLater()
+
 class StartupPage(QtWidgets.QWidget):
     def __init__(self, session_data: SessionData, button_callbacks: t.List, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
         QtWidgets.QWidget.__init__(self, parent)
 
         self._main_layout = QtWidgets.QVBoxLayout()
         self._session_data = session_data
+        self._statuses = [Test.Status.PASSED, Test.Status.FAILED]
+        if any(test.status == Test.Status.RUNNING for test in session_data.tests.values()):
+            self._statuses.append(Test.Status.RUNNING)
         # PIE CHART
         self._pie = QtCharts.QPieSeries(self)
         # self._pie.hovered.connect(self.show_slice)
-        test_status_counters = {status: 0 for status in [Test.Status.PASSED, Test.Status.FAILED]}
-        status_to_color = {
-            Test.Status.PASSED: QtGui.QColor('green'),
-            Test.Status.FAILED: QtGui.QColor('red')
-        }
-        for test in session_data.tests.values():
-            test_status_counters[test.status] += 1
-        for status, counter in test_status_counters.items():
-            self._pie.append(f'{status}({counter})', counter).setBrush(status_to_color[status])
-        self._pie.setLabelsVisible(True)
+        self.update_pie()
 
         self._chart = QtCharts.QChart()
         self._chart.addSeries(self._pie)
@@ -71,14 +80,13 @@ class StartupPage(QtWidgets.QWidget):
         # TEST LIST
         self._tests_area = QtWidgets.QWidget(self)
         self._tests_layout = QtWidgets.QHBoxLayout(self._tests_area)
-        self._tests_wgts = {
-            Test.Status.PASSED: TestsView(Test.Status.PASSED, self),
-            Test.Status.FAILED: TestsView(Test.Status.FAILED, self)
-        }
+        self._tests_wgts: t.Dict[str, TestsView] = {}
+        for status in self._statuses:
+            self._add_tests_view(status)
+        self._test_statuses: t.Dict[str, str] = {}  # test name -> status it is shown with
+        self._button_callbacks: t.Dict[str, t.Callable] = {}
         for i, test in enumerate(session_data.tests.values()):
-            self._tests_wgts[test.status].add_test(test, button_callbacks[i])
-        for tests_wgt in self._tests_wgts.values():
-            self._tests_layout.addWidget(tests_wgt)
+            self.add_test(test, button_callbacks[i], update_pie=False)
         self._tests_area.setLayout(self._tests_layout)
 
         self._main_layout.addWidget(self._chartview, 2)
@@ -87,5 +95,38 @@ class StartupPage(QtWidgets.QWidget):
 
         self.setStyleSheet(STARTUP_PAGE_STYLESHEET)
     
+    def _add_tests_view(self, status: str):
+        self._tests_wgts[status] = TestsView(status, self)
+        self._tests_layout.addWidget(self._tests_wgts[status])
+
+    def add_test(self, test: Test, callback, update_pie: bool = True):
+        if test.status not in self._tests_wgts:
+            self._statuses.append(test.status)
+            self._add_tests_view(test.status)
+        self._tests_wgts[test.status].add_test(test, callback)
+        self._test_statuses[test.name] = test.status
+        self._button_callbacks[test.name] = callback
+        if update_pie:
+            self.update_pie()
+
+    def update_test_status(self, test: Test):
+        # moves test to the list of its new status (follow mode)
+        prev_status = self._test_statuses.get(test.name)
+        if prev_status == test.status:
+            return
+        if prev_status is not None:
+            self._tests_wgts[prev_status].remove_test(test.name)
+        self.add_test(test, self._button_callbacks[test.name])
+
+    def update_pie(self):
+        test_status_counters = {status: 0 for status in self._statuses}
+        for test in self._session_data.tests.values():
+            if test.status in test_status_counters:
+                test_status_counters[test.status] += 1
+        self._pie.clear()
+        for status, counter in test_status_counters.items():
+            self._pie.append(f'{status}({counter})', counter).setBrush(STATUS_TO_COLOR[status])
+        self._pie.setLabelsVisible(True)
+
     # def show_slice(self, slice: QtCharts.QPieSlice, is_hovered: bool):
     #     slice.setLabelVisible(is_hovered)
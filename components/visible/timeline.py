@@ -0,0 +1,71 @@
+from PySide2 import QtCore, QtWidgets
+import typing as t
+
+from components.static.const import TIMELINE_STEPS
+
+
+class Timeline(QtWidgets.QWidget):
+    # slider over simulated time of selected test,
+    # while handle is dragged only state of nodes is shown (no event widgets),
+    # last events are shown when handle is released
+    def __init__(self, parent: t.Optional[QtWidgets.QWidget] = None) -> None:
+        QtWidgets.QWidget.__init__(self, parent)
+        self._parent_window = parent
+
+        self._main_layout = QtWidgets.QHBoxLayout(self)
+        self._ts_lbl = QtWidgets.QLabel(self)
+        self._slider = QtWidgets.QSlider(QtCore.Qt.Horizontal, self)
+        self._slider.setMinimum(0)
+        self._slider.setMaximum(TIMELINE_STEPS)
+        self._slider.setTracking(True)
+        self._slider.valueChanged.connect(self.slider_val_changed)
+        self._slider.sliderReleased.connect(self.slider_released)
+        self._main_layout.addWidget(self._slider)
+        self._main_layout.addWidget(self._ts_lbl)
+        self.setLayout(self._main_layout)
+
+        self._ts_range = (0., 0.)
+        # drag updates are coalesced: only the last position is shown on next loop iteration
+        self._pending_ts: t.Optional[float] = None
+        self._drag_timer = QtCore.QTimer(self)
+        self._drag_timer.setSingleShot(True)
+        self._drag_timer.timeout.connect(self.seek_pending)
+        self.set_range(0., 0.)
+
+    def set_range(self, min_ts: float, max_ts: float):
+        self._ts_range = (min_ts, max_ts)
+        self.set_ts(min_ts)
+
+    def set_ts(self, ts: float):
+        # moves handle without seeking
+        self._slider.blockSignals(True)
+        self._slider.setValue(self._value_of(ts))
+        self._slider.blockSignals(False)
+        self._ts_lbl.setText(f'{ts:.3f}')
+
+    def _value_of(self, ts: float) -> int:
+        min_ts, max_ts = self._ts_range
+        if max_ts <= min_ts:
+            return 0
+        return round((ts - min_ts) / (max_ts - min_ts) * TIMELINE_STEPS)
+
+    def _ts_of(self, value: int) -> float:
+        min_ts, max_ts = self._ts_range
+        return min_ts + (max_ts - min_ts) * value / TIMELINE_STEPS
+
+    def slider_val_changed(self, value: int):
+        self._pending_ts = self._ts_of(value)
+        self._ts_lbl.setText(f'{self._pending_ts:.3f}')
+        if not self._drag_timer.isActive():
+            self._drag_timer.start(0)
+
+    def seek_pending(self):
+        if self._pending_ts is None:
+            return
+        ts, self._pending_ts = self._pending_ts, None
+        self._parent_window.seek_ts(ts, self._slider.isSliderDown())
+
+    def slider_released(self):
+        self._drag_timer.stop()
+        self._pending_ts = None
+        self._parent_window.seek_ts(self._ts_of(self._slider.value()), False)
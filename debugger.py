@@ -1,5 +1,5 @@
 import argparse
-import os.path as path
+import time
 import typing as t
 
 from PySide2 import QtCore, QtWidgets, QtGui
@@ -10,11 +10,22 @@ from components.visible.messagebox import MessageBox
 from components.visible.nodedisplay import CentralDisplay
 from components.visible.right_menu import EventMenu
 from components.visible.startuppage import StartupPage
+from components.visible.timeline import Timeline
 
 from components.internal.internal_logger import getLogger
-from components.internal.logparser import LogParser
+from components.internal.clusterstate import ClusterState
+from components.internal.logparser import (
+    LogParser, LogFollower, find_log_files, load_log_files, merge_log_tests
+)
+from components.internal.logreader import detect_compression
+from components.internal.parsecache import save_cache
+from components.internal.snapshots import DisplaySnapshots
 from components.internal.util import Test, SessionData, TestDebugData, FramedGroup
 
+from components.static.const import (
+    FOLLOW_POLL_INTERVAL_MS, SEEK_MATERIALIZED_EVENTS, SNAPSHOT_BUILD_CHUNK,
+    PLAYBACK_FRAME_MS, PLAYBACK_STEPS_PER_FRAME, NodePlotRule
+)
 from components.static.stylesheets import MENU_BAR_STYLESHEET
 
 # TODO:
@@ -26,16 +37,36 @@ class VDebugger:  # remove class?
     def __init__(self) -> None:
         self._session_data: SessionData = None
 
-    def main(self, logfile_path: str):
-        parser = LogParser()
-        parser.parse_log_file(logfile_path)
-        self._session_data = SessionData(parser.tests)
+    def main(self, logfile_paths: t.List[str], jobs: int = 0, follow: bool = False, use_cache: bool = True):
+        if follow:
+            follower = LogFollower(logfile_paths[0])
+            follower.poll()
+            self._session_data = SessionData(follower.tests)
+            self.start_gui(follower)
+            follower.close()
+            return
+        tests_by_file = load_log_files(logfile_paths, jobs, use_cache)
+        loaded_tests = {
+            (file_path, name)
+            for file_path, tests in tests_by_file.items()
+            for name, test in tests.items() if test.events_loaded
+        }
+        self._session_data = SessionData(merge_log_tests(tests_by_file))
         self.start_gui()
+        if not use_cache:
+            return
+        for file_path, tests in tests_by_file.items():
+            if any(
+                test.events_loaded and (file_path, name) not in loaded_tests
+                for name, test in tests.items()
+            ):
+                # save events of tests that were loaded during the session
+                save_cache(file_path, tests)
     
     ############ GUI ############
-    def start_gui(self):
+    def start_gui(self, follower: t.Optional[LogFollower] = None):
         app = QtWidgets.QApplication([])
-        main_window = MainWindow(self._session_data)
+        main_window = MainWindow(self._session_data, follower)
         screen_size = app.primaryScreen().size()
         main_window.resize(screen_size.width() // 2, screen_size.height() // 2)
         main_window.showMaximized()
@@ -46,9 +77,10 @@ class VDebugger:  # remove class?
 
 
 class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self, session_data: SessionData) -> None:
+    def __init__(self, session_data: SessionData, follower: t.Optional[LogFollower] = None) -> None:
         QtWidgets.QMainWindow.__init__(self)
         self._session_data = session_data
+        self._follower = follower
         self._curr_test_debug_data: t.Optional[TestDebugData] = None
 
         self._menu_bar = self.menuBar()
@@ -65,16 +97,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self._show_test_error_act.setVisible(False)
 
         # add submenus by status
-        for status in [Test.Status.PASSED, Test.Status.FAILED]:
+        statuses = [Test.Status.PASSED, Test.Status.FAILED]
+        if self._follower is not None:
+            statuses.append(Test.Status.RUNNING)
+        for status in statuses:
             self._tests_menus[status] = self._tests_menus['main'].addMenu(status)
         
         # set actions
         self._tests_menu_callbacks = []
+        self._tests_menu_actions: t.Dict[str, t.Tuple[str, QtWidgets.QAction]] = {}  # name -> (status, action)
         for test in self._session_data.tests.values():
-            self._tests_menu_callbacks.append(self.on_select_test_wrapper(test.name))
-            self._tests_menus[test.status].addAction(
-                test.name, self._tests_menu_callbacks[-1]
-            )
+            self.add_test_to_menu(test)
 
         # central widget
         self._central_widget = QtWidgets.QWidget(self)
@@ -94,8 +127,21 @@ class MainWindow(QtWidgets.QMainWindow):
         self._settings_editor = SettingsEditor(self)
         self._menu_bar.addAction('Settings', self.set_settings)
 
+        # layout of nodes can be switched at any moment
+        self._layout_menu = self._menu_bar.addMenu('Layout')
+        self._layout_actions = QtWidgets.QActionGroup(self)
+        for plot_rule in NodePlotRule:
+            action = self._layout_menu.addAction(
+                plot_rule.name.capitalize(), lambda plot_rule=plot_rule: self.set_plot_rule(plot_rule)
+            )
+            action.setCheckable(True)
+            action.setChecked(plot_rule == NodePlotRule.CIRCLE)
+            self._layout_actions.addAction(action)
+
         self._message_box = MessageBox(self)
         self._display = CentralDisplay(self)
+        self._display.traffic_layout_ready.connect(self.replot_nodes)
+        self._timeline = Timeline(self)
         self._event_menu = EventMenu(self._display, self._settings_editor, self)
         self._button_set = ButtonSet(self)
 
@@ -110,9 +156,10 @@ class MainWindow(QtWidgets.QMainWindow):
         # nodes display
         self._display_frame = FramedGroup(
             {
-                'display': self._display
+                'display': self._display,
+                'timeline': self._timeline
             },
-            QtWidgets.QHBoxLayout,
+            QtWidgets.QVBoxLayout,
             self
         )
 
@@ -145,17 +192,28 @@ class MainWindow(QtWidgets.QMainWindow):
         self._button_set.clear_button.clicked.connect(self.clear)
         self._button_set.run_back_button.clicked.connect(self.run_backwards)
         self._button_set.run_or_stop_button.clicked.connect(self.run_or_stop)
+        self._button_set.skip_button.clicked.connect(
+            lambda: self.skip_events(self._button_set.get_skip_count())
+        )
+        self._button_set.skip_back_button.clicked.connect(
+            lambda: self.skip_events(-self._button_set.get_skip_count())
+        )
         
-        # timer for running
-        self._timer = QtCore.QTimer()
-        self._timer.timeout.connect(self.next_step)
-
-        # timer for backwards running
-        self._back_timer = QtCore.QTimer()
-        self._back_timer.timeout.connect(self.prev_step)
-
-        # specific event index to run to
-        self._run_to_event_idx: t.Optional[int] = None
+        # running (forwards or backwards) is done by frames,
+        # every frame shows as many events as playback speed allows
+        self._playback_timer = QtCore.QTimer()
+        self._playback_timer.timeout.connect(self.playback_frame)
+        self._playback_direction = 1
+        self._playback_budget = 0.  # events to show, not whole part is left for next frames
+        self._last_frame_time = 0.
+
+        # display state of selected test every SNAPSHOT_INTERVAL events
+        self._display_snapshots: t.Optional[DisplaySnapshots] = None
+        # state after shown events
+        self._cluster_state: t.Optional[ClusterState] = None
+        # snapshots are built while nothing else happens, so seeking far is fast
+        self._snapshots_timer = QtCore.QTimer()
+        self._snapshots_timer.timeout.connect(self.build_snapshots)
 
         # add splitters to main layout
         self._vertical_splitter.addWidget(self._display_frame)
@@ -171,11 +229,46 @@ class MainWindow(QtWidgets.QMainWindow):
         
         self._central_widget.setLayout(self._central_layout)
         self._central_widget.showMaximized()
+
+        # timer for reading new lines of log in follow mode
+        self._follow_timer = QtCore.QTimer()
+        self._follow_timer.timeout.connect(self.poll_log)
+        if self._follower is not None:
+            self._follow_timer.start(FOLLOW_POLL_INTERVAL_MS)
+
         self.on_startup()
 
     def on_startup(self):
         self.setWindowTitle("VDebugger")
     
+    def add_test_to_menu(self, test: Test):
+        self._tests_menu_callbacks.append(self.on_select_test_wrapper(test.name))
+        action = self._tests_menus[test.status].addAction(
+            test.name, self._tests_menu_callbacks[-1]
+        )
+        self._tests_menu_actions[test.name] = (test.status, action)
+
+    def poll_log(self):
+        started, finished = self._follower.poll()
+        for test in started:
+            self.add_test_to_menu(test)
+            self._startup_page.add_test(test, self._tests_menu_callbacks[-1])
+        for test in finished:
+            status, action = self._tests_menu_actions[test.name]
+            if status != test.status:
+                self._tests_menus[status].removeAction(action)
+                self._tests_menus[test.status].addAction(action)
+                self._tests_menu_actions[test.name] = (test.status, action)
+            self._startup_page.update_test_status(test)
+            if self.is_test_selected() and self._curr_test_debug_data.test is test:
+                self.setWindowTitle(f"VDebugger | TEST: {test.name} | {test.status}")
+                self._show_test_error_act.setVisible(test.err is not None)
+
+    def closeEvent(self, event: QtGui.QCloseEvent):
+        # worker process of traffic layout is not left running after exit
+        self._display.shutdown_workers()
+        super().closeEvent(event)
+
     def on_select_test_wrapper(self, test_name: str):
         def on_select_test():
             logger.info(f'Selected test: {test_name}')
@@ -185,7 +278,13 @@ class MainWindow(QtWidgets.QMainWindow):
                 # to start from where we were
                 return
             
+            if not test.events_loaded:
+                LogParser.load_test_events(test)
+                logger.info(f'Loaded {len(test.events)} events for test: {test_name}')
             self._curr_test_debug_data = TestDebugData(test)
+            self._display_snapshots = DisplaySnapshots(test.events)
+            self._cluster_state = ClusterState()
+            self._snapshots_timer.start(0)
             self.setWindowTitle(f"VDebugger | TEST: {test.name} | {test.status}")
 
             if test.err is not None:
@@ -195,26 +294,26 @@ class MainWindow(QtWidgets.QMainWindow):
                 self._show_test_error_act.setVisible(False)
                 self._message_box.info(f'Selected test: {test_name}')
 
-            self._event_menu.clear_events()
+            self._event_menu.set_events(test.events)
 
+            self._display.set_events(test.events)
             self._display.set_node_ids(test.node_ids)
             self._display.on_startup()
+            self.update_timeline()
         return on_select_test
     
     def clear(self):
         self._message_box.info(f'Clear events')
-        if self._timer.isActive() or self._back_timer.isActive():
+        if self._playback_timer.isActive():
             self.stop()
-        self._curr_test_debug_data.next_event_idx = 0
-        self._event_menu.clear_events()
-        # self._display.on_startup()
+        self.seek(0)
     
     def rerun(self):
         self.clear()
         self.run_or_stop()
 
     def run_or_stop(self):
-        if self._timer.isActive() or self._back_timer.isActive():
+        if self._playback_timer.isActive():
             self.stop()
             return
         self.run()
@@ -228,6 +327,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self._button_set.prev_button.setEnabled(False)
         self._button_set.next_button.setEnabled(False)
         self._button_set.run_back_button.setEnabled(False)
+        self._button_set.skip_button.setEnabled(False)
+        self._button_set.skip_back_button.setEnabled(False)
 
         curr_idx = self._curr_test_debug_data.next_event_idx
         if curr_idx >= len(self._curr_test_debug_data.test.events) and curr_idx > 0:
@@ -235,30 +336,89 @@ class MainWindow(QtWidgets.QMainWindow):
             self.rerun()
         
         self.next_step()
-        self._timer.start(self._settings_editor.get_settings().next_step_delay)
+        self.start_playback(1)
     
     def stop(self):
-        self._run_to_event_idx = None
         self._tests_menus['main'].setEnabled(True)
         self._button_set.prev_button.setEnabled(True)
         self._button_set.next_button.setEnabled(True)
         self._button_set.run_back_button.setEnabled(True)
-        if self._timer.isActive():
-            self._timer.stop()
-        elif self._back_timer.isActive():
-            self._back_timer.stop()
+        self._button_set.skip_button.setEnabled(True)
+        self._button_set.skip_back_button.setEnabled(True)
+        self._playback_timer.stop()
     
     def run_to_event(self, event_idx: int):
-        if self._timer.isActive() or self._back_timer.isActive():
+        if self._playback_timer.isActive():
             self.stop()
         if event_idx + 1 == self._curr_test_debug_data.next_event_idx:
             return
-        if event_idx < self._curr_test_debug_data.next_event_idx - event_idx:
-            self._run_to_event_idx = event_idx
-            self.rerun()
-        else:
-            self._run_to_event_idx = event_idx
-            self.run_backwards()
+        self.seek(event_idx + 1)
+        self._message_box.info(
+            f'Event: #{self._curr_test_debug_data.next_event_idx}/'
+            f'{len(self._curr_test_debug_data.test.events)}'
+        )
+
+    def skip_events(self, count: int):
+        # moves by count events (backwards if count < 0) without showing skipped ones
+        if not self.is_test_selected():
+            self._message_box.warning('Test is not selected!')
+            return
+        events_count = len(self._curr_test_debug_data.test.events)
+        next_event_idx = max(0, min(self._curr_test_debug_data.next_event_idx + count, events_count))
+        if next_event_idx == self._curr_test_debug_data.next_event_idx:
+            if count > 0:
+                self._message_box.info(f'Last event is reached (#{next_event_idx})')
+            else:
+                self._message_box.info('First event reached')
+            return
+        self.seek(next_event_idx)
+        self._message_box.info(f'Event: #{next_event_idx}/{events_count}')
+
+    def seek_ts(self, ts: float, dragging: bool):
+        # shows the first event at or after ts
+        if not self.is_test_selected():
+            return
+        if self._playback_timer.isActive():
+            self.stop()
+        events = self._curr_test_debug_data.test.events
+        # while timeline is dragged only nodes are updated
+        self.seek(events.seek_ts(ts) + 1, 0 if dragging else SEEK_MATERIALIZED_EVENTS, update_timeline=False)
+        self._message_box.info(f'Event: #{self._curr_test_debug_data.next_event_idx}/{len(events)}')
+
+    def seek(
+            self, next_event_idx: int, materialized_events: int = SEEK_MATERIALIZED_EVENTS,
+            update_timeline: bool = True):
+        # shows state after first next_event_idx events without stepping through all of them:
+        # nodes get state from snapshot and only last events are shown in event menu
+        events = self._curr_test_debug_data.test.events
+        next_event_idx = max(0, min(next_event_idx, len(events)))
+        first_event_idx = max(0, next_event_idx - materialized_events)
+        self._event_menu.clear_events(first_event_idx)
+        self._cluster_state = self._display_snapshots.state_at(first_event_idx, undoable=True)
+        self._display.set_snapshot(self._cluster_state, self._display_snapshots, events, first_event_idx)
+        for event_idx in range(first_event_idx, next_event_idx):
+            event = events[event_idx]
+            self._display.apply_state_changes(self._cluster_state.apply(event))
+            self._event_menu.next_event(event)
+        self._curr_test_debug_data.next_event_idx = next_event_idx
+        if update_timeline:
+            self.update_timeline()
+
+    def update_timeline(self):
+        # moves timeline to the last shown event
+        events = self._curr_test_debug_data.test.events
+        if len(events) == 0:
+            self._timeline.set_range(0., 0.)
+            return
+        self._timeline.set_range(events.timestamps[0], events.timestamps[-1])
+        self._timeline.set_ts(events.timestamps[max(0, self._curr_test_debug_data.next_event_idx - 1)])
+
+    def build_snapshots(self):
+        # posting lists of events (for filters) are built in background too
+        building = self._display_snapshots is not None and self._display_snapshots.build_more(SNAPSHOT_BUILD_CHUNK)
+        indexing = self.is_test_selected() and self._curr_test_debug_data.test.events.index_more(SNAPSHOT_BUILD_CHUNK)
+        if not building and not indexing:
+            self._snapshots_timer.stop()
     
     def run_backwards(self):
         if not self.is_test_selected():
@@ -269,9 +429,51 @@ class MainWindow(QtWidgets.QMainWindow):
         self._button_set.prev_button.setEnabled(False)
         self._button_set.next_button.setEnabled(False)
         self._button_set.run_back_button.setEnabled(False)
+        self._button_set.skip_button.setEnabled(False)
+        self._button_set.skip_back_button.setEnabled(False)
         
         self.prev_step()
-        self._back_timer.start(self._settings_editor.get_settings().next_step_delay)
+        self.start_playback(-1)
+
+    def start_playback(self, direction: int):
+        self._playback_direction = direction
+        self._playback_budget = 0.
+        self._last_frame_time = time.monotonic()
+        self._playback_timer.start(PLAYBACK_FRAME_MS)
+
+    def playback_frame(self):
+        now = time.monotonic()
+        events_per_second = self._settings_editor.get_settings().events_per_second()
+        self._playback_budget += (now - self._last_frame_time) * events_per_second
+        self._last_frame_time = now
+        count = int(self._playback_budget)
+        self._playback_budget -= count
+        if count == 0:
+            return
+        if count <= PLAYBACK_STEPS_PER_FRAME:
+            for _ in range(count):
+                if self._playback_direction > 0:
+                    self.next_step()
+                else:
+                    self.prev_step()
+                if not self._playback_timer.isActive():
+                    # first or last event is reached
+                    return
+            return
+        # too many events for widgets of each one, skipped ones change only state
+        events_count = len(self._curr_test_debug_data.test.events)
+        next_event_idx = self._curr_test_debug_data.next_event_idx + count * self._playback_direction
+        if next_event_idx <= 0 or next_event_idx >= events_count:
+            self.seek(next_event_idx)
+            self.stop()
+            self._message_box.info(
+                f'Last event is reached (#{events_count})' if next_event_idx > 0 else 'First event reached'
+            )
+            return
+        self._event_menu.setUpdatesEnabled(False)
+        self.seek(next_event_idx, PLAYBACK_STEPS_PER_FRAME)
+        self._event_menu.setUpdatesEnabled(True)
+        self._message_box.info(f'Event: #{next_event_idx}/{events_count}')
     
     def next_step(self):
         if not self.is_test_selected():
@@ -279,15 +481,10 @@ class MainWindow(QtWidgets.QMainWindow):
             return
         event_idx = self._curr_test_debug_data.next_event_idx
         if event_idx >= len(self._curr_test_debug_data.test.events):
-            if self._timer.isActive():
+            if self._playback_timer.isActive():
                 self.stop()
             self._message_box.info(f'Last event is reached (#{self._curr_test_debug_data.next_event_idx})')
             return
-        if self._run_to_event_idx is not None and event_idx == self._run_to_event_idx + 1:
-            self._run_to_event_idx = None
-            if self._timer.isActive():
-                self.stop()
-            return
         event = self._curr_test_debug_data.test.events[
             self._curr_test_debug_data.next_event_idx
         ]
@@ -296,7 +493,22 @@ class MainWindow(QtWidgets.QMainWindow):
             f'{len(self._curr_test_debug_data.test.events)}'
         )
         self._curr_test_debug_data.next_event_idx += 1
+        self._display.apply_state_changes(self._cluster_state.apply(event))
         self._event_menu.next_event(event)
+        self.forget_old_steps()
+        self.update_timeline()
+
+    def forget_old_steps(self):
+        # only last live_steps stepped events keep undo info and node info records,
+        # stepping back over them restores state from snapshot (see prev_step)
+        live_steps = self._settings_editor.get_settings().live_steps
+        next_event_idx = self._curr_test_debug_data.next_event_idx
+        if next_event_idx - self._event_menu.first_event_idx() < 2 * live_steps:
+            return
+        first_event_idx = next_event_idx - live_steps
+        self._cluster_state.forget_undo(first_event_idx)
+        self._event_menu.set_first_event_idx(first_event_idx)
+        self._display.forget_node_info_records(self._curr_test_debug_data.test.events, first_event_idx)
 
     def prev_step(self):
         if not self.is_test_selected():
@@ -304,22 +516,27 @@ class MainWindow(QtWidgets.QMainWindow):
             return
         event_idx = self._curr_test_debug_data.next_event_idx
         if event_idx == 0:
-            if self._back_timer.isActive():
+            if self._playback_timer.isActive():
                 self.stop()
             self._message_box.info(f'First event reached')
             return
-        if self._run_to_event_idx is not None and event_idx == self._run_to_event_idx + 1:
-            self._run_to_event_idx = None
-            if self._back_timer.isActive():
-                self.stop()
-            return
-        self._curr_test_debug_data.next_event_idx -= 1
-        if self._curr_test_debug_data.next_event_idx > 0:
+        if self._curr_test_debug_data.next_event_idx > 1:
             self._message_box.info(
-                f'Event: #{self._curr_test_debug_data.next_event_idx}/'
+                f'Event: #{self._curr_test_debug_data.next_event_idx - 1}/'
                 f'{len(self._curr_test_debug_data.test.events)}'
             )
+        if event_idx - 1 == self._event_menu.first_event_idx() > 0:
+            # the only shown event is removed, earlier ones are restored from snapshot
+            self.seek(event_idx - 1)
+            return
+        self._curr_test_debug_data.next_event_idx -= 1
+        # persistent state of nodes is reverted by undo info of ClusterState,
+        # icons of transient event are hidden by event menu (DisplayedEvent._hide)
+        self._display.apply_state_changes(self._cluster_state.revert(
+            self._curr_test_debug_data.test.events[self._curr_test_debug_data.next_event_idx]
+        ))
         self._event_menu.prev_event()
+        self.update_timeline()
 
     def is_test_selected(self):
         return self._curr_test_debug_data is not None
@@ -340,6 +557,21 @@ class MainWindow(QtWidgets.QMainWindow):
     def set_settings(self):
         self._settings_editor.edit()
 
+    def set_plot_rule(self, plot_rule: NodePlotRule):
+        self._display.plot_rule = plot_rule
+        self.replot_nodes()
+
+    def replot_nodes(self):
+        if not self.is_test_selected():
+            return
+        if self._playback_timer.isActive():
+            self.stop()
+        # nodes are plotted again and get state of shown events as after seek
+        next_event_idx = self._curr_test_debug_data.next_event_idx
+        self._event_menu.clear_events()
+        self._display.on_startup()
+        self.seek(next_event_idx)
+
 
 if __name__ == '__main__':
     logger.info('Start application')
@@ -348,10 +580,34 @@ if __name__ == '__main__':
     parser.add_argument(
         '-l', '--logfile', 
         dest='logfile_path', default='events.log',
-        type=str, help='path to file with logs'
+        type=str, help='path to file with logs, directory with log files or glob pattern '
+                       '(quote it to avoid expansion by shell)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        dest='jobs', default=0,
+        type=int, help='number of processes to parse all tests on startup '
+                       '(0 - parse test events only when test is selected)'
+    )
+    parser.add_argument(
+        '-f', '--follow',
+        dest='follow', action='store_true',
+        help='keep reading lines appended to logfile (for running tests)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        dest='use_cache', action='store_false',
+        help='do not read or write parse cache file next to logfile'
     )
     args = parser.parse_args()
-    if not path.isfile(args.logfile_path):
+    logfile_paths = find_log_files(args.logfile_path)
+    if not logfile_paths:
         logger.error(f'Unknown path to logfile: {args.logfile_path}')
+    elif args.follow and len(logfile_paths) > 1:
+        logger.error(f'Only one logfile can be followed, got {len(logfile_paths)}: {args.logfile_path}')
+    elif args.follow and detect_compression(logfile_paths[0]) is not None:
+        logger.error(f'Compressed logfile can not be followed: {logfile_paths[0]}')
     else:
-        vdeb.main(args.logfile_path)
+        if len(logfile_paths) > 1:
+            logger.info(f'Opening {len(logfile_paths)} log files')
+        vdeb.main(logfile_paths, args.jobs, args.follow, args.use_cache)
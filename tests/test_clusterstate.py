@@ -0,0 +1,191 @@
+import typing as t
+import unittest
+from unittest import mock
+
+from components.internal.clusterstate import ClusterState, StateChange
+from components.internal.snapshots import DisplaySnapshots
+from components.internal.util import Event, EventStore, make_test_end_event
+
+from components.static.const import EventType, StateChangeKind
+
+
+def _msg(event_type: EventType, src: str, dst: str, msg_type: str = 'PING', ts: float = 0.):
+    return event_type, {'msg': {'type': msg_type, 'data': {'id': 1}}, 'src': src, 'dst': dst, 'ts': ts}
+
+
+def _node(event_type: EventType, node: str, ts: float = 0.):
+    return event_type, {'node': node, 'ts': ts}
+
+
+def _link(event_type: EventType, src: str, dst: str, ts: float = 0.):
+    return event_type, {'src': src, 'dst': dst, 'ts': ts}
+
+
+def _partition(group1, group2, ts: float = 0.):
+    return EventType.NETWORK_PARTITION, {'group1': list(group1), 'group2': list(group2), 'ts': ts}
+
+
+# every kind of change, counters going above one and back, messages with the same key
+EVENTS = [
+    _msg(EventType.MESSAGE_SEND, 'a', 'b'),
+    _msg(EventType.MESSAGE_SEND, 'a', 'b'),
+    _node(EventType.NODE_CRASHED, 'c'),
+    _node(EventType.NODE_CRASHED, 'c'),
+    _msg(EventType.MESSAGE_RECEIVE, 'a', 'b'),
+    _node(EventType.NODE_DISCONNECTED, 'b'),
+    _link(EventType.LINK_DISABLED, 'a', 'b'),
+    _link(EventType.LINK_DISABLED, 'a', 'b'),
+    _partition(['a'], ['b', 'c']),
+    _node(EventType.NODE_RECOVERED, 'c'),
+    _msg(EventType.MESSAGE_SEND, 'b', 'a', 'PONG'),
+    _msg(EventType.MESSAGE_DROPPED, 'a', 'b'),
+    _node(EventType.NODE_RESTARTED, 'a'),
+    _partition(['a', 'b'], ['c']),
+    _link(EventType.LINK_ENABLED, 'a', 'b'),
+    _node(EventType.NODE_CONNECTED, 'b'),
+    _node(EventType.NODE_RECOVERED, 'c'),
+    _node(EventType.NODE_RECOVERED, 'c'),
+    _msg(EventType.MESSAGE_DISCARDED, 'b', 'a', 'PONG'),
+    _msg(EventType.LOCAL_MESSAGE_SEND, 'a', 'a'),
+]
+
+
+def _events() -> t.List[Event]:
+    return [Event(event_type, data, idx) for idx, (event_type, data) in enumerate(EVENTS)]
+
+
+def _store() -> EventStore:
+    store = EventStore()
+    for event in _events():
+        store.append(event)
+    store.append(make_test_end_event(len(store)))
+    return store
+
+
+def _dump(state: ClusterState):
+    return (
+        state.crash_counters, state.disconnect_counters, state.disabled_links, state.partition,
+        {key: list(sent) for key, sent in state.in_flight.items()}
+    )
+
+
+class ClusterStateTest(unittest.TestCase):
+    def test_apply_revert_round_trip(self):
+        state = ClusterState()
+        events = _events()
+        dumps = [_dump(state.copy())]
+        for event in events:
+            state.apply(event)
+            dumps.append(_dump(state.copy()))
+        for event in reversed(events):
+            changes = state.revert(event)
+            dumps.pop()
+            self.assertEqual(_dump(state), dumps[-1], f'after revert of #{event.idx} {event.type}')
+            self.assertTrue(all(isinstance(change, StateChange) for change in changes))
+        self.assertEqual(_dump(state), _dump(ClusterState()))
+
+    def test_revert_returns_inverse_changes(self):
+        state = ClusterState()
+        for event in _events():
+            changes = state.apply(event)
+            inverse = state.revert(event)
+            self.assertEqual(inverse, [change.inverse() for change in reversed(changes)])
+            state.apply(event)
+
+    def test_revert_not_last_event(self):
+        state = ClusterState()
+        events = _events()
+        state.apply(events[0])
+        state.apply(events[1])
+        with self.assertRaises(AssertionError):
+            state.revert(events[0])
+
+    def test_counters(self):
+        state = ClusterState()
+        crash = Event(*_node(EventType.NODE_CRASHED, 'a'), 0)
+        recover = Event(*_node(EventType.NODE_RECOVERED, 'a'), 1)
+        self.assertEqual(state.apply(recover), [])  # extra recover does not make counter negative
+        state.apply(crash)
+        state.apply(crash)
+        state.apply(recover)
+        self.assertTrue(state.is_crashed('a'))
+        self.assertEqual(
+            state.apply(recover), [StateChange(StateChangeKind.CRASH_COUNTER, 'a', 1, 0)]
+        )
+        self.assertFalse(state.is_crashed('a'))
+
+    def test_messages_in_flight(self):
+        state = ClusterState()
+        events = _events()
+        for event in events[:2]:
+            state.apply(event)
+        self.assertEqual(state.messages_in_flight('a', 'b'), [0, 1])
+        # the oldest message is received first
+        self.assertEqual(
+            state.apply(events[4]), [StateChange(StateChangeKind.MESSAGE_DONE, ('a', 'b', 'PING'), 0, None)]
+        )
+        self.assertEqual(state.messages_in_flight(), [1])
+        state.revert(events[4])
+        self.assertEqual(state.messages_in_flight(), [0, 1])
+
+    def test_link_change_only_when_state_changes(self):
+        state = ClusterState()
+        disable = Event(*_link(EventType.LINK_DISABLED, 'a', 'b'), 0)
+        self.assertEqual(len(state.apply(disable)), 1)
+        self.assertEqual(state.apply(disable), [])
+        self.assertFalse(state.is_link_enabled('a', 'b'))
+        self.assertTrue(state.is_link_enabled('b', 'a'))
+
+    def test_apply_at_is_apply(self):
+        store = _store()
+        by_event, by_columns = ClusterState(), ClusterState()
+        for idx in range(len(store)):
+            self.assertEqual(by_columns.apply_at(store, idx), by_event.apply(store[idx]))
+            self.assertEqual(_dump(by_columns), _dump(by_event))
+
+    def test_copy_is_not_shared(self):
+        state = ClusterState()
+        for event in _events()[:3]:
+            state.apply(event)
+        copy = state.copy()
+        copy.apply(Event(*_msg(EventType.MESSAGE_RECEIVE, 'a', 'b'), 3))
+        self.assertEqual(state.messages_in_flight(), [0, 1])
+        self.assertEqual(copy.messages_in_flight(), [1])
+
+
+class DisplaySnapshotsTest(unittest.TestCase):
+    def test_state_at(self):
+        store = _store()
+        expected = ClusterState()
+        dumps = [_dump(expected.copy())]
+        for event in store:
+            expected.apply(event)
+            dumps.append(_dump(expected.copy()))
+        for interval in [1, 3, 1000]:
+            with mock.patch('components.internal.snapshots.SNAPSHOT_INTERVAL', interval):
+                snapshots = DisplaySnapshots(store)
+                # out of order requests, states are built lazily
+                for event_idx in [7, 0, len(store), 3, 15, 8, len(store) + 5]:
+                    self.assertEqual(
+                        _dump(snapshots.state_at(event_idx)), dumps[min(event_idx, len(store))],
+                        f'state after {event_idx} events, interval {interval}'
+                    )
+
+    def test_undoable_state_at(self):
+        store = _store()
+        snapshots = DisplaySnapshots(store)
+        state = snapshots.state_at(10, undoable=True)
+        before = _dump(state.copy())
+        state.apply(store[10])
+        state.revert(store[10])
+        self.assertEqual(_dump(state), before)
+
+    def test_node_info_events(self):
+        store = _store()
+        snapshots = DisplaySnapshots(store)
+        self.assertEqual(list(snapshots.node_info_events('c', len(store))), [2, 3, 8, 9, 13, 16, 17])
+        self.assertEqual(list(snapshots.node_info_events('c', 9)), [2, 3, 8])
+
+
+if __name__ == '__main__':
+    unittest.main()
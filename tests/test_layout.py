@@ -0,0 +1,74 @@
+import time
+import unittest
+
+from components.internal.layout import TrafficLayouts
+from components.internal.util import Event, EventStore
+
+from components.static.const import EventType
+
+
+def _store(pairs) -> EventStore:
+    store = EventStore()
+    for src, dst in pairs:
+        store.append(Event(
+            EventType.MESSAGE_SEND, {'msg': {'type': 'PING', 'data': {}}, 'src': src, 'dst': dst, 'ts': 0.}, len(store)
+        ))
+    return store
+
+
+def _wait(layouts: TrafficLayouts) -> EventStore:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        events = layouts.poll()
+        if events is not None:
+            return events
+        time.sleep(0.01)
+    raise TimeoutError('traffic layout is not computed')
+
+
+class TrafficLayoutsTest(unittest.TestCase):
+    def setUp(self):
+        self.layouts = TrafficLayouts()
+
+    def tearDown(self):
+        self.layouts.shutdown()
+
+    def test_layout_is_reused(self):
+        first, second = _store([('a', 'b'), ('b', 'c')]), _store([('a', 'c')])
+        self.assertIsNone(self.layouts.get(first))
+        self.assertTrue(self.layouts.compute(first))
+        self.assertFalse(self.layouts.compute(second))  # one layout at a time
+        self.assertIs(_wait(self.layouts), first)
+        layout = self.layouts.get(first)
+        self.assertEqual(set(layout), {'a', 'b', 'c'})
+        # other test is selected and then the first one again
+        self.assertTrue(self.layouts.compute(second))
+        self.assertIs(_wait(self.layouts), second)
+        self.assertTrue(self.layouts.is_actual(first))
+        self.assertIs(self.layouts.get(first), layout)
+
+    def test_appended_events_make_layout_not_actual(self):
+        events = _store([('a', 'b')])
+        self.layouts.compute(events)
+        _wait(self.layouts)
+        layout = self.layouts.get(events)
+        self.assertEqual(set(layout), {'a', 'b'})
+        events.append(Event(
+            EventType.MESSAGE_SEND, {'msg': {'type': 'PING', 'data': {}}, 'src': 'b', 'dst': 'c', 'ts': 0.}, 1
+        ))
+        self.assertFalse(self.layouts.is_actual(events))
+        self.assertIs(self.layouts.get(events), layout)  # kept until new one is computed
+
+    def test_shutdown(self):
+        events = _store([('a', 'b')])
+        self.layouts.compute(events)
+        self.layouts.shutdown()
+        self.assertIsNone(self.layouts.poll())
+        # the next computation starts new pool
+        self.assertTrue(self.layouts.compute(events))
+        self.assertIs(_wait(self.layouts), events)
+        self.assertTrue(self.layouts.is_actual(events))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from components.internal.logparser import LogFollower
+from components.internal.util import Test
+
+EVENT = b'{"type": "NodeCrashed","data": {"node": "a","ts": 0}}\n'
+
+
+class LogFollowerTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.log')
+        os.close(fd)
+        self.follower = LogFollower(self.path)
+
+    def tearDown(self):
+        self.follower.close()
+        os.remove(self.path)
+
+    def write(self, data: bytes):
+        with open(self.path, 'ab') as f:
+            f.write(data)
+
+    def test_lines_outside_of_tests_are_skipped(self):
+        self.write(EVENT + b'TEST_END:PASSED:\n')
+        with self.assertLogs('logparser', 'WARNING'):
+            self.assertEqual(self.follower.poll(), ([], []))
+        self.write(b'TEST_BEGIN:t\nNODE_IDS:a\n' + EVENT + b'TEST_END:FAILED:err\nTEST_END:PASSED:\n')
+        with self.assertLogs('logparser', 'WARNING'):
+            started, finished = self.follower.poll()
+        self.assertEqual([test.name for test in started], ['t'])
+        self.assertEqual(finished, started)
+        test = self.follower.tests['t']
+        self.assertEqual((test.status, test.err), (Test.Status.FAILED, 'err'))
+        self.assertEqual(len(test.events), 2)  # event and end of test
+
+    @mock.patch('components.internal.logparser.FOLLOW_READ_CHUNK_SIZE', 7)
+    def test_lines_split_between_chunks(self):
+        self.write(b'TEST_BEGIN:t\n' + EVENT * 3 + EVENT[:10])
+        started, finished = self.follower.poll()
+        self.assertEqual((len(started), finished), (1, []))
+        self.assertEqual(len(self.follower.tests['t'].events), 3)
+        self.write(EVENT[10:] + b'TEST_END:PASSED:\n')
+        started, finished = self.follower.poll()
+        self.assertEqual((started, len(finished)), ([], 1))
+        self.assertEqual(len(self.follower.tests['t'].events), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()